@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the price updater.
+
+Runs PriceUpdater end to end without touching club websites or paid APIs:
+
+- a local HTTP server serves a fixture site with one pricing page per venue in
+  courts.yaml. By default the pages are synthetic: generated from the venue's
+  latest prices, with none of the markup, scripts or size of the real club
+  sites, so the numbers compare runs of this benchmark with each other, not
+  with a live run. Venues with several court groups get JS-driven court-type
+  tabs and a "Cennik" link that reveals the price list, like the Matchpoint
+  page, so the browser crawler clicks through them. Recorded pages are served
+  instead where there are any: --archive DIR takes the static fetches of an
+  update_prices.py --record archive (browser crawls only keep page text, so
+  those venues stay synthetic), --fixtures DIR takes <venue id>.html files.
+- _call_anthropic is replaced by a deterministic stub that answers with the
+  venue's latest winter and summer pricing after --llm-latency seconds.
+
+Each --concurrency setting is run --repeat times on a fresh updater (dry run,
+no extraction cache) and reported as venues/minute, peak RSS of the process
+tree (browsers included) and p50/p95 per traced phase. --output saves the
+results as JSON; --baseline compares against an earlier file and exits with
+an error when throughput or a phase's p95 got worse by more than --tolerance.
+
+Usage:
+    python benchmark.py [--concurrency 1,2,4] [--llm-latency 1.0] [--output bench.json] [--baseline old.json]
+"""
+
+import argparse
+import html
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+import update_prices
+from crawl_archive import CrawlArchive, STATIC
+from page_cache import PageCache
+from resilience import RetryManifest
+from seasons import season_windows
+from tracing import Tracer, percentile
+from venue_pool import venue_key
+
+console = Console()
+
+COURTS_YAML = Path(__file__).parent.parent.parent / "src" / "assets" / "courts.yaml"
+
+DEFAULT_CONCURRENCY = "1,2,4"
+DEFAULT_LLM_LATENCY = 1.0
+DEFAULT_PAGE_LATENCY = 0.2
+DEFAULT_TOLERANCE = 0.15
+
+# Characters per streamed chunk of a stub LLM answer
+STREAM_CHUNK_CHARS = 40
+
+# Court-type tab labels as Polish club sites write them
+TYPE_LABELS = {
+    'indoor': 'Hala',
+    'tent': 'Namiot',
+    'baloon': 'Balon',
+    'outdoor': 'Korty odkryte',
+}
+
+# Phases compared against a baseline (the rest depend too much on the fixture mix)
+COMPARED_PHASES = ('crawl', 'extract', 'goto', 'wait', 'llm', 'apply')
+
+
+def latest_period(group, month=None):
+    """The group's latest open price period (starting in the given 'MM' month, if any), or None"""
+    periods = [p for p in group.get('prices') or [] if p.get('schedule') and p.get('closed') is not True
+               and (month is None or str(p.get('from', ''))[5:7] == month)]
+    return max(periods, key=lambda p: str(p.get('from', '')), default=None)
+
+
+def _price_table(schedule):
+    rows = ''.join(
+        f"<tr><td>{html.escape(str(rule))}</td><td>{html.escape(str(price))} zł</td></tr>"
+        for rule, price in (schedule or {}).items()
+    )
+    return f"<table><tr><th>Godziny</th><th>Cena</th></tr>{rows}</table>"
+
+
+def fixture_page(venue):
+    """Pricing page for a venue: plain tables, or court-type tabs behind a 'Cennik' link when it has several groups"""
+    groups = venue.get('courtGroups') or []
+    title = html.escape(venue.get('name', 'Klub'))
+    sections = []
+    for i, group in enumerate(groups):
+        period = latest_period(group)
+        label = TYPE_LABELS.get(group.get('type'), group.get('type', 'Kort'))
+        sections.append((f"{label} ({group.get('surface')})", _price_table(period and period.get('schedule'))))
+
+    if len(sections) < 2:
+        body = ''.join(f"<h2>{html.escape(label)}</h2>{table}" for label, table in sections)
+        return f"<html><head><meta charset='utf-8'><title>{title}</title></head><body><main><h1>{title}</h1>{body}</main></body></html>"
+
+    tabs = ''.join(
+        f"<button class='tab' onclick=\"show({i})\">{html.escape(label)}</button>"
+        for i, (label, _) in enumerate(sections)
+    )
+    panels = ''.join(
+        f"<div class='panel' style='display:{'block' if i == 0 else 'none'}'>{table}</div>"
+        for i, (_, table) in enumerate(sections)
+    )
+    script = """
+    function show(n) {
+      setTimeout(() => {
+        document.querySelectorAll('.panel').forEach((p, i) => { p.style.display = i === n ? 'block' : 'none'; });
+      }, 150);
+    }
+    function openPricing() {
+      setTimeout(() => { document.getElementById('cennik').style.display = 'block'; }, 150);
+    }"""
+    return (f"<html><head><meta charset='utf-8'><title>{title}</title><script>{script}</script></head><body>"
+            f"<nav><a href='#cennik' onclick='openPricing()'>Cennik</a></nav>"
+            f"<main><h1>{title}</h1><section id='cennik' style='display:none'>{tabs}{panels}</section></main>"
+            f"</body></html>")
+
+
+def _recorded_page(venue_id, fixtures_dir, archive):
+    """HTML of a real page of the venue, if one was saved or recorded"""
+    saved = Path(fixtures_dir) / f"{venue_id}.html" if fixtures_dir else None
+    if saved is not None and saved.exists():
+        return saved.read_bytes()
+    entry = archive.load(venue_id) if archive is not None else None
+    if entry is not None and entry['source'] == STATIC:
+        return entry['html'].encode('utf-8')
+    return None
+
+
+class FixtureSite:
+    """Local HTTP servers with one page per venue at /<venue id>/, each response delayed by page_latency.
+
+    Every venue is served from its own loopback address (127.0.0.2, 127.0.0.3, ...),
+    so host politeness and the per-host circuit breaker treat them like the
+    separate club sites they stand in for.
+    """
+
+    def __init__(self, venues, fixtures_dir=None, page_latency=DEFAULT_PAGE_LATENCY, archive_dir=None):
+        archive = CrawlArchive(archive_dir) if archive_dir else None
+        self.pages = {}
+        self.recorded = 0
+        for venue in venues:
+            venue_id = venue_key(venue)
+            page = _recorded_page(venue_id, fixtures_dir, archive)
+            if page is not None:
+                self.recorded += 1
+            self.pages[venue_id] = page if page is not None else fixture_page(venue).encode('utf-8')
+        self.page_latency = page_latency
+        self.servers = {}
+
+    def _serve(self, address, handler):
+        server = ThreadingHTTPServer((address, 0), handler)
+        threading.Thread(target=server.serve_forever, name=f"fixture-{address}", daemon=True).start()
+        return server
+
+    def __enter__(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = site.pages.get(self.path.strip('/').split('/')[0])
+                time.sleep(site.page_latency)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            for i, venue_id in enumerate(self.pages):
+                self.servers[venue_id] = self._serve(f"127.0.0.{i + 2}", Handler)
+        except OSError:
+            # Only 127.0.0.1 is bound by default outside Linux (e.g. macOS)
+            console.print("⚠️  Can't bind 127.0.0.x aliases, serving all venues from 127.0.0.1 "
+                          "(host politeness will serialize them)", style="yellow")
+            self._shutdown()
+            shared = self._serve('127.0.0.1', Handler)
+            self.servers = {venue_id: shared for venue_id in self.pages}
+        return self
+
+    def _shutdown(self):
+        for server in set(self.servers.values()):
+            server.shutdown()
+            server.server_close()
+        self.servers = {}
+
+    def __exit__(self, *exc):
+        self._shutdown()
+        return False
+
+    def url(self, venue_id):
+        host, port = self.servers[venue_id].server_address[:2]
+        return f"http://{host}:{port}/{venue_id}/"
+
+
+class StubLLMUpdater(update_prices.PriceUpdater):
+    """PriceUpdater whose LLM answers instantly-but-for-latency with each venue's current pricing"""
+
+    def __init__(self, venues, llm_latency=DEFAULT_LLM_LATENCY, **kwargs):
+        self.venues_by_name = {v.get('name'): v for v in venues}
+        self.venues_by_id = {venue_key(v): v for v in venues}
+        self.llm_latency = llm_latency
+        super().__init__(provider='anthropic', **kwargs)
+
+    def _initialize_llm_client(self):
+        return None
+
+    def _pricing_for(self, venue):
+        """Both upcoming season windows, each with the group's latest schedule of that season"""
+        periods = []
+        for season, season_from, season_to in season_windows():
+            courts = []
+            for group in venue.get('courtGroups') or []:
+                period = latest_period(group, month=season_from[5:7])
+                courts.append({
+                    'type': group.get('type'),
+                    'surface': group.get('surface'),
+                    'schedule': dict(period['schedule']) if period else {},
+                })
+            periods.append({'season': season, 'from': season_from, 'to': season_to, 'courts': courts})
+        return {'periods': periods}
+
+    def _call_anthropic(self, prompt, max_tokens=update_prices.MAX_TOKENS_PER_VENUE, timeout=None,
+                        schema=None, on_text=None):
+        time.sleep(self.llm_latency)
+        ids = re.findall(r'^VENUE ID: (.+)$', prompt, re.MULTILINE)
+        if ids:
+            response = {venue_id: self._pricing_for(self.venues_by_id[venue_id]) for venue_id in ids}
+        else:
+            name = re.search(r'^VENUE: (.+)$', prompt, re.MULTILINE).group(1)
+            response = self._pricing_for(self.venues_by_name[name])
+        text = json.dumps(response, ensure_ascii=False)
+        # Streamed in small chunks, like the real providers
+        if on_text is not None:
+            for i in range(0, len(text), STREAM_CHUNK_CHARS):
+                on_text(text[i:i + STREAM_CHUNK_CHARS])
+        # Roughly 4 characters per token, so token columns are comparable between runs
+        self.tracer.annotate(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+        return text
+
+    _call_openai = _call_anthropic
+
+
+class RSSSampler:
+    """Peak resident memory of this process and all its descendants (Chromium included), sampled in the background"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    @staticmethod
+    def tree_rss(root=None):
+        """RSS in bytes of root and its descendants (Linux /proc); falls back to this process' max RSS"""
+        root = root or os.getpid()
+        try:
+            page_size = os.sysconf('SC_PAGE_SIZE')
+            children = {}
+            rss = {}
+            for entry in os.scandir('/proc'):
+                if not entry.name.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry.name}/stat", 'rb') as f:
+                        stat = f.read().rsplit(b')', 1)[1].split()
+                except OSError:
+                    continue
+                pid = int(entry.name)
+                children.setdefault(int(stat[1]), []).append(pid)
+                rss[pid] = int(stat[21]) * page_size
+        except (OSError, ValueError):
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+        total, stack = 0, [root]
+        while stack:
+            pid = stack.pop()
+            total += rss.get(pid, 0)
+            stack.extend(children.get(pid, []))
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.tree_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.tree_rss())
+        return False
+
+
+def _quiet(enabled):
+    """Silence (or restore) the Rich consoles of the updater modules"""
+    for module in list(sys.modules.values()):
+        module_console = getattr(module, 'console', None)
+        if isinstance(module_console, Console) and module_console is not console:
+            module_console.quiet = enabled
+
+
+def run_setting(yaml_path, venues, workdir, concurrency, args):
+    """One benchmark run; returns its result dict"""
+    tracer = Tracer()
+    updater = StubLLMUpdater(
+        venues,
+        llm_latency=args.llm_latency,
+        dry_run=True,
+        concurrency=concurrency,
+        llm_concurrency=args.llm_concurrency or concurrency,
+        page_cache=PageCache(cache_dir=Path(workdir) / "cache", enabled=False),
+        static_fetch=not args.browser_only,
+        use_parser=not args.no_parser,
+        batch_size=args.batch_size,
+        retry_manifest=RetryManifest(Path(workdir) / "retry_manifest.json"),
+        tracer=tracer,
+    )
+    updater.yaml_path = yaml_path
+    if updater.static_fetcher is not None:
+        updater.static_fetcher = type(updater.static_fetcher)(cache_dir=Path(workdir) / "cache",
+                                                              use_validators=False)
+
+    _quiet(not args.verbose)
+    try:
+        with RSSSampler() as rss:
+            started = time.perf_counter()
+            updater.run()
+            wall = time.perf_counter() - started
+    finally:
+        _quiet(False)
+
+    applied = [s for s in tracer.spans if s['name'] == 'apply']
+    phases = {}
+    for span in tracer.spans:
+        phases.setdefault(span['name'], []).append(span['duration_ms'])
+    return {
+        'concurrency': concurrency,
+        'llm_concurrency': args.llm_concurrency or concurrency,
+        'venues': len(applied),
+        'ok': sum(1 for s in applied if s['attrs'].get('ok')),
+        'wall_s': round(wall, 3),
+        'venues_per_min': round(len(applied) / wall * 60, 2) if wall else 0.0,
+        'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+        'phases': {
+            name: {
+                'count': len(durations),
+                'p50_ms': round(percentile(durations, 0.5), 1),
+                'p95_ms': round(percentile(durations, 0.95), 1),
+            }
+            for name, durations in sorted(phases.items())
+        },
+    }
+
+
+def _best(results, concurrency):
+    """Best of the repeats for one setting (least affected by noise)"""
+    runs = [r for r in results if r['concurrency'] == concurrency]
+    return max(runs, key=lambda r: r['venues_per_min']) if runs else None
+
+
+def print_results(results):
+    table = Table(title="🏁 Benchmark", title_justify="left")
+    for column in ("Concurrency", "Venues", "OK", "Wall (s)", "Venues/min", "Peak RSS (MB)",
+                   "crawl p50/p95 (ms)", "llm p50/p95 (ms)"):
+        table.add_column(column, justify="right")
+    for result in results:
+        phases = result['phases']
+
+        def cell(name):
+            phase = phases.get(name)
+            return f"{phase['p50_ms']:.0f} / {phase['p95_ms']:.0f}" if phase else "–"
+
+        table.add_row(
+            f"{result['concurrency']}/{result['llm_concurrency']}",
+            str(result['venues']),
+            str(result['ok']),
+            f"{result['wall_s']:.1f}",
+            f"{result['venues_per_min']:.1f}",
+            f"{result['peak_rss_mb']:.0f}",
+            cell('crawl'),
+            cell('llm'),
+        )
+    console.print(table)
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of results against a baseline results file, as readable lines"""
+    regressions = []
+    for concurrency in sorted({r['concurrency'] for r in results}):
+        new, old = _best(results, concurrency), _best(baseline['results'], concurrency)
+        if old is None:
+            continue
+        if new['venues_per_min'] < old['venues_per_min'] * (1 - tolerance):
+            regressions.append(f"concurrency {concurrency}: {old['venues_per_min']:.1f} → "
+                               f"{new['venues_per_min']:.1f} venues/min")
+        for name in COMPARED_PHASES:
+            new_phase, old_phase = new['phases'].get(name), old['phases'].get(name)
+            if new_phase and old_phase and new_phase['p95_ms'] > old_phase['p95_ms'] * (1 + tolerance):
+                regressions.append(f"concurrency {concurrency}: {name} p95 "
+                                   f"{old_phase['p95_ms']:.0f} → {new_phase['p95_ms']:.0f} ms")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the price updater against a local fixture site and a stub LLM")
+    parser.add_argument('--concurrency', default=DEFAULT_CONCURRENCY,
+                        help=f'Comma-separated crawl concurrency settings to run (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--llm-concurrency', type=int,
+                        help='Concurrent LLM extractions (default: same as each concurrency setting)')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per setting; the best one is compared (default: 1)')
+    parser.add_argument('--llm-latency', type=float, default=DEFAULT_LLM_LATENCY,
+                        help=f'Seconds the stub LLM takes per request (default: {DEFAULT_LLM_LATENCY})')
+    parser.add_argument('--page-latency', type=float, default=DEFAULT_PAGE_LATENCY,
+                        help=f'Seconds the fixture server takes per response (default: {DEFAULT_PAGE_LATENCY})')
+    parser.add_argument('--venues', type=int, help='Only benchmark the first N venues')
+    parser.add_argument('--fixtures', type=Path, help='Directory of <venue id>.html pages to serve instead of generated ones')
+    parser.add_argument('--archive', type=Path,
+                        help='Crawl archive (update_prices.py --record) whose static pages are served instead of generated ones')
+    parser.add_argument('--browser-only', action='store_true', help='Crawl every page with the browser')
+    parser.add_argument('--no-parser', action='store_true', help='Send every page to the (stub) LLM')
+    parser.add_argument('--batch-size', type=int, default=1, help='Venues per LLM request (default: 1)')
+    parser.add_argument('--output', type=Path, help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', type=Path, help='Compare against results written earlier with --output')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed slowdown against the baseline as a fraction (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--verbose', action='store_true', help="Show the updater's own output")
+    args = parser.parse_args()
+
+    with open(COURTS_YAML, 'r', encoding='utf-8') as f:
+        venues = [v for v in yaml.safe_load(f) if v.get('prices_source')]
+    if args.venues:
+        venues = venues[:args.venues]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="price-bench-") as workdir, \
+            FixtureSite(venues, args.fixtures, args.page_latency, args.archive) as site:
+        # Same venues, pointed at the fixture site; tabbed pages need the browser
+        for venue in venues:
+            venue_id = venue_key(venue)
+            venue['prices_source'] = site.url(venue_id)
+            if len(venue.get('courtGroups') or []) > 1:
+                venue['prices_crawler'] = {**(venue.get('prices_crawler') or {}), 'requires_js': True}
+        yaml_path = Path(workdir) / "courts.yaml"
+        yaml_path.write_text(yaml.dump(venues, allow_unicode=True, sort_keys=False), encoding='utf-8')
+
+        for concurrency in (int(c) for c in args.concurrency.split(',')):
+            for run in range(args.repeat):
+                console.print(f"⏱️  concurrency {concurrency}, run {run + 1}/{args.repeat}...", style="dim")
+                results.append(run_setting(yaml_path, venues, workdir, concurrency, args))
+
+    print_results(results)
+    synthetic = len(venues) - site.recorded
+    console.print(f"📄 Pages: {synthetic} synthetic (generated from courts.yaml), {site.recorded} recorded"
+                  + (" - the numbers compare benchmark runs, not live runs" if synthetic else ""), style="dim")
+
+    report = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'settings': {
+            'llm_latency': args.llm_latency,
+            'page_latency': args.page_latency,
+            'venues': len(venues),
+            'browser_only': args.browser_only,
+            'parser': not args.no_parser,
+            'batch_size': args.batch_size,
+            'recorded_pages': site.recorded,
+        },
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        console.print(f"💾 Results written to {args.output}", style="dim")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        if baseline.get('settings') != report['settings']:
+            console.print("⚠️  Baseline was run with different settings; comparison may be meaningless", style="yellow")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            console.print(f"🐢 Regressions against {args.baseline} (commit {baseline.get('commit')}):", style="red")
+            for line in regressions:
+                console.print(f"    {line}", style="red")
+            sys.exit(1)
+        console.print(f"✅ No regressions against {args.baseline}", style="green")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Shared headless browser for the price updater.
+
+Launching Chromium costs several seconds and hundreds of MB of RSS, so a single
+browser is kept alive for a whole updater run. Every venue gets its own fresh
+browser context (isolated cookies, storage and cache), and the browser itself is
+recycled after a number of pages or whenever it crashes.
+"""
+
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+from rich.console import Console
+
+from tracing import maybe_span
+
+console = Console()
+
+DEFAULT_RECYCLE_AFTER = 20
+
+
+class BrowserSession:
+    """Hands out isolated pages from one long-lived Chromium instance"""
+
+    def __init__(self, recycle_after=DEFAULT_RECYCLE_AFTER, headless=True, tracer=None):
+        self.recycle_after = recycle_after
+        self.headless = headless
+        self.tracer = tracer
+        self.launch_count = 0
+        self.pages_served = 0
+
+        self._playwright = None
+        self._browser = None
+        self._pages_since_launch = 0
+        self._needs_recycle = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _launch(self):
+        """Start Playwright (once) and launch a new browser"""
+        with maybe_span(self.tracer, 'browser_launch', relaunch=self.launch_count > 0):
+            if self._playwright is None:
+                self._playwright = sync_playwright().start()
+
+            self._browser = self._playwright.chromium.launch(headless=self.headless)
+        self._browser.on("disconnected", lambda _: self._mark_for_recycle())
+        self._pages_since_launch = 0
+        self._needs_recycle = False
+        self.launch_count += 1
+
+    def _mark_for_recycle(self):
+        self._needs_recycle = True
+
+    def _close_browser(self):
+        if self._browser is None:
+            return
+        try:
+            self._browser.close()
+        except Exception:
+            pass  # Browser may already be gone after a crash
+        self._browser = None
+
+    def _ensure_browser(self):
+        """Launch lazily, and relaunch after a crash or once the page budget is spent"""
+        if self._browser is not None and not self._browser.is_connected():
+            self._needs_recycle = True
+
+        if self._browser is not None and self.recycle_after and self._pages_since_launch >= self.recycle_after:
+            self._needs_recycle = True
+
+        if self._browser is not None and self._needs_recycle:
+            console.print("  ♻️  Recycling browser", style="dim")
+            self._close_browser()
+
+        if self._browser is None:
+            self._launch()
+
+    @contextmanager
+    def new_page(self):
+        """Yield a page in a fresh browser context, closing the context afterwards"""
+        self._ensure_browser()
+
+        context = self._browser.new_context()
+        page = context.new_page()
+        page.on("crash", lambda _: self._mark_for_recycle())
+        self._pages_since_launch += 1
+        self.pages_served += 1
+
+        try:
+            yield page
+        finally:
+            try:
+                context.close()
+            except Exception:
+                # Closing a context only fails when the browser died underneath us
+                self._needs_recycle = True
+
+    def close(self):
+        """Shut down the browser and the Playwright driver"""
+        self._close_browser()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
@@ -0,0 +1,182 @@
+"""
+Content reduction for crawled pricing pages.
+
+Clicking through court-type switches used to append the full innerText of the
+page for every click, so navigation, footers and the same price table ended up
+in the prompt many times, and the blunt [:6000] cut then often dropped the parts
+that mattered. This module:
+
+- keeps the base page once, without repeated lines,
+- keeps only what each switch click changed (with a little leading context so
+  row labels survive), dropping snapshots that changed nothing,
+- drops boilerplate lines that show up in every snapshot diff, and
+- fits the result into the prompt budget by price density instead of position.
+"""
+
+import difflib
+import re
+
+from http_fetch import PRICE_PATTERN
+
+SECTION_HEADER = re.compile(r'^=== (.+) ===$')
+TIME_RANGE_PATTERN = re.compile(r'\b\d{1,2}(?:[:.]\d{2})?\s*[-–—]\s*\d{1,2}(?:[:.]\d{2})?\b')
+NUMBER_PATTERN = re.compile(r'\b\d{2,3}(?:[.,]\d{2})?\b')
+
+DIFF_CONTEXT_LINES = 2
+MAX_BLOCK_LINES = 12
+
+
+def _lines(text):
+    """Non-empty, whitespace-normalized lines"""
+    result = []
+    for line in (text or '').splitlines():
+        line = re.sub(r'\s+', ' ', line).strip()
+        if line:
+            result.append(line)
+    return result
+
+
+def _is_pricey(line):
+    return bool(PRICE_PATTERN.search(line) or TIME_RANGE_PATTERN.search(line))
+
+
+def _dedupe(lines):
+    """Drop repeated non-price lines (menus rendered twice for mobile/desktop, etc.)"""
+    seen = set()
+    result = []
+    for line in lines:
+        if line in seen and not _is_pricey(line):
+            continue
+        seen.add(line)
+        result.append(line)
+    return result
+
+
+def snapshot_diff(base_lines, snapshot_lines, context=DIFF_CONTEXT_LINES):
+    """Lines of a snapshot that are not in the base page, plus a few lines of leading context"""
+    matcher = difflib.SequenceMatcher(a=base_lines, b=snapshot_lines, autojunk=False)
+    keep = set()
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag in ('replace', 'insert'):
+            keep.update(range(max(0, j1 - context), j2))
+    return [snapshot_lines[j] for j in sorted(keep)]
+
+
+def reduce_snapshots(base_text, snapshots):
+    """
+    Combine the base page and court-type switch snapshots into one compact text.
+
+    snapshots is a list of (label, text). Returns (content, useful_labels), where
+    useful_labels lists the switches whose click actually changed the page.
+    """
+    base_lines = _dedupe(_lines(base_text))
+
+    diffs = []
+    for label, text in snapshots:
+        diff = snapshot_diff(base_lines, _lines(text))
+        if diff:
+            diffs.append((label, diff))
+
+    # Lines that every switch "changed" are not switch content (cookie bars, counters, ...)
+    if len(diffs) > 1:
+        common = set(diffs[0][1])
+        for _, diff in diffs[1:]:
+            common &= set(diff)
+        boilerplate = {line for line in common if not _is_pricey(line)}
+        diffs = [(label, [l for l in diff if l not in boilerplate]) for label, diff in diffs]
+        diffs = [(label, diff) for label, diff in diffs if diff]
+
+    # Two switches showing identical content only need to be sent once
+    sections = []
+    seen_diffs = {}
+    for label, diff in diffs:
+        key = tuple(diff)
+        if key in seen_diffs:
+            seen_diffs[key].append(label)
+            continue
+        seen_diffs[key] = [label]
+        sections.append((seen_diffs[key], diff))
+
+    parts = ["\n".join(base_lines)]
+    for labels, diff in sections:
+        parts.append(f"=== {' / '.join(labels)} ===\n" + "\n".join(diff))
+
+    useful = [label for labels, _ in sections for label in labels]
+    return "\n\n".join(parts), useful
+
+
+def _blocks(text):
+    """Split text into (section_header, lines) blocks at blank lines, headers and every MAX_BLOCK_LINES"""
+    blocks = []
+    header = None
+    current = []
+
+    def flush():
+        if current:
+            blocks.append((header, list(current)))
+            current.clear()
+
+    for raw in (text or '').splitlines():
+        line = raw.strip()
+        match = SECTION_HEADER.match(line)
+        if match:
+            flush()
+            header = line
+        elif not line:
+            flush()
+        else:
+            current.append(line)
+            if len(current) >= MAX_BLOCK_LINES:
+                flush()
+    flush()
+    return blocks
+
+
+def _price_density(lines):
+    text = "\n".join(lines)
+    score = (
+        3 * len(PRICE_PATTERN.findall(text))
+        + len(TIME_RANGE_PATTERN.findall(text))
+        + 0.5 * len(NUMBER_PATTERN.findall(text))
+    )
+    return score / (len(text) + 50)
+
+
+def fit_to_budget(text, max_chars):
+    """
+    Shrink text to at most max_chars, keeping the most price-dense blocks.
+
+    Kept blocks stay in their original order and under their section headers.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    blocks = _blocks(text)
+    ranked = sorted(range(len(blocks)), key=lambda i: _price_density(blocks[i][1]), reverse=True)
+
+    kept = set()
+    used = 0
+    headers_used = set()
+    for i in ranked:
+        header, lines = blocks[i]
+        cost = len("\n".join(lines)) + 2
+        if header and header not in headers_used:
+            cost += len(header) + 1
+        if used + cost > max_chars:
+            continue
+        kept.add(i)
+        used += cost
+        if header:
+            headers_used.add(header)
+
+    parts = []
+    current_header = None
+    for i, (header, lines) in enumerate(blocks):
+        if i not in kept:
+            continue
+        block = "\n".join(lines)
+        if header and header != current_header:
+            block = f"{header}\n{block}"
+            current_header = header
+        parts.append(block)
+    return "\n\n".join(parts)
@@ -0,0 +1,113 @@
+"""
+Record-and-replay archives of crawled pricing pages.
+
+Re-testing a prompt or content heuristic change used to mean re-crawling every
+club site live, which takes minutes and never gives the same pages twice.
+With --record, every crawl also saves what it saw to one gzipped JSON file per
+venue:
+
+- static fetches: the raw HTML of the response
+- browser crawls: the page text before any switch was clicked, and the text
+  after each court-type switch click (label + text)
+
+With --replay, the crawl stage reads those files instead of touching the
+network, and rebuilds the page content with the current html_to_text /
+reduce_snapshots, so extraction can be iterated on across all venues in
+seconds, with reproducible input.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from content_reduce import reduce_snapshots
+from http_fetch import html_to_text
+from page_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_ARCHIVE_DIR = DEFAULT_CACHE_DIR / "archive"
+
+# Bump when the entry layout changes; older entries are ignored on replay
+ARCHIVE_FORMAT = 1
+
+STATIC = 'static'
+BROWSER = 'browser'
+
+
+def _safe_name(venue_id):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', venue_id) or '_'
+
+
+class CrawlArchive:
+    """Directory of per-venue crawl recordings (the latest crawl of each venue)"""
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        self.dir = Path(directory)
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+        self._lock = threading.Lock()
+
+    def _path(self, venue_id):
+        return self.dir / f"{_safe_name(venue_id)}.json.gz"
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record(self, venue_id, url, source, html=None, base=None, snapshots=None):
+        """Save one venue's crawl; source is STATIC (with html) or BROWSER (with base and snapshots)"""
+        entry = {
+            'format': ARCHIVE_FORMAT,
+            'venue_id': venue_id,
+            'url': url,
+            'source': source,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        if source == STATIC:
+            entry['html'] = html
+        else:
+            entry['base'] = base
+            entry['snapshots'] = [{'label': label, 'text': text} for label, text in snapshots or []]
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(venue_id)
+        tmp_path = path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self._count('recorded')
+
+    def load(self, venue_id):
+        """The recorded entry of a venue, or None"""
+        try:
+            with gzip.open(self._path(venue_id), 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('format') == ARCHIVE_FORMAT else None
+
+    def replay(self, venue_id):
+        """Page content of a venue's recorded crawl, rebuilt with the current heuristics; None if not recorded"""
+        entry = self.load(venue_id)
+        if entry is None:
+            self._count('missing')
+            return None
+
+        self._count('replayed')
+        if entry['source'] == STATIC:
+            return html_to_text(entry['html'])
+        snapshots = [(snapshot['label'], snapshot['text']) for snapshot in entry['snapshots']]
+        content, _ = reduce_snapshots(entry['base'], snapshots)
+        return content
+
+    def summary(self):
+        parts = []
+        if self.recorded:
+            parts.append(f"{self.recorded} recorded")
+        if self.replayed or self.missing:
+            parts.append(f"{self.replayed} replayed, {self.missing} not in archive")
+        return ', '.join(parts) or "nothing recorded or replayed"
@@ -0,0 +1,215 @@
+"""
+Plain HTTP fast path for static pricing pages.
+
+Many clubs publish their cennik as a static (WordPress-style) page that doesn't
+need a headless browser at all. StaticFetcher tries a plain GET first, sending
+If-None-Match / If-Modified-Since from the validators stored after the last
+successful run:
+
+- 304 Not Modified -> the venue is unchanged and can be skipped outright
+- 200 with pricing-looking text -> that text is used instead of a browser crawl
+- anything else -> the caller falls back to the Playwright crawl
+
+Validators are only committed once the venue has been processed successfully,
+so a failed extraction is never hidden behind a later 304. The caller only asks
+for a conditional GET while the venue's cached extraction is within max_age, so
+a 304 can't keep a venue from being re-extracted once its cache entry expires.
+"""
+
+import json
+import os
+import re
+import threading
+import urllib.error
+import urllib.request
+from html.parser import HTMLParser
+from pathlib import Path
+
+from page_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_TIMEOUT = 10
+USER_AGENT = "Mozilla/5.0 (compatible; korty-wroclawia-price-updater)"
+
+# "145 zł", "145,00 zł", "145 PLN", "145zł/h"
+PRICE_PATTERN = re.compile(r'\d+(?:[.,]\d{2})?\s*(?:zł|pln)', re.IGNORECASE)
+MIN_PRICE_MATCHES = 3
+
+_BLOCK_TAGS = {
+    'p', 'div', 'br', 'tr', 'li', 'ul', 'ol', 'table', 'section', 'article', 'main',
+    'header', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dt', 'dd',
+}
+_CELL_TAGS = {'td', 'th'}
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head'}
+
+
+class _TextExtractor(HTMLParser):
+    """Roughly mimic innerText: drop scripts/styles, break lines at block elements"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in _CELL_TAGS:
+            self.parts.append('\t')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+    def text(self):
+        lines = []
+        for line in ''.join(self.parts).splitlines():
+            line = re.sub(r'[ \t\xa0]+', ' ', line).strip()
+            if line:
+                lines.append(line)
+        return '\n'.join(lines)
+
+
+def html_to_text(html):
+    """Visible text of an HTML document, one block per line"""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
+
+
+def looks_like_pricing(text):
+    """True if the text contains enough price-like tokens to be worth extracting from"""
+    return len(PRICE_PATTERN.findall(text or '')) >= MIN_PRICE_MATCHES
+
+
+def requires_js(venue):
+    """Venues marked in courts.yaml, or hash-routed SPAs (e.g. app.tenis4u.pl/#/court/326)"""
+    crawler = venue.get('prices_crawler') or {}
+    if crawler.get('requires_js'):
+        return True
+    return '#/' in (venue.get('prices_source') or '')
+
+
+def _decode(body, headers):
+    charset = headers.get_content_charset()
+    if not charset:
+        meta = re.search(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', body[:4096], re.IGNORECASE)
+        charset = meta.group(1).decode('ascii') if meta else 'utf-8'
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+class FetchResult:
+    """Outcome of a static fetch: status is 'not_modified', 'ok' or 'needs_browser'"""
+
+    def __init__(self, status, text=None, reason=None, html=None):
+        self.status = status
+        self.text = text
+        self.html = html
+        self.reason = reason
+
+    @property
+    def not_modified(self):
+        return self.status == 'not_modified'
+
+
+class StaticFetcher:
+    """Conditional GET with per-venue ETag / Last-Modified validators"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, use_validators=True, timeout=DEFAULT_TIMEOUT):
+        self.path = Path(cache_dir) / "validators.json"
+        self.use_validators = use_validators
+        self.timeout = timeout
+
+        self.not_modified = 0
+        self.static_hits = 0
+        self.fallbacks = 0
+
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._validators = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._validators, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def fetch(self, venue_id, url, conditional=True):
+        """Try the static tier for a venue's pricing page; conditional=False always gets the full page"""
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'text/html,application/xhtml+xml'}
+
+        with self._lock:
+            stored = self._validators.get(venue_id) if self.use_validators and conditional else None
+        if stored and stored.get('url') == url:
+            if stored.get('etag'):
+                headers['If-None-Match'] = stored['etag']
+            if stored.get('last_modified'):
+                headers['If-Modified-Since'] = stored['last_modified']
+
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                response_headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                self._count('not_modified')
+                return FetchResult('not_modified')
+            self._count('fallbacks')
+            return FetchResult('needs_browser', reason=f"HTTP {e.code}")
+        except Exception as e:
+            self._count('fallbacks')
+            return FetchResult('needs_browser', reason=str(e))
+
+        html = _decode(body, response_headers)
+        text = html_to_text(html)
+        if not looks_like_pricing(text):
+            self._count('fallbacks')
+            return FetchResult('needs_browser', reason="no prices in static HTML")
+
+        validators = {
+            'url': url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+        }
+        if validators['etag'] or validators['last_modified']:
+            with self._lock:
+                self._pending[venue_id] = validators
+
+        self._count('static_hits')
+        return FetchResult('ok', text=text, html=html)
+
+    def commit(self, venue_id):
+        """Persist the validators of a venue once it has been processed successfully"""
+        with self._lock:
+            validators = self._pending.pop(venue_id, None)
+            if validators is None:
+                return
+            self._validators[venue_id] = validators
+            self._save()
+
+    def summary(self):
+        return f"{self.not_modified} not modified, {self.static_hits} static, {self.fallbacks} browser fallbacks"
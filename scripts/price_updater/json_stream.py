@@ -0,0 +1,163 @@
+"""
+Incremental JSON reader for streamed LLM responses.
+
+JsonStream is fed the response chunk by chunk as it arrives and reports every
+completed scalar together with its path, e.g.
+
+    ('periods', 0, 'courts', 1, 'schedule', '*:7-15') -> '145'
+
+so a caller can check values while the model is still writing, and raise to
+abort the request at the first bad one. Syntax errors are raised as
+ValueError as soon as the offending character arrives.
+"""
+
+import json
+
+WHITESPACE = ' \t\r\n'
+LITERAL_START = '-0123456789tfn'
+
+# What the reader expects next
+VALUE = 'value'
+VALUE_OR_END = 'value_or_end'
+KEY = 'key'
+KEY_OR_END = 'key_or_end'
+COLON = 'colon'
+COMMA_OR_END = 'comma_or_end'
+DONE = 'done'
+
+
+class JsonStream:
+    """Push parser: feed() chunks, on_value(path, value) is called for each completed scalar"""
+
+    def __init__(self, on_value=None):
+        self.on_value = on_value
+        self.chars = 0
+        # One frame per open container: [kind ('{' or '['), current key or index]
+        self._stack = []
+        self._expect = VALUE
+        self._string = None
+        self._string_is_key = False
+        self._escape = False
+        self._literal = None
+
+    @property
+    def path(self):
+        return tuple(frame[1] for frame in self._stack)
+
+    @property
+    def done(self):
+        return self._expect == DONE and self._literal is None
+
+    def feed(self, chunk):
+        for ch in chunk:
+            self._step(ch)
+            self.chars += 1
+
+    def finish(self):
+        """Flush a trailing top-level literal and check that the document is complete"""
+        if self._literal is not None:
+            self._end_literal()
+        if self._expect != DONE:
+            raise ValueError(f"JSON ends early (at char {self.chars})")
+
+    def _error(self, ch):
+        return ValueError(f"unexpected {ch!r} at char {self.chars} in JSON (path {'.'.join(map(str, self.path)) or '$'})")
+
+    def _step(self, ch):
+        if self._string is not None:
+            self._string_char(ch)
+            return
+
+        if self._literal is not None:
+            if ch not in WHITESPACE + ',]}':
+                self._literal += ch
+                return
+            self._end_literal()
+
+        if ch in WHITESPACE:
+            return
+
+        expect = self._expect
+        if expect == VALUE_OR_END and ch == ']':
+            self._close('[')
+        elif expect in (VALUE, VALUE_OR_END):
+            self._start_value(ch)
+        elif expect in (KEY, KEY_OR_END):
+            if ch == '"':
+                self._string, self._string_is_key = [], True
+            elif ch == '}' and expect == KEY_OR_END:
+                self._close('{')
+            else:
+                raise self._error(ch)
+        elif expect == COLON:
+            if ch != ':':
+                raise self._error(ch)
+            self._expect = VALUE
+        elif expect == COMMA_OR_END:
+            frame = self._stack[-1]
+            if ch == ',':
+                if frame[0] == '[':
+                    frame[1] += 1
+                    self._expect = VALUE
+                else:
+                    self._expect = KEY
+            elif ch in '}]':
+                self._close('{' if ch == '}' else '[')
+            else:
+                raise self._error(ch)
+        else:
+            raise self._error(ch)
+
+    def _start_value(self, ch):
+        if ch == '{':
+            self._stack.append(['{', None])
+            self._expect = KEY_OR_END
+        elif ch == '[':
+            self._stack.append(['[', 0])
+            self._expect = VALUE_OR_END
+        elif ch == '"':
+            self._string, self._string_is_key = [], False
+        elif ch in LITERAL_START:
+            self._literal = ch
+        else:
+            raise self._error(ch)
+
+    def _string_char(self, ch):
+        if self._escape:
+            self._string.append(ch)
+            self._escape = False
+        elif ch == '\\':
+            self._string.append(ch)
+            self._escape = True
+        elif ch == '"':
+            value = json.loads('"' + ''.join(self._string) + '"')
+            self._string = None
+            if self._string_is_key:
+                self._stack[-1][1] = value
+                self._expect = COLON
+            else:
+                self._value(value)
+        else:
+            self._string.append(ch)
+
+    def _end_literal(self):
+        literal, self._literal = self._literal, None
+        try:
+            value = json.loads(literal)
+        except ValueError:
+            raise ValueError(f"invalid literal {literal!r} at char {self.chars} in JSON") from None
+        self._value(value)
+
+    def _value(self, value):
+        if self.on_value is not None:
+            self.on_value(self.path, value)
+        self._after_value()
+
+    def _close(self, kind):
+        if not self._stack or self._stack[-1][0] != kind:
+            raise self._error('}' if kind == '{' else ']')
+        self._stack.pop()
+        self._after_value()
+
+    def _after_value(self):
+        self._expect = COMMA_OR_END if self._stack else DONE
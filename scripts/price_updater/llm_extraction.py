@@ -0,0 +1,358 @@
+"""
+Prompts and response parsing for LLM pricing extraction.
+
+The instructions are identical for every venue, so they are kept apart from the
+per-venue part of the prompt: they are sent as the system prompt (a stable,
+cacheable prefix for provider prompt caching) and shared by all venues of a
+batched request.
+
+Responses are constrained by PRICING_SCHEMA (a forced tool call for Anthropic,
+a JSON schema response format for OpenAI) and checked while they stream in:
+PricingStreamValidator raises PricingValidationError at the first value that
+can't be right (an unknown court type, a malformed schedule rule, a price out
+of range), so the request can be aborted and repaired with repair_prompt
+instead of being thrown away after the last token. The repair request carries the
+rejected answer and the reason, not the page again.
+"""
+
+import json
+import re
+from datetime import date
+
+from content_reduce import fit_to_budget
+from json_stream import JsonStream
+from schedule_grid import DAY_NAMES, parse_price, rule_hours
+from seasons import SEASON_STARTS, season_window, season_windows
+from validate_pricing import MIN_PRICE, MAX_PRICE
+
+# Prompt budget for page text; the most price-dense blocks are kept
+MAX_PAGE_CHARS = 6000
+
+# Completion budget per venue (a page usually lists one or two periods)
+MAX_TOKENS_PER_VENUE = 3000
+
+EXTRACTION_TEMPLATE = """You are extracting tennis court pricing information for tennis clubs in Wrocław.
+
+CONTENT FORMAT NOTES:
+- The content starts with the page as first shown
+- It may be followed by sections marked with "===" headers for different court types (e.g., "=== Indoor ===" or "=== Dome ===")
+- Each section contains only what changed on the page after switching to that court type
+- Parse pricing from the appropriate section matching each court type
+
+YOUR TASK:
+Extract EVERY price period shown on the page (e.g. both a winter and a summer price list), each with its date range.
+Today is {today}. The current season is {season} ({start} to {end}); the next one is {next_season} ({next_start} to {next_end}).
+
+IMPORTANT RULES:
+1. Return one period per price list on the page. Use the dates the page gives; for a season named without dates, use the season dates above
+2. Skip price lists that ended before today
+3. **OUTDOOR courts are CLOSED in winter** - in a winter period, return an empty schedule for outdoor courts
+4. In a summer period, outdoor courts are priced like the others
+5. Prices are typically in PLN per hour
+6. Common time slots: 6-15 (daytime), 15-23 (evening)
+7. Schedule keys are "<day>:<from hour>-<to hour>", day is one of * (every day), mo, tu, we, th, fr, st (Saturday), su, hl (holidays); later keys override earlier ones
+8. **If content has section headers (===), match pricing from the correct section to the court type**
+9. Map court type names: "hala" = indoor, "namiot" = tent, "balon" = baloon, "odkryte" = outdoor
+
+For each venue, the pricing is a JSON object with this structure:
+{{
+  "periods": [
+    {{
+      "season": "winter",
+      "from": "{winter_from}",
+      "to": "{winter_to}",
+      "courts": [
+        {{
+          "type": "indoor/tent/baloon/outdoor",
+          "surface": "clay/hard/carpet/grass/artificial-grass",
+          "schedule": {{
+            "*:6-15": "120",
+            "*:15-23": "150",
+            "su:6-23": "130"
+          }}
+        }}
+      ]
+    }},
+    {{
+      "season": "summer",
+      "from": "{summer_from}",
+      "to": "{summer_to}",
+      "courts": [...]
+    }}
+  ]
+}}
+
+If outdoor courts exist, include them in every period, with an empty schedule when closed: {{"schedule": {{}}}}
+
+RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
+
+SINGLE_VENUE_FORMAT = "Return ONLY the pricing JSON object for this venue."
+
+BATCH_FORMAT = """Return ONLY one JSON object mapping each VENUE ID above to that venue's pricing JSON object:
+{"<venue id>": {"periods": [{"season": ..., "from": ..., "to": ..., "courts": [...]}, ...]}, ...}
+Include every venue id exactly once."""
+
+
+# Values used in courts.yaml ('baloon' is spelled the way the data has it)
+COURT_TYPES = ('indoor', 'tent', 'baloon', 'outdoor')
+SURFACES = ('clay', 'hard', 'carpet', 'grass', 'artificial-grass')
+
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+PRICING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "periods": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "season": {"type": "string", "enum": list(SEASON_STARTS)},
+                    "from": {"type": "string", "description": "YYYY-MM-DD, inclusive"},
+                    "to": {"type": "string", "description": "YYYY-MM-DD, exclusive"},
+                    "courts": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "type": {"type": "string", "enum": list(COURT_TYPES)},
+                                "surface": {"type": "string", "enum": list(SURFACES)},
+                                "schedule": {
+                                    "type": "object",
+                                    "description": 'Rule "<day>:<from>-<to>" -> price in PLN per hour, e.g. {"*:7-15": "145"}',
+                                    "additionalProperties": {"type": "string"},
+                                },
+                            },
+                            "required": ["type", "surface", "schedule"],
+                        },
+                    },
+                },
+                "required": ["season", "from", "to", "courts"],
+            },
+        },
+    },
+    "required": ["periods"],
+}
+
+# Batched requests: venue id -> one venue's pricing
+BATCH_PRICING_SCHEMA = {"type": "object", "additionalProperties": PRICING_SCHEMA}
+
+
+def extraction_instructions(today=None):
+    """System prompt with the season dates of today; identical for every venue of a run"""
+    today = today or date.today()
+    (season, start, end), (next_season, next_start, next_end) = season_windows(today)
+    winter_from, winter_to = season_window('winter', today)
+    summer_from, summer_to = season_window('summer', today)
+    return EXTRACTION_TEMPLATE.format(
+        today=today.isoformat(), season=season, start=start, end=end,
+        next_season=next_season, next_start=next_start, next_end=next_end,
+        winter_from=winter_from, winter_to=winter_to, summer_from=summer_from, summer_to=summer_to,
+    )
+
+
+def describe_courts(venue_data):
+    """Court structure of a venue, one line per court group"""
+    courts_info = []
+    court_groups = venue_data.get('courtGroups', venue_data.get('courts', []))
+    for court in court_groups:
+        court_type = court.get('type', 'unknown')
+        surface = court.get('surface', 'unknown')
+        count = len(court.get('courts', []))
+        courts_info.append(f"- {count}x {court_type} courts, surface: {surface}")
+    return "\n".join(courts_info)
+
+
+def venue_block(venue_name, venue_data, page_content, venue_id=None):
+    """Per-venue part of a prompt"""
+    header = f"VENUE: {venue_name}"
+    if venue_id is not None:
+        header = f"VENUE ID: {venue_id}\n{header}"
+    return f"""{header}
+
+VENUE STRUCTURE:
+{describe_courts(venue_data)}
+
+PRICING PAGE CONTENT:
+{fit_to_budget(page_content, MAX_PAGE_CHARS)}"""
+
+
+def single_venue_prompt(venue_name, venue_data, page_content):
+    return f"{venue_block(venue_name, venue_data, page_content)}\n\n{SINGLE_VENUE_FORMAT}"
+
+
+def batch_prompt(items):
+    """User prompt for several venues at once; items are (venue_id, venue_name, venue_data, page_content)"""
+    blocks = [
+        venue_block(venue_name, venue_data, page_content, venue_id=venue_id)
+        for venue_id, venue_name, venue_data, page_content in items
+    ]
+    separator = "\n\n" + "-" * 40 + "\n\n"
+    return separator.join(blocks) + f"\n\n{BATCH_FORMAT}"
+
+
+def parse_json_response(response_text):
+    """Parse a JSON response, tolerating a markdown code fence around it"""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+        response_text = response_text.strip()
+    return json.loads(response_text)
+
+
+def pricing_periods(pricing_data, today=None):
+    """
+    Periods of one venue's extracted pricing, each with season, from, to and courts.
+
+    Accepts the {"periods": [...]} shape as well as a single period object (older
+    cached extractions). A period without dates gets its season's window, or the
+    window of the season running today when it names no season either.
+    """
+    if not isinstance(pricing_data, dict):
+        return []
+    periods = pricing_data['periods'] if 'periods' in pricing_data else [pricing_data]
+
+    result = []
+    for period in periods:
+        if not isinstance(period, dict):
+            continue
+        season = period.get('season')
+        if season is None or not period.get('from') or not period.get('to'):
+            try:
+                start, end = season_window(season, today)
+            except ValueError:
+                season, start, end = season_windows(today)[0]
+        else:
+            start, end = period['from'], period['to']
+        result.append({
+            'season': season,
+            'from': str(period.get('from') or start),
+            'to': str(period.get('to') or end),
+            'courts': period.get('courts'),
+        })
+    return result
+
+
+def is_valid_pricing(pricing_data):
+    """Minimal shape check for one venue's extracted pricing"""
+    periods = pricing_periods(pricing_data)
+    return bool(periods) and all(
+        isinstance(period['courts'], list)
+        and all(isinstance(c, dict) and isinstance(c.get('schedule', {}), dict) for c in period['courts'])
+        for period in periods
+    )
+
+
+class PricingValidationError(ValueError):
+    """An LLM response that doesn't match the pricing schema"""
+
+
+def check_pricing_value(path, value):
+    """Problem with one scalar of a venue's pricing (path inside it, as JsonStream reports), or None"""
+    if len(path) == 3 and path[0] == 'periods':
+        field = path[2]
+        if field == 'season' and value not in SEASON_STARTS:
+            return f"unknown season {value!r}, expected one of {', '.join(SEASON_STARTS)}"
+        if field in ('from', 'to') and not (isinstance(value, str) and ISO_DATE.match(value)):
+            return f"{field} date {value!r} is not YYYY-MM-DD"
+    elif len(path) == 5 and path[2] == 'courts':
+        field = path[4]
+        if field == 'type' and value not in COURT_TYPES:
+            return f"unknown court type {value!r}, expected one of {', '.join(COURT_TYPES)}"
+        if field == 'surface' and value not in SURFACES:
+            return f"unknown surface {value!r}, expected one of {', '.join(SURFACES)}"
+    elif len(path) == 6 and path[4] == 'schedule':
+        rule = path[5]
+        day, _, time_range = str(rule).partition(':')
+        if day not in ('*', '!') + DAY_NAMES or not rule_hours(time_range):
+            return f"schedule rule {rule!r} is not '<day>:<from>-<to>' with day one of *, {', '.join(DAY_NAMES)}"
+        price = parse_price(value)
+        if price is None or not MIN_PRICE <= price <= MAX_PRICE:
+            return f"price {value!r} for {rule!r} is not a number between {MIN_PRICE} and {MAX_PRICE}"
+    return None
+
+
+class PricingStreamValidator:
+    """
+    Checks a streamed pricing response as it arrives; feed() raises PricingValidationError early.
+
+    A single-venue response is checked value by value. In a batched response only
+    the overall shape is checked early: a bad venue there is retried on its own
+    instead of costing the whole batch.
+    """
+
+    def __init__(self, batch=False):
+        self.batch = batch
+        self.text = ''
+        self._stream = JsonStream(self._check)
+        self._started = False
+        self._fence = False
+
+    def _check(self, path, value):
+        if self.batch:
+            if not path:
+                raise PricingValidationError("response is not a JSON object keyed by venue id")
+            return
+        problem = check_pricing_value(path, value)
+        if problem:
+            raise PricingValidationError(problem)
+
+    def feed(self, chunk):
+        self.text += chunk
+        for ch in chunk:
+            # Tolerate a markdown fence around the JSON, like parse_json_response
+            if not self._started:
+                if self._fence:
+                    self._fence = ch != '\n'
+                    continue
+                if ch in ' \t\r\n':
+                    continue
+                if ch == '`':
+                    self._fence = True
+                    continue
+                self._started = True
+            if self._stream.done:
+                if ch not in ' \t\r\n`':
+                    raise PricingValidationError(f"unexpected text after the JSON: {ch!r}")
+                continue
+            try:
+                self._stream.feed(ch)
+            except PricingValidationError:
+                raise
+            except ValueError as e:
+                raise PricingValidationError(str(e)) from None
+
+    def finish(self):
+        """The parsed response, once the stream has ended; raises PricingValidationError if it is incomplete or invalid"""
+        try:
+            self._stream.finish()
+        except ValueError as e:
+            raise PricingValidationError(str(e)) from None
+        data = parse_json_response(self.text)
+        if self.batch:
+            if not isinstance(data, dict):
+                raise PricingValidationError("response is not a JSON object keyed by venue id")
+        elif not is_valid_pricing(data):
+            raise PricingValidationError('response does not match {"periods": [{"courts": [{"schedule": {...}}]}]}')
+        return data
+
+
+def repair_prompt(answer, error, batch=False):
+    """
+    Follow-up for a rejected answer: the answer itself (up to the rejected value, when
+    the stream was aborted), the reason and the value rules, without the page text
+    """
+    answer_format = (BATCH_FORMAT.replace("each VENUE ID above", "each venue id of your previous answer")
+                     if batch else SINGLE_VENUE_FORMAT)
+    return f"""YOUR PREVIOUS ANSWER WAS REJECTED: {error}
+
+PREVIOUS ANSWER (up to where it was rejected):
+{answer}
+
+Correct it and answer again in full, keeping everything else it says. Court types: {', '.join(COURT_TYPES)}.
+Surfaces: {', '.join(SURFACES)}. Schedule keys: "<day>:<from hour>-<to hour>", day one of *, {', '.join(DAY_NAMES)}.
+Prices: {MIN_PRICE}-{MAX_PRICE} PLN per hour, as strings.
+
+{answer_format}"""
@@ -0,0 +1,148 @@
+"""
+Content-addressed cache of LLM extractions.
+
+Most clubs change their pricing page once or twice a year, so the extraction
+result is stored on disk next to a hash of the normalized page text. When a
+later crawl returns the same text, the cached pricing data is reused and the
+LLM call is skipped entirely.
+
+One entry is kept per venue (only its latest page matters). Entries older than
+max_age are ignored, and the oldest entries are evicted once the cache grows
+past max_bytes.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache"
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+
+
+def normalize_page_text(text):
+    """Collapse whitespace and case so cosmetic re-renders don't look like changes"""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+def page_digest(text, context=''):
+    """Hash of the normalized page text plus whatever else shaped the extraction"""
+    h = hashlib.sha256()
+    h.update(context.encode('utf-8'))
+    h.update(b'\0')
+    h.update(normalize_page_text(text).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _safe_name(venue_id):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', venue_id) or '_'
+
+
+class PageCache:
+    """On-disk map of venue id -> (page digest, extracted pricing_data)"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_age_days=DEFAULT_MAX_AGE_DAYS,
+                 max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.dir = Path(cache_dir) / "extractions"
+        self.max_age = max_age_days * 86400 if max_age_days is not None else None
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, venue_id):
+        return self.dir / f"{_safe_name(venue_id)}.json"
+
+    def _load(self, venue_id):
+        try:
+            with open(self._path(venue_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _within_max_age(self, entry):
+        return self.max_age is None or time.time() - entry.get('stored_at', 0) <= self.max_age
+
+    def has_fresh(self, venue_id):
+        """Whether the venue has an extraction younger than max_age, whichever page it came from"""
+        if not self.enabled:
+            return False
+        entry = self._load(venue_id)
+        return entry is not None and self._within_max_age(entry)
+
+    def get(self, venue_id, digest):
+        """Return cached pricing_data if the venue's page is unchanged, else None"""
+        if not self.enabled:
+            return None
+
+        entry = self._load(venue_id)
+        fresh = entry is not None and entry.get('digest') == digest and self._within_max_age(entry)
+
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return entry['pricing_data'] if fresh else None
+
+    def put(self, venue_id, digest, pricing_data):
+        """Store the latest extraction for a venue"""
+        if not self.enabled:
+            return
+
+        entry = {
+            'venue_id': venue_id,
+            'digest': digest,
+            'stored_at': time.time(),
+            'pricing_data': pricing_data,
+        }
+
+        with self._lock:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(venue_id)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        """Drop the least recently stored entries until the cache fits in max_bytes"""
+        if not self.max_bytes:
+            return
+
+        entries = []
+        for path in self.dir.glob('*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+    def summary(self):
+        """One-line hit/miss report for the run summary"""
+        if not self.enabled:
+            return "disabled"
+        text = f"{self.hits} hits, {self.misses} misses"
+        if self.evictions:
+            text += f", {self.evictions} evicted"
+        return text
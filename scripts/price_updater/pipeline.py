@@ -0,0 +1,263 @@
+"""
+Streaming crawl -> extract -> write pipeline for the price updater.
+
+Crawl workers (one browser each, host-aware via PoliteVenueQueue) push page
+texts into a bounded queue; extraction workers consume it with their own
+concurrency limit, so the browser keeps crawling while the LLM is thinking and
+vice versa. Results are yielded to the caller, which acts as the single writer
+stage applying them to the loaded YAML.
+
+With extract_batch, extraction workers pull up to batch_size crawled venues
+(waiting at most batch_wait seconds for more, or until crawling is done when
+batch_wait is None) and extract them with one call.
+
+The crawl stage may return UNCHANGED (e.g. on HTTP 304) to send a venue straight
+to the writer without an extraction.
+
+Every stage records how long it was busy, so the summary shows which stage is
+the bottleneck.
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from rich.console import Console
+from rich.table import Table
+
+from venue_pool import PoliteVenueQueue, DEFAULT_MIN_HOST_INTERVAL
+
+console = Console()
+
+_DONE = object()
+
+DEFAULT_BATCH_WAIT = 5.0
+
+# Crawl result meaning "pricing page not modified since the last successful run"
+UNCHANGED = object()
+
+
+class StageStats:
+    """Timing counters for one pipeline stage"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.failures = 0
+        self.busy = 0.0
+        self.first_start = None
+        self.last_end = None
+        self._lock = threading.Lock()
+
+    def record(self, start, end, items=1, failures=0):
+        with self._lock:
+            self.items += items
+            self.failures += failures
+            self.busy += end - start
+            self.first_start = start if self.first_start is None else min(self.first_start, start)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    @contextmanager
+    def measure(self, items=1):
+        """Time a block; the block may set result['ok'] = False, or result['failures'] for a batch"""
+        result = {'ok': True}
+        start = time.monotonic()
+        try:
+            yield result
+        finally:
+            failures = result.get('failures', 0 if result['ok'] else items)
+            self.record(start, time.monotonic(), items=items, failures=failures)
+
+    @property
+    def wall(self):
+        if self.first_start is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def utilization(self):
+        """Share of the stage's worker capacity that was actually busy"""
+        if not self.wall:
+            return 0.0
+        return self.busy / (self.wall * self.workers)
+
+
+class VenuePipeline:
+    """Runs crawl and extract stages concurrently and streams results to the caller"""
+
+    def __init__(self, crawl, extract, crawl_workers=1, extract_workers=1, queue_size=4,
+                 min_host_interval=DEFAULT_MIN_HOST_INTERVAL, crawl_context=None,
+                 extract_batch=None, batch_size=1, batch_wait=DEFAULT_BATCH_WAIT):
+        self.crawl = crawl
+        self.extract = extract
+        self.extract_batch = extract_batch
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.crawl_workers = max(1, crawl_workers)
+        self.extract_workers = max(1, extract_workers)
+        self.queue_size = max(1, queue_size)
+        self.min_host_interval = min_host_interval
+        self.crawl_context = crawl_context
+
+        self.stats = {
+            'crawl': StageStats('crawl', self.crawl_workers),
+            'extract': StageStats('extract', self.extract_workers),
+            'write': StageStats('write', 1),
+        }
+
+    def _crawl_worker(self, work, handoff, results):
+        try:
+            with (self.crawl_context() if self.crawl_context else nullcontext()):
+                while True:
+                    venue = work.get()
+                    if venue is None:
+                        break
+                    content = None
+                    with self.stats['crawl'].measure() as outcome:
+                        try:
+                            content = self.crawl(venue)
+                        except Exception as e:
+                            console.print(f"  ❌ {venue.get('name', 'Unknown')}: {str(e)}", style="red")
+                        finally:
+                            work.done(venue)
+                        outcome['ok'] = bool(content)
+
+                    if content is UNCHANGED:
+                        results.put((venue, UNCHANGED))
+                    elif content:
+                        # Blocks while the extraction stage is behind (backpressure)
+                        handoff.put((venue, content))
+                    else:
+                        results.put((venue, None))
+        except Exception as e:
+            console.print(f"  ❌ Crawl worker failed: {str(e)}", style="red")
+            # Fail what this worker would have taken so the writer is never left waiting
+            while True:
+                venue = work.get()
+                if venue is None:
+                    break
+                work.done(venue)
+                results.put((venue, None))
+
+    def _next_batch(self, handoff):
+        """Collect up to batch_size crawled venues; returns (items, crawling_done)"""
+        first = handoff.get()
+        if first is _DONE:
+            return [], True
+
+        items = [first]
+        deadline = None if self.batch_wait is None else time.monotonic() + self.batch_wait
+        while len(items) < self.batch_size:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = handoff.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _extract_batch_worker(self, handoff, results):
+        done = False
+        while not done:
+            items, done = self._next_batch(handoff)
+            if not items:
+                break
+            batch_results = [None] * len(items)
+            with self.stats['extract'].measure(items=len(items)) as outcome:
+                try:
+                    batch_results = self.extract_batch(items)
+                except Exception as e:
+                    console.print(f"  ❌ Batch of {len(items)} venues failed: {str(e)}", style="red")
+                outcome['failures'] = sum(1 for r in batch_results if not r)
+            for (venue, _), pricing_data in zip(items, batch_results):
+                results.put((venue, pricing_data))
+
+    def _extract_worker(self, handoff, results):
+        if self.extract_batch is not None and self.batch_size > 1:
+            self._extract_batch_worker(handoff, results)
+            return
+
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                break
+            venue, content = item
+            pricing_data = None
+            with self.stats['extract'].measure() as outcome:
+                try:
+                    pricing_data = self.extract(venue, content)
+                except Exception as e:
+                    console.print(f"  ❌ {venue.get('name', 'Unknown')}: {str(e)}", style="red")
+                outcome['ok'] = bool(pricing_data)
+            results.put((venue, pricing_data))
+
+    def run(self, venues):
+        """Yield (venue, pricing_data | UNCHANGED | None) for every venue as soon as it is done"""
+        venues = list(venues)
+        if not venues:
+            return
+
+        work = PoliteVenueQueue(venues, min_host_interval=self.min_host_interval)
+        handoff = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue()
+
+        crawlers = [
+            threading.Thread(target=self._crawl_worker, args=(work, handoff, results),
+                             name=f"crawl-{i}", daemon=True)
+            for i in range(min(self.crawl_workers, len(venues)))
+        ]
+        extractors = [
+            threading.Thread(target=self._extract_worker, args=(handoff, results),
+                             name=f"extract-{i}", daemon=True)
+            for i in range(min(self.extract_workers, len(venues)))
+        ]
+
+        def close_handoff():
+            for thread in crawlers:
+                thread.join()
+            for _ in extractors:
+                handoff.put(_DONE)
+
+        for thread in crawlers + extractors:
+            thread.start()
+        closer = threading.Thread(target=close_handoff, name="crawl-closer", daemon=True)
+        closer.start()
+
+        for _ in venues:
+            yield results.get()
+
+        closer.join()
+        for thread in extractors:
+            thread.join()
+
+    def print_summary(self):
+        """Print per-stage timing and point out the bottleneck"""
+        table = Table(title="⏱️  Stage timing", title_justify="left")
+        table.add_column("Stage")
+        table.add_column("Workers", justify="right")
+        table.add_column("Items", justify="right")
+        table.add_column("Failed", justify="right")
+        table.add_column("Busy (s)", justify="right")
+        table.add_column("Avg (s)", justify="right")
+        table.add_column("Utilization", justify="right")
+
+        for stage in self.stats.values():
+            avg = stage.busy / stage.items if stage.items else 0.0
+            table.add_row(
+                stage.name,
+                str(stage.workers),
+                str(stage.items),
+                str(stage.failures),
+                f"{stage.busy:.1f}",
+                f"{avg:.1f}",
+                f"{stage.utilization:.0%}",
+            )
+        console.print(table)
+
+        busiest = max(self.stats.values(), key=lambda s: s.busy / s.workers)
+        if busiest.busy:
+            console.print(f"🐢 Bottleneck: [bold]{busiest.name}[/bold] stage", style="dim")
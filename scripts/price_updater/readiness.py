@@ -0,0 +1,111 @@
+"""
+Event-driven page readiness for the pricing crawler.
+
+Instead of sleeping a fixed 2 s after every load or click, wait_until_ready
+watches the page's main content with a MutationObserver and returns as soon as:
+
+- a price-like pattern ("145 zł") is on the page (after a click: newly appeared
+  and settled for a short moment), or
+- the DOM has stopped changing for quiet_ms, or
+- the ceiling is reached.
+
+Every wait reports how long it took and why it ended, so venues that really need
+longer waits can be tuned with prices_crawler.wait_ceiling_ms / wait_quiet_ms
+in courts.yaml.
+"""
+
+DEFAULT_QUIET_MS = 500
+DEFAULT_PRICE_QUIET_MS = 150
+DEFAULT_CEILING_MS = 5000
+
+_READY_JS = """({quietMs, priceQuietMs, ceilingMs, expectChange}) => new Promise(resolve => {
+    const start = performance.now();
+    const root = document.querySelector('main') || document.querySelector('article') || document.body;
+    const pricePattern = /\\d+(?:[.,]\\d{2})?\\s*(?:zł|pln)/i;
+    const textOf = () => (root ? root.innerText : '') || '';
+    const baseline = textOf();
+
+    let observer = null;
+    let quietTimer = null;
+    let ceilingTimer = null;
+    let changed = false;
+
+    const finish = (reason) => {
+        if (observer) observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(ceilingTimer);
+        resolve({reason, elapsedMs: Math.round(performance.now() - start), changed});
+    };
+
+    // Initial load: prices already rendered, nothing to wait for
+    if (!expectChange && pricePattern.test(baseline)) {
+        finish('price');
+        return;
+    }
+
+    const armQuietTimer = () => {
+        clearTimeout(quietTimer);
+        const text = textOf();
+        const newPrices = text !== baseline && pricePattern.test(text);
+        quietTimer = setTimeout(() => finish(newPrices ? 'price' : 'quiet'), newPrices ? priceQuietMs : quietMs);
+    };
+
+    if (root) {
+        observer = new MutationObserver(() => {
+            changed = true;
+            armQuietTimer();
+        });
+        observer.observe(root, {childList: true, subtree: true, characterData: true, attributes: true});
+    }
+
+    ceilingTimer = setTimeout(() => finish('ceiling'), ceilingMs);
+    armQuietTimer();
+})"""
+
+
+class ReadyWait:
+    """Result of one readiness wait"""
+
+    def __init__(self, label, elapsed_ms, reason):
+        self.label = label
+        self.elapsed_ms = elapsed_ms
+        self.reason = reason
+
+    @property
+    def hit_ceiling(self):
+        return self.reason == 'ceiling'
+
+
+def wait_until_ready(page, label, ceiling_ms=DEFAULT_CEILING_MS, quiet_ms=DEFAULT_QUIET_MS,
+                     expect_change=False):
+    """Wait until the page content is ready; returns a ReadyWait"""
+    options = {
+        'quietMs': quiet_ms,
+        'priceQuietMs': min(DEFAULT_PRICE_QUIET_MS, quiet_ms),
+        'ceilingMs': ceiling_ms,
+        'expectChange': expect_change,
+    }
+    try:
+        result = page.evaluate(_READY_JS, options)
+    except Exception:
+        # The click navigated away and destroyed the execution context: wait for
+        # the new document, then watch it settle
+        page.wait_for_load_state("domcontentloaded", timeout=ceiling_ms)
+        result = page.evaluate(_READY_JS, dict(options, expectChange=False))
+    return ReadyWait(label, result['elapsedMs'], result['reason'])
+
+
+def readiness_options(crawler_options, ceiling_ms=DEFAULT_CEILING_MS):
+    """Wait settings for a venue: the run-wide ceiling, overridable via prices_crawler in courts.yaml"""
+    crawler_options = crawler_options or {}
+    return {
+        'ceiling_ms': int(crawler_options.get('wait_ceiling_ms', ceiling_ms)),
+        'quiet_ms': int(crawler_options.get('wait_quiet_ms', DEFAULT_QUIET_MS)),
+    }
+
+
+def format_waits(waits):
+    """One-line summary of the waits of a crawl, e.g. 'load 0.2s (price), cennik 0.6s (quiet)'"""
+    parts = [f"{w.label} {w.elapsed_ms / 1000:.1f}s ({w.reason})" for w in waits]
+    total = sum(w.elapsed_ms for w in waits) / 1000
+    return f"{total:.1f}s total: " + ", ".join(parts)
@@ -0,0 +1,229 @@
+"""
+Resilience helpers for the price updater.
+
+- RunBudget: a global time budget for the whole run (--time-budget); stages
+  clamp their timeouts to what is left and stop starting new work once it's spent
+- retry_call: jittered exponential backoff for retryable errors (429/5xx,
+  timeouts, dropped connections)
+- CircuitBreaker: after repeated failures on one host (e.g. a booking platform
+  shared by several clubs) further venues on that host are skipped for a while
+- RetryManifest: venues that failed are written to disk so a follow-up run can
+  process just those (--retry-failed)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from rich.console import Console
+
+from page_cache import DEFAULT_CACHE_DIR
+from venue_pool import venue_key
+
+console = Console()
+
+DEFAULT_RETRY_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 30.0
+
+DEFAULT_BREAKER_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN = 300.0
+
+DEFAULT_MANIFEST_PATH = DEFAULT_CACHE_DIR / "retry_manifest.json"
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERROR_NAMES = {
+    # Provider SDKs (anthropic / openai share these names)
+    'RateLimitError', 'APIConnectionError', 'APITimeoutError', 'InternalServerError', 'OverloadedError',
+    # Playwright navigation / wait timeouts
+    'TimeoutError',
+}
+
+# Chromium network errors that are usually transient
+RETRYABLE_NET_ERRORS = (
+    'net::ERR_CONNECTION_RESET', 'net::ERR_CONNECTION_CLOSED', 'net::ERR_CONNECTION_REFUSED',
+    'net::ERR_CONNECTION_TIMED_OUT', 'net::ERR_TIMED_OUT', 'net::ERR_EMPTY_RESPONSE', 'net::ERR_NETWORK_CHANGED',
+)
+
+
+class BudgetExceeded(Exception):
+    """Raised when the run's time budget or a stage deadline is used up"""
+
+
+def is_retryable_error(error):
+    """True for errors worth another attempt: rate limits, server errors, timeouts, dropped connections"""
+    if isinstance(error, BudgetExceeded):
+        return False
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None) or getattr(error, 'code', None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS_CODES:
+        return True
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if any(marker in str(error) for marker in RETRYABLE_NET_ERRORS):
+        return True
+    return any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+
+class RunBudget:
+    """Wall-clock budget for the whole run; None means unlimited"""
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    def remaining(self):
+        if self.seconds is None:
+            return float('inf')
+        return max(0.0, self.seconds - (time.monotonic() - self.started))
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def deadline(self, stage_seconds):
+        """Monotonic deadline for a stage: its own limit, cut short by the run budget"""
+        return time.monotonic() + min(stage_seconds, self.remaining())
+
+
+def seconds_until(deadline):
+    """Time left before a time.monotonic() deadline; raises BudgetExceeded once it has passed"""
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise BudgetExceeded("deadline reached")
+    return left
+
+
+def timeout_ms(deadline, cap_ms):
+    """Playwright timeout that ends at the deadline (never 0, which Playwright reads as 'no timeout')"""
+    return max(1, int(min(cap_ms, seconds_until(deadline) * 1000)))
+
+
+def retry_call(fn, label, deadline=None, attempts=DEFAULT_RETRY_ATTEMPTS,
+               base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, is_retryable=is_retryable_error):
+    """
+    Call fn(), retrying retryable errors with full-jitter exponential backoff.
+
+    deadline is a time.monotonic() value; no attempt or sleep goes past it.
+    The last error is re-raised when attempts or time run out.
+    """
+    for attempt in range(1, attempts + 1):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise BudgetExceeded(f"{label}: deadline reached")
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == attempts or not is_retryable(e):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            console.print(f"  🔁 {label} failed ({type(e).__name__}: {str(e)[:80]}), "
+                          f"retry {attempt}/{attempts - 1} in {delay:.1f}s", style="yellow")
+            time.sleep(delay)
+
+
+class CircuitBreaker:
+    """Per-host breaker: open after `threshold` consecutive failures, probe again after `cooldown` seconds"""
+
+    def __init__(self, threshold=DEFAULT_BREAKER_THRESHOLD, cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = {}
+        self._opened_at = {}
+        self._probing = set()
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        """May a request to this host go ahead? Lets a single probe through once the cooldown has passed"""
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return True
+            if time.monotonic() - opened_at < self.cooldown or host in self._probing:
+                return False
+            self._probing.add(host)
+            return True
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._probing.discard(host)
+
+    def record_failure(self, host):
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if host in self._probing or self._failures[host] >= self.threshold:
+                if host not in self._opened_at or host in self._probing:
+                    console.print(f"  ⛔ Circuit open for {host} after {self._failures[host]} failures", style="red")
+                self._opened_at[host] = time.monotonic()
+            self._probing.discard(host)
+
+    def open_hosts(self):
+        with self._lock:
+            return sorted(self._opened_at)
+
+
+class RetryManifest:
+    """Failed venues of a run, persisted for a follow-up run"""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = Path(path)
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def record(self, venue_data, stage, error):
+        venue_id = venue_key(venue_data)
+        with self._lock:
+            # Keep the first failure: later stages only see its consequences
+            self.failures.setdefault(venue_id, {
+                'name': venue_data.get('name', 'Unknown'),
+                'stage': stage,
+                'error': str(error)[:300],
+            })
+
+    def has(self, venue_data):
+        with self._lock:
+            return venue_key(venue_data) in self.failures
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('venues', {})
+        except (OSError, ValueError):
+            return {}
+
+    def load_ids(self):
+        """Venue ids listed by the previous run's manifest"""
+        return list(self._load())
+
+    def save(self, attempted_ids=()):
+        """
+        Write this run's failures to the manifest.
+
+        Entries of venues this run did not attempt (e.g. a --venue run) are kept;
+        the file is removed once nothing is left to retry.
+        """
+        attempted_ids = set(attempted_ids)
+        venues = {vid: entry for vid, entry in self._load().items() if vid not in attempted_ids}
+        venues.update(self.failures)
+
+        if not venues:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'venues': venues,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,107 @@
+"""
+Request interception for pricing crawls.
+
+The crawler only reads innerText, so images, fonts, media and third-party
+trackers/chat widgets are aborted before they are downloaded. Besides saving
+bandwidth this lets networkidle fire early: analytics beacons otherwise keep the
+network busy right up to the goto timeout.
+
+Stylesheets and first-party scripts are kept - they decide which tab/section is
+visible and therefore what innerText returns.
+
+Venues can re-allow domains or resource types through prices_crawler in
+courts.yaml (allow_domains / allow_resource_types).
+"""
+
+import threading
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = frozenset({'image', 'media', 'font', 'texttrack', 'manifest'})
+
+DEFAULT_BLOCKED_DOMAINS = frozenset({
+    # Analytics / ads
+    'google-analytics.com', 'googletagmanager.com', 'googleadservices.com', 'googlesyndication.com',
+    'doubleclick.net', 'analytics.google.com', 'clarity.ms', 'hotjar.com', 'hotjar.io',
+    'connect.facebook.net', 'facebook.com', 'facebook.net', 'tiktok.com', 'linkedin.com',
+    'yandex.ru', 'mc.yandex.ru', 'bing.com',
+    # Chat widgets / embeds
+    'tawk.to', 'smartsupp.com', 'livechatinc.com', 'tidio.co', 'crisp.chat', 'intercom.io',
+    'youtube.com', 'ytimg.com', 'vimeo.com', 'instagram.com',
+    # Maps and web fonts
+    'maps.googleapis.com', 'maps.gstatic.com', 'fonts.googleapis.com', 'fonts.gstatic.com',
+    'use.typekit.net',
+})
+
+# Rough transfer sizes per blocked resource type, used to estimate bytes saved
+# (an aborted request never tells us its real size)
+ESTIMATED_BYTES = {
+    'image': 60_000,
+    'media': 500_000,
+    'font': 40_000,
+    'script': 50_000,
+    'stylesheet': 20_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+
+def _domain_matches(host, domains):
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+class BlockStats:
+    """Run-wide counters, shared by all crawl workers"""
+
+    def __init__(self):
+        self.blocked = 0
+        self.bytes_saved = 0
+        self.by_type = {}
+        self._lock = threading.Lock()
+
+    def add(self, resource_type):
+        with self._lock:
+            self.blocked += 1
+            self.bytes_saved += ESTIMATED_BYTES.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+            self.by_type[resource_type] = self.by_type.get(resource_type, 0) + 1
+
+    def summary(self):
+        if not self.blocked:
+            return "nothing blocked"
+        types = ", ".join(f"{count} {kind}" for kind, count in sorted(self.by_type.items(), key=lambda i: -i[1]))
+        return f"{self.blocked} requests (~{self.bytes_saved / 1_000_000:.1f} MB saved; {types})"
+
+
+class ResourceFilter:
+    """Aborts requests for a single page according to the blocklist and a venue's allowlist"""
+
+    def __init__(self, stats, crawler_options=None,
+                 blocked_types=DEFAULT_BLOCKED_TYPES, blocked_domains=DEFAULT_BLOCKED_DOMAINS):
+        crawler_options = crawler_options or {}
+        allow_types = set(crawler_options.get('allow_resource_types') or [])
+        allow_domains = set(crawler_options.get('allow_domains') or [])
+
+        self.stats = stats
+        self.blocked_types = set(blocked_types) - allow_types
+        self.blocked_domains = {d for d in blocked_domains if not _domain_matches(d, allow_domains)}
+        self.allow_domains = allow_domains
+        self.blocked = 0
+
+    def should_block(self, url, resource_type):
+        host = (urlparse(url).hostname or '').lower()
+        if self.allow_domains and _domain_matches(host, self.allow_domains):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return _domain_matches(host, self.blocked_domains)
+
+    def _handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked += 1
+            self.stats.add(request.resource_type)
+            route.abort()
+        else:
+            route.continue_()
+
+    def install(self, page):
+        """Start intercepting all requests made by the page"""
+        page.route("**/*", self._handle)
@@ -0,0 +1,131 @@
+"""
+Canonical day x hour view of courts.yaml schedules.
+
+The same prices can be written many ways ('su:00-23' vs 'su:0-23', one
+'*:7-23' rule vs '*:7-15' + '*:15-23', rules in a different order), so
+schedules are compared by expanding them into a grid of 8 day classes x 24
+hours, with exactly the semantics of src/CourtPricingSystem.js:
+
+- rules are applied in order, later rules overwrite earlier ones
+- '*' and '!' apply to every day class (including 'hl'), a day name to that day
+- 'A-B' covers hours A..B-1 and wraps past midnight ('23-6')
+- the price is parsed like parseInt ('145 zł' -> 145)
+
+diff_grids turns two grids into a short, human-readable change report.
+"""
+
+import re
+
+# Same order as DAY_NAMES in CourtPricingSystem.js (index = Date.getDay(), then holidays)
+DAY_NAMES = ('su', 'mo', 'tu', 'we', 'th', 'fr', 'st', 'hl')
+HOURS = 24
+
+# Order used in reports
+REPORT_DAYS = ('mo', 'tu', 'we', 'th', 'fr', 'st', 'su', 'hl')
+
+_LEADING_INT = re.compile(r'\s*([+-]?\d+)')
+
+
+def parse_price(value):
+    """parseInt() of a schedule price; None when it isn't a number"""
+    match = _LEADING_INT.match(str(value))
+    return int(match.group(1)) if match else None
+
+
+def rule_hours(time_range):
+    """Hours covered by 'A-B', walking from A until B and wrapping at 24 like getTimeInRange"""
+    try:
+        start, end = (int(part) for part in str(time_range).split('-'))
+    except ValueError:
+        return []
+    hours = []
+    hour = start
+    # More than 24 steps would never reach `end` (the frontend would loop forever)
+    while hour != end and len(hours) <= HOURS:
+        if hour == 24:
+            hour = 0
+        hours.append(hour)
+        hour += 1
+    return [h for h in hours if 0 <= h < HOURS][:HOURS]
+
+
+def expand_schedule(schedule):
+    """Grid of prices: a tuple per day class in DAY_NAMES order, each with 24 hourly prices (None = no price)"""
+    grid = {day: [None] * HOURS for day in DAY_NAMES}
+    for rule, price in (schedule or {}).items():
+        day, _, time_range = str(rule).partition(':')
+        if day in ('*', '!'):
+            days = DAY_NAMES
+        elif day in DAY_NAMES:
+            days = (day,)
+        else:
+            continue
+        value = parse_price(price)
+        for hour in rule_hours(time_range):
+            for d in days:
+                grid[d][hour] = value
+    return tuple(tuple(grid[day]) for day in DAY_NAMES)
+
+
+def _format_days(days):
+    """['mo', 'tu', 'we', 'th', 'fr', 'su'] -> 'mo-fr,su'"""
+    indexes = sorted(REPORT_DAYS.index(d) for d in days)
+    parts = []
+    run = [indexes[0]]
+    for i in indexes[1:]:
+        if i == run[-1] + 1:
+            run.append(i)
+            continue
+        parts.append(run)
+        run = [i]
+    parts.append(run)
+    return ','.join(
+        REPORT_DAYS[r[0]] if len(r) == 1 else f"{REPORT_DAYS[r[0]]}-{REPORT_DAYS[r[-1]]}"
+        for r in parts
+    )
+
+
+def _format_price(price):
+    return '–' if price is None else str(price)
+
+
+def diff_grids(old_grid, new_grid):
+    """
+    Changes between two grids as short lines, e.g. 'mo-fr 7-15: 145 → 150'.
+
+    Consecutive hours with the same old/new price form one range, and days
+    with identical changes are listed together.
+    """
+    changes = {}
+    for day, old_row, new_row in zip(DAY_NAMES, old_grid, new_grid):
+        hour = 0
+        while hour < HOURS:
+            if old_row[hour] == new_row[hour]:
+                hour += 1
+                continue
+            start, pair = hour, (old_row[hour], new_row[hour])
+            while hour < HOURS and (old_row[hour], new_row[hour]) == pair:
+                hour += 1
+            changes.setdefault((start, hour) + pair, []).append(day)
+
+    lines = []
+    for (start, end, old, new), days in sorted(
+            changes.items(), key=lambda item: (min(REPORT_DAYS.index(d) for d in item[1]), item[0][0])):
+        lines.append(f"{_format_days(days)} {start}-{end}: {_format_price(old)} → {_format_price(new)}")
+    return lines
+
+
+def format_change_report(entries):
+    """Markdown change report, one section per venue and a bullet list per court group"""
+    lines = ["# Price changes", ""]
+    by_venue = {}
+    for entry in entries:
+        by_venue.setdefault(entry['venue'], []).append(entry)
+    for venue, venue_entries in by_venue.items():
+        lines.append(f"## {venue}")
+        for entry in venue_entries:
+            suffix = ' (new period)' if entry['new_period'] else ''
+            lines.append(f"- **{entry['group']}** {entry['period']}{suffix}")
+            lines.extend(f"  - {change}" for change in entry['changes'])
+        lines.append("")
+    return "\n".join(lines)
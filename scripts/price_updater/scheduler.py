@@ -0,0 +1,159 @@
+"""
+Adaptive per-venue polling schedule for --daemon mode.
+
+Each venue has its own polling interval, persisted between runs:
+
+- a page whose extracted pricing changed is polled again after MIN_INTERVAL
+- every check that finds nothing new stretches the interval by GROWTH, up to
+  MAX_INTERVAL (most clubs change prices once or twice a year)
+- a failed check is retried after FAILURE_RETRY without touching the interval
+- a venue whose current price period in courts.yaml ends within EXPIRY_WINDOW
+  days (or that has no current period at all) is polled every MIN_INTERVAL,
+  since that is when new prices get published
+
+Due venues come out of a priority queue ordered by due time, so the daemon
+only crawls what is worth crawling instead of the whole list.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from llm_extraction import pricing_periods
+from page_cache import DEFAULT_CACHE_DIR
+from venue_pool import venue_key
+
+DEFAULT_SCHEDULE_PATH = DEFAULT_CACHE_DIR / "schedule.json"
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+MIN_INTERVAL = 6 * HOUR
+DEFAULT_INTERVAL = DAY
+MAX_INTERVAL = 14 * DAY
+GROWTH = 1.5
+FAILURE_RETRY = HOUR
+EXPIRY_WINDOW = 21
+
+CHANGED = 'changed'
+NO_CHANGE = 'unchanged'
+FAILED = 'failed'
+
+
+def pricing_fingerprint(pricing_data):
+    """Hash of what was extracted (not where it came from), to tell real changes from re-extractions"""
+    payload = json.dumps(
+        [[period['from'], period['to'], period['courts'] or []] for period in pricing_periods(pricing_data)],
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def current_period_end(venue, today):
+    """Earliest end date among the price periods covering today, or None if no period does"""
+    today_str = today.isoformat()
+    ends = []
+    for court in venue.get('courtGroups', venue.get('courts', [])):
+        for period in court.get('prices') or []:
+            if str(period.get('from', '')) <= today_str < str(period.get('to', '')):
+                ends.append(date.fromisoformat(str(period['to'])))
+    return min(ends) if ends else None
+
+
+def expiry_cap(venue, today):
+    """Longest allowed interval given how soon the venue's current prices run out"""
+    end = current_period_end(venue, today)
+    if end is None:
+        return MIN_INTERVAL
+    window_start = end - timedelta(days=EXPIRY_WINDOW)
+    if today >= window_start:
+        return MIN_INTERVAL
+    # Come back no later than the day the expiry window opens
+    return max(MIN_INTERVAL, (window_start - today).days * DAY)
+
+
+class VenueScheduler:
+    """Persisted next-due times and polling intervals per venue"""
+
+    def __init__(self, path=DEFAULT_SCHEDULE_PATH):
+        self.path = Path(path)
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('venues', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'venues': self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def sync(self, venues, now=None):
+        """Add new venues (due immediately) and forget venues that are gone from courts.yaml"""
+        now = time.time() if now is None else now
+        keys = {venue_key(v) for v in venues}
+        for key in keys - set(self.entries):
+            self.entries[key] = {'interval': DEFAULT_INTERVAL, 'next_due': now}
+        for key in set(self.entries) - keys:
+            del self.entries[key]
+
+    def reprioritize(self, venues, now=None, today=None):
+        """Pull next_due forward for venues whose price period is about to run out"""
+        now = time.time() if now is None else now
+        today = date.today() if today is None else today
+        for venue in venues:
+            entry = self.entries.get(venue_key(venue))
+            if entry is None:
+                continue
+            last_checked = entry.get('last_checked', now)
+            entry['next_due'] = min(entry['next_due'], last_checked + expiry_cap(venue, today))
+
+    def due(self, now=None, limit=None):
+        """Venue keys that are due, most overdue first"""
+        now = time.time() if now is None else now
+        heap = [(entry['next_due'], key) for key, entry in self.entries.items() if entry['next_due'] <= now]
+        heapq.heapify(heap)
+        count = len(heap) if limit is None else min(limit, len(heap))
+        return [heapq.heappop(heap)[1] for _ in range(count)]
+
+    def next_due(self):
+        """Earliest next_due over all venues, or None when nothing is scheduled"""
+        return min((entry['next_due'] for entry in self.entries.values()), default=None)
+
+    def record(self, venue, outcome, fingerprint=None, now=None, today=None):
+        """Store the outcome of a check and schedule the next one; returns the delay in seconds"""
+        now = time.time() if now is None else now
+        today = date.today() if today is None else today
+        entry = self.entries.setdefault(venue_key(venue), {'interval': DEFAULT_INTERVAL, 'next_due': now})
+
+        if outcome != FAILED and fingerprint is not None:
+            if entry.get('fingerprint') not in (None, fingerprint):
+                outcome = CHANGED
+            entry['fingerprint'] = fingerprint
+
+        if outcome == FAILED:
+            delay = FAILURE_RETRY
+            entry['failures'] = entry.get('failures', 0) + 1
+        else:
+            if outcome == CHANGED:
+                entry['interval'] = MIN_INTERVAL
+                entry['last_changed'] = now
+            else:
+                entry['interval'] = min(MAX_INTERVAL, entry.get('interval', DEFAULT_INTERVAL) * GROWTH)
+            entry['failures'] = 0
+            delay = min(entry['interval'], expiry_cap(venue, today))
+
+        entry['last_checked'] = now
+        entry['last_outcome'] = outcome
+        entry['next_due'] = now + delay
+        return delay
@@ -0,0 +1,41 @@
+"""
+Pricing seasons and their date windows.
+
+Clubs price by season: winter (indoor courts, tents and balloons, from October)
+and summer (outdoor courts open, from May). The windows are computed from the
+current date rather than written into the code, so extraction prompts and
+default periods roll over to the next season on their own.
+"""
+
+from datetime import date
+
+# Season -> (month, day) it starts; each season ends where the next one starts
+SEASON_STARTS = {'summer': (5, 1), 'winter': (10, 1)}
+
+
+def _starts(today):
+    """Season start dates around today, in order: [(start date, season), ...]"""
+    return sorted(
+        (date(year, month, day), season)
+        for year in range(today.year - 1, today.year + 3)
+        for season, (month, day) in SEASON_STARTS.items()
+    )
+
+
+def season_windows(today=None):
+    """The season running today and the one after it: [(season, from, to), ...] with ISO dates"""
+    today = today or date.today()
+    starts = _starts(today)
+    current = max(i for i, (start, _) in enumerate(starts) if start <= today)
+    return [
+        (starts[i][1], starts[i][0].isoformat(), starts[i + 1][0].isoformat())
+        for i in (current, current + 1)
+    ]
+
+
+def season_window(season, today=None):
+    """(from, to) of a season: the running one, or the next one if it isn't running today"""
+    for name, start, end in season_windows(today):
+        if name == season:
+            return start, end
+    raise ValueError(f"Unknown season: {season}")
@@ -0,0 +1,166 @@
+"""
+Sharded runs: split a full refresh across machines, merge the results afterwards.
+
+One runner is bounded by the Chromium instances its RAM can hold. With
+--shard i/N a runner only processes every N-th venue (round robin over the
+sorted venue ids, so every runner with the same courts.yaml picks the same
+venues), and instead of editing courts.yaml it writes a self-contained
+results file: the extracted pricing of each venue plus provenance (shard,
+provider and model, prompt version, when and from which URL it was
+extracted, and a digest of the venue's courts.yaml entry it was based on).
+
+`update_prices.py merge` then applies all results files to courts.yaml in one
+locked, atomic write. It refuses to write anything when the files conflict:
+two results files for the same shard, files from differently sized runs, two
+different results for one venue, or a venue whose courts.yaml entry changed
+since its shard ran.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from page_cache import DEFAULT_CACHE_DIR
+from scheduler import pricing_fingerprint
+from venue_pool import venue_key
+
+# Bump when the results file layout changes
+RESULTS_FORMAT = 1
+
+
+def parse_shard(value):
+    """argparse type for 'i/N' (1 <= i <= N) -> (i, N)"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 1/4, got {value!r}") from None
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is not between 1 and {count}")
+    return index, count
+
+
+def shard_venues(venues, index, count):
+    """The venues of shard index/count: every count-th venue by sorted id, starting at index"""
+    ids = sorted(venue_key(v) for v in venues)
+    mine = set(ids[index - 1::count])
+    return [v for v in venues if venue_key(v) in mine]
+
+
+def venue_digest(venue):
+    """Hash of a venue's courts.yaml entry, to notice edits made after a shard read it"""
+    payload = json.dumps(venue, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def default_results_path(index, count):
+    return DEFAULT_CACHE_DIR / f"shard-{index}-of-{count}.json"
+
+
+class ShardResults:
+    """Results file of one shard: filled in by the writer thread of a run, saved at its end"""
+
+    def __init__(self, path, index, count):
+        self.path = Path(path)
+        self.index = index
+        self.count = count
+        self.provenance = {}
+        self.venue_ids = []
+        self.venues = {}
+        self._bases = {}
+
+    def start(self, venues, **provenance):
+        """Remember this shard's venues and what their courts.yaml entries looked like"""
+        self.provenance = provenance
+        self.venue_ids = [venue_key(v) for v in venues]
+        self._bases = {venue_key(v): venue_digest(v) for v in venues}
+
+    def add(self, venue, pricing_data, **provenance):
+        venue_id = venue_key(venue)
+        self.venues[venue_id] = {
+            'name': venue.get('name', 'Unknown'),
+            'base': self._bases.get(venue_id),
+            'fingerprint': pricing_fingerprint(pricing_data),
+            'pricing_data': pricing_data,
+            **provenance,
+        }
+
+    def save(self, failures=None):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': RESULTS_FORMAT,
+                'shard': self.index,
+                'count': self.count,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                **self.provenance,
+                'venue_ids': self.venue_ids,
+                'venues': self.venues,
+                'failures': failures or {},
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def load_results(path):
+    """A results file as a dict; OSError when it can't be read, ValueError when it isn't one"""
+    with open(path, 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    if not isinstance(results, dict) or results.get('format') != RESULTS_FORMAT \
+            or not all(key in results for key in ('shard', 'count', 'venues')):
+        raise ValueError(f"not a shard results file of format {RESULTS_FORMAT}")
+    results['path'] = str(path)
+    return results
+
+
+def merge_results(results_files, venues):
+    """
+    Combine loaded results files against the current courts.yaml venues.
+
+    Returns (merged, conflicts, warnings): merged maps venue id -> result entry;
+    nothing should be applied while conflicts is non-empty.
+    """
+    conflicts = []
+    warnings = []
+    merged = {}
+    sources = {}
+    by_shard = {}
+    current = {venue_key(v): v for v in venues}
+
+    counts = {results['count'] for results in results_files}
+    if len(counts) > 1:
+        conflicts.append(f"results come from runs with different shard counts: {sorted(counts)}")
+
+    for results in results_files:
+        shard = results['shard']
+        if shard in by_shard:
+            conflicts.append(f"shard {shard}/{results['count']} appears twice: {by_shard[shard]} and {results['path']}")
+            continue
+        by_shard[shard] = results['path']
+
+        for venue_id, entry in sorted(results['venues'].items()):
+            if venue_id in merged:
+                if merged[venue_id]['fingerprint'] != entry['fingerprint']:
+                    conflicts.append(f"{venue_id}: different results in {sources[venue_id]} and {results['path']}")
+                continue
+            if venue_id not in current:
+                conflicts.append(f"{venue_id}: in {results['path']} but no longer in courts.yaml")
+                continue
+            if entry.get('base') != venue_digest(current[venue_id]):
+                conflicts.append(f"{venue_id}: courts.yaml entry changed since shard {shard} read it")
+                continue
+            merged[venue_id] = entry
+            sources[venue_id] = results['path']
+
+        for venue_id, failure in sorted((results.get('failures') or {}).items()):
+            warnings.append(f"{venue_id}: failed in shard {shard} ({failure.get('stage')}: {failure.get('error')})")
+
+    for count in counts:
+        missing = sorted(set(range(1, count + 1)) - set(by_shard))
+        if missing:
+            warnings.append(f"no results for shard(s) {', '.join(f'{i}/{count}' for i in missing)}; "
+                            "their venues keep their current prices")
+
+    return merged, conflicts, warnings
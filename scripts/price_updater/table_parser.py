@@ -0,0 +1,264 @@
+"""
+Rule-based parser for simple Polish pricing tables.
+
+Many club pages show a plain table such as
+
+    pon–pt 7:00–15:00    145 zł
+    pon–pt 15:00–23:00   175 zł
+    sob–ndz 7–23         145 zł
+
+which doesn't need an LLM at all. parse_pricing_table turns such text into the
+schedule format used in courts.yaml ('*:7-15', 'st:15-23', 'su:7-23', 'hl:...')
+and reports a confidence. The caller only falls back to the LLM when the parse
+is not confident or doesn't cover every court group of the venue.
+"""
+
+import re
+
+from http_fetch import PRICE_PATTERN
+from seasons import season_window, season_windows
+
+MIN_CONFIDENCE = 0.8
+
+WEEKDAYS = ('mo', 'tu', 'we', 'th', 'fr')
+ALL_DAYS = WEEKDAYS + ('st', 'su')
+
+SECTION_HEADER = re.compile(r'^=== (.+) ===$')
+
+# Day expressions, most specific first. Matched on lowercased text.
+DAY_RULES = [
+    (re.compile(r'weekend\w*\s*(?:i|oraz|\+|,)\s*[śs]wi[ęe]t\w*'), ('st', 'su', 'hl')),
+    (re.compile(r'(?:niedz\w*|ndz|nd)\.?\s*(?:i|oraz|\+|,)\s*[śs]wi[ęe]t\w*'), ('su', 'hl')),
+    (re.compile(r'codziennie|ca[łl]y tydzie[ńn]|pon\w*\.?\s*[-–—]\s*(?:niedz\w*|ndz|nd)\.?'), ALL_DAYS),
+    (re.compile(r'(?:pon\w*|pn)\.?\s*(?:[-–—]|do)\s*(?:pt|pi[ąa]t\w*)\.?|dni robocze|dni powszednie'), WEEKDAYS),
+    (re.compile(r'sob\w*\.?\s*(?:[-–—]|i|oraz|,)\s*(?:niedz\w*|ndz|nd)\.?|weekend\w*'), ('st', 'su')),
+    (re.compile(r'[śs]wi[ęe]t\w*|dni [śs]wi[ąa]teczne'), ('hl',)),
+    (re.compile(r'\bsob(?:ota|oty)?\b\.?'), ('st',)),
+    (re.compile(r'\b(?:niedz(?:iela|iele)?|ndz|nd)\b\.?'), ('su',)),
+]
+
+HOUR_RANGE = re.compile(
+    r'(?:od\s*)?\b([01]?\d|2[0-4])(?:[:.](\d{2}))?\s*(?:[-–—]|do)\s*([01]?\d|2[0-4])(?:[:.](\d{2}))?\b'
+)
+BARE_PRICE = re.compile(r'(?<![\d:.])(\d{2,3})(?:[.,]\d{2})?(?![\d:.])')
+HALF_HOUR_HINT = re.compile(r'30\s*min|p[óo][łl]\s*godz|0[,.]5\s*h')
+
+SEASON_WORDS = {
+    'winter': re.compile(r'zim\w*'),
+    'summer': re.compile(r'\blato\b|\blatem\b|letni\w*'),
+}
+
+# Court type keywords -> court group types used in courts.yaml
+TYPE_KEYWORDS = [
+    ('outdoor', re.compile(r'odkryt\w*|outdoor|zewn[ęe]trzn\w*')),
+    ('baloon', re.compile(r'balon\w*|balloon|dome|powietrzn\w*')),
+    ('tent', re.compile(r'namiot\w*|tent')),
+    ('indoor', re.compile(r'\bhal[ai]\w*|\bkryt\w*|indoor')),
+]
+
+
+class ParseResult:
+    """Outcome of a rule-based parse"""
+
+    def __init__(self, pricing_data=None, confidence=0.0, reason=None):
+        self.pricing_data = pricing_data
+        self.confidence = confidence
+        self.reason = reason
+
+    @property
+    def confident(self):
+        return self.pricing_data is not None and self.confidence >= MIN_CONFIDENCE
+
+
+def parse_days(text):
+    """Day classes mentioned in a line, or None"""
+    lowered = text.lower()
+    for pattern, days in DAY_RULES:
+        if pattern.search(lowered):
+            return days
+    return None
+
+
+def parse_court_type(text):
+    """Court group type a line refers to (by keyword), or None"""
+    lowered = text.lower()
+    for court_type, pattern in TYPE_KEYWORDS:
+        if pattern.search(lowered):
+            return court_type
+    return None
+
+
+def _parse_hours(text):
+    match = HOUR_RANGE.search(text)
+    if not match:
+        return None
+    start, start_min, end, end_min = match.groups()
+    # Half-hour boundaries can't be expressed in courts.yaml schedules
+    if (start_min and start_min != '00') or (end_min and end_min != '00'):
+        return None
+    start, end = int(start), int(end)
+    if start == end or start > 24:
+        return None
+    return start % 24, end, match.end()
+
+
+def _parse_price(text, after=0):
+    tail = text[after:]
+    match = PRICE_PATTERN.search(tail)
+    if match:
+        price = int(re.match(r'\d+', match.group(0)).group(0))
+    else:
+        match = BARE_PRICE.search(tail)
+        if not match:
+            return None
+        price = int(match.group(1))
+    if HALF_HOUR_HINT.search(text.lower()):
+        price *= 2
+    return price if 20 <= price <= 1000 else None
+
+
+class _Section:
+    def __init__(self, court_type):
+        self.court_type = court_type
+        self.rows = []
+        self.unparsed = 0
+
+
+def _parse_sections(text):
+    """Split text into sections by court type and collect (days, start, end, price) rows"""
+    sections = [_Section(None)]
+    days = None
+    pending = None
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        header = SECTION_HEADER.match(line)
+        court_type = parse_court_type(header.group(1) if header else line)
+        has_price_token = bool(PRICE_PATTERN.search(line))
+        hours = _parse_hours(line)
+        line_days = parse_days(line)
+
+        # A short line naming a court type starts a new section ("Hala", "=== Balon ===")
+        if court_type and (header or (not hours and not has_price_token and len(line) <= 40)):
+            sections.append(_Section(court_type))
+            days, pending = None, None
+            continue
+
+        section = sections[-1]
+        if line_days:
+            days = line_days
+
+        if hours:
+            price = _parse_price(line, after=hours[2])
+            if price is not None and days:
+                section.rows.append((days, hours[0], hours[1], price))
+                pending = None
+            elif days:
+                # Label and price in separate cells/lines: "pon-pt 7-15" then "145 zł"
+                pending = (days, hours[0], hours[1])
+            elif has_price_token:
+                section.unparsed += 1
+        elif has_price_token:
+            price = _parse_price(line)
+            if pending and price is not None:
+                section.rows.append(pending + (price,))
+                pending = None
+            else:
+                # Prices without hours (passes, lessons, "sobota 150 zł") can't be placed safely
+                section.unparsed += 1
+
+    return [s for s in sections if s.rows or s.unparsed]
+
+
+def rows_to_schedule(rows):
+    """
+    Build a courts.yaml schedule. Whole-week rows become '*' rules and go first so
+    later day rules override them; any other row gets one rule per day, since '*'
+    would also price the weekend hours it doesn't list. Holidays are priced like
+    Sunday unless the table lists them.
+    """
+    ordered = {day: [] for day in ('*',) + ALL_DAYS + ('hl',)}
+    for days, start, end, price in rows:
+        day_set = set(days)
+        if set(ALL_DAYS) <= day_set:
+            ordered['*'].append((start, end, price))
+            day_set -= set(ALL_DAYS)
+        for day in ALL_DAYS + ('hl',):
+            if day in day_set:
+                ordered[day].append((start, end, price))
+    if not ordered['hl'] and not ordered['*']:
+        ordered['hl'] = list(ordered['su'])
+
+    schedule = {}
+    for day, ranges in ordered.items():
+        for start, end, price in ranges:
+            schedule[f"{day}:{start}-{end}"] = str(price)
+    return schedule
+
+
+def _covers_week(rows):
+    """Weekdays, Saturday and Sunday must all be priced for a schedule to be complete"""
+    covered = set()
+    for days, _, _, _ in rows:
+        covered.update(days)
+    return set(ALL_DAYS) <= covered
+
+
+def parse_pricing_table(text, venue_data, today=None):
+    """Try to build pricing_data for a venue without an LLM"""
+    lowered = (text or '').lower()
+    seasons = {name for name, pattern in SEASON_WORDS.items() if pattern.search(lowered)}
+    if len(seasons) > 1:
+        return ParseResult(reason="page lists several seasons")
+    # A page that doesn't name its season shows the current prices
+    season = seasons.pop() if seasons else season_windows(today)[0][0]
+    season_from, season_to = season_window(season, today)
+
+    sections = _parse_sections(text or '')
+    rows_total = sum(len(s.rows) for s in sections)
+    if not rows_total:
+        return ParseResult(reason="no price rows recognized")
+
+    unparsed_total = sum(s.unparsed for s in sections)
+    confidence = rows_total / (rows_total + unparsed_total)
+
+    by_type = {}
+    untyped = []
+    for section in sections:
+        if section.court_type:
+            by_type.setdefault(section.court_type, []).extend(section.rows)
+        else:
+            untyped.extend(section.rows)
+
+    court_groups = venue_data.get('courtGroups', venue_data.get('courts', []))
+    # Outdoor courts are closed in winter
+    closed_types = {'outdoor'} if season == 'winter' else set()
+    priced_types = {c.get('type') for c in court_groups if c.get('type') not in closed_types}
+
+    # One unlabeled table can only be attributed when there is one priced court type
+    if untyped and len(priced_types) == 1:
+        only_type = next(iter(priced_types))
+        by_type.setdefault(only_type, untyped)
+
+    courts = []
+    for court in court_groups:
+        court_type = court.get('type')
+        if court_type in closed_types:
+            schedule = {}
+        else:
+            rows = by_type.get(court_type)
+            if not rows:
+                return ParseResult(confidence=confidence, reason=f"no prices found for {court_type} courts")
+            if not _covers_week(rows):
+                return ParseResult(confidence=confidence, reason=f"{court_type} prices don't cover the whole week")
+            schedule = rows_to_schedule(rows)
+        courts.append({'type': court_type, 'surface': court.get('surface'), 'schedule': schedule})
+
+    pricing_data = {
+        'periods': [{'season': season, 'from': season_from, 'to': season_to, 'courts': courts}],
+        'source': 'parser',
+    }
+    return ParseResult(pricing_data, confidence=confidence)
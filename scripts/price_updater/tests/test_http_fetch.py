@@ -0,0 +1,53 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from http_fetch import StaticFetcher
+from page_cache import PageCache
+
+PAGE = "<html><body><p>Hala 100 zł</p><p>Weekend 120 zł</p><p>Wieczór 140 zł</p></body></html>"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = PAGE.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def url():
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/cennik"
+    server.shutdown()
+
+
+def test_not_modified_only_while_the_cached_extraction_is_fresh(tmp_path, url):
+    fetcher = StaticFetcher(cache_dir=tmp_path)
+    assert fetcher.fetch('alpha', url).text
+    fetcher.commit('alpha')
+
+    cache = PageCache(cache_dir=tmp_path, max_age_days=30)
+    cache.put('alpha', 'digest', {'periods': []})
+    assert fetcher.fetch('alpha', url, conditional=cache.has_fresh('alpha')).not_modified
+
+    path = tmp_path / 'extractions' / 'alpha.json'
+    entry = json.loads(path.read_text())
+    entry['stored_at'] = time.time() - 31 * 86400
+    path.write_text(json.dumps(entry))
+    result = fetcher.fetch('alpha', url, conditional=cache.has_fresh('alpha'))
+    assert not result.not_modified and result.text
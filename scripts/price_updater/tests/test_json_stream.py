@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from json_stream import JsonStream
+from llm_extraction import PricingStreamValidator, PricingValidationError, repair_prompt
+
+DOCUMENT = {'periods': [{'season': 'winter', 'courts': [
+    {'type': 'indoor', 'surface': 'hard', 'schedule': {'*:7-15': '145', 'st:7-23': 'zł "145"'}},
+]}], 'ok': True, 'n': -1.5, 'none': None, 'empty': [{}, []]}
+
+
+def collect(text, chunk_size):
+    values = []
+    stream = JsonStream(lambda path, value: values.append((path, value)))
+    for i in range(0, len(text), chunk_size):
+        stream.feed(text[i:i + chunk_size])
+    stream.finish()
+    return values
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1000])
+def test_values_are_reported_with_their_paths_whatever_the_chunking(chunk_size):
+    values = collect(json.dumps(DOCUMENT, indent=1), chunk_size)
+
+    assert (('periods', 0, 'courts', 0, 'schedule', '*:7-15'), '145') in values
+    assert (('periods', 0, 'courts', 0, 'schedule', 'st:7-23'), 'zł "145"') in values
+    assert (('ok',), True) in values
+    assert (('n',), -1.5) in values
+    assert (('none',), None) in values
+    assert len(values) == 8
+
+
+def test_top_level_literal_is_flushed_by_finish():
+    assert collect('42', 1) == [((), 42)]
+
+
+@pytest.mark.parametrize('text', ['{"periods": [', '{"a": "unterminated', '{"a": 1', '"abc'])
+def test_truncated_document_fails_on_finish(text):
+    stream = JsonStream()
+    stream.feed(text)
+    with pytest.raises(ValueError, match='ends early'):
+        stream.finish()
+
+
+@pytest.mark.parametrize('text', ['{"a" 1}', '{"a": 1]', '[1,, 2]', '{a: 1}', '{"a": tru}'])
+def test_syntax_errors_are_raised_as_they_arrive(text):
+    stream = JsonStream()
+    with pytest.raises(ValueError):
+        stream.feed(text)
+        stream.finish()
+
+
+def test_bad_value_aborts_the_stream_early():
+    text = '{"periods": [{"season": "spring", "courts": []}]}'
+    validator = PricingStreamValidator()
+
+    with pytest.raises(PricingValidationError, match='unknown season'):
+        for i, ch in enumerate(text):
+            validator.feed(ch)
+
+    assert i == text.index('spring') + len('spring')
+
+
+def test_fenced_response_is_accepted():
+    validator = PricingStreamValidator()
+    for chunk in ['```json\n{"periods": [{"season": "win', 'ter", "courts": []}]}', '\n```']:
+        validator.feed(chunk)
+
+    assert validator.finish() == {'periods': [{'season': 'winter', 'courts': []}]}
+
+
+def test_truncated_response_is_rejected():
+    validator = PricingStreamValidator()
+    validator.feed('```json\n{"periods": [{"season": "winter", "courts": [')
+
+    with pytest.raises(PricingValidationError, match='ends early'):
+        validator.finish()
+
+
+def test_text_after_the_json_is_rejected():
+    validator = PricingStreamValidator()
+    with pytest.raises(PricingValidationError, match='after the JSON'):
+        validator.feed('{"periods": []} I hope this helps')
+
+
+def test_repair_quotes_the_rejected_answer():
+    validator = PricingStreamValidator()
+    with pytest.raises(PricingValidationError) as rejected:
+        validator.feed('{"periods": [{"season": "winter", "courts": [{"type": "hall"')
+
+    prompt = repair_prompt(validator.text, rejected.value)
+
+    assert validator.text in prompt and str(rejected.value) in prompt
+    assert 'PRICING PAGE CONTENT' not in prompt
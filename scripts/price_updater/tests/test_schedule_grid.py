@@ -0,0 +1,40 @@
+from schedule_grid import diff_grids, expand_schedule, format_change_report, rule_hours
+
+
+def test_equivalent_spellings_are_no_change():
+    old = expand_schedule({'*:7-23': '60', 'su:00-23': '50'})
+    new = expand_schedule({'*:7-15': '60', '*:15-23': '60 zł', 'su:0-23': '50'})
+
+    assert old == new
+    assert diff_grids(old, new) == []
+
+
+def test_rule_order_matters():
+    # A later '*' rule overwrites the Sunday rule before it, like in CourtPricingSystem.js
+    assert expand_schedule({'su:0-23': '50', '*:7-23': '60'}) != expand_schedule({'*:7-23': '60', 'su:0-23': '50'})
+
+
+def test_real_change_is_reported_compactly():
+    old = expand_schedule({'*:7-15': '145', '*:15-23': '175', 'st:7-23': '145', 'su:7-23': '145'})
+    new = expand_schedule({'*:7-15': '150', '*:15-23': '175', 'st:7-23': '145', 'su:7-23': '145', 'hl:7-23': '160'})
+
+    assert diff_grids(old, new) == ['mo-fr 7-15: 145 → 150', 'hl 7-15: 145 → 160', 'hl 15-23: 175 → 160']
+
+
+def test_overnight_ranges_wrap():
+    assert rule_hours('23-6') == [23, 0, 1, 2, 3, 4, 5]
+    assert rule_hours('7-7') == []
+    assert rule_hours('x') == []
+
+    assert diff_grids(expand_schedule({'!:23-6': '50'}), expand_schedule({'!:23-6': '55'})) == [
+        'mo-hl 0-6: 50 → 55', 'mo-hl 23-24: 50 → 55']
+
+
+def test_change_report_lists_new_periods():
+    report = format_change_report([{
+        'venue': 'Alpha Club', 'group': 'indoor/hard', 'period': '2026-10-01 → 2027-05-01',
+        'new_period': True, 'changes': ['mo-hl 7-23: – → 150'],
+    }])
+
+    assert 'Alpha Club' in report
+    assert 'mo-hl 7-23: – → 150' in report
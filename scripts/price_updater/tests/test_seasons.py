@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from seasons import season_window, season_windows
+
+
+@pytest.mark.parametrize('today, expected', [
+    (date(2026, 4, 30), [('winter', '2025-10-01', '2026-05-01'), ('summer', '2026-05-01', '2026-10-01')]),
+    (date(2026, 5, 1), [('summer', '2026-05-01', '2026-10-01'), ('winter', '2026-10-01', '2027-05-01')]),
+    (date(2026, 10, 1), [('winter', '2026-10-01', '2027-05-01'), ('summer', '2027-05-01', '2027-10-01')]),
+    # Across the year rollover the winter that started in October is still running
+    (date(2026, 12, 31), [('winter', '2026-10-01', '2027-05-01'), ('summer', '2027-05-01', '2027-10-01')]),
+    (date(2027, 1, 1), [('winter', '2026-10-01', '2027-05-01'), ('summer', '2027-05-01', '2027-10-01')]),
+])
+def test_running_and_next_season(today, expected):
+    assert season_windows(today) == expected
+
+
+def test_season_window_is_the_running_or_the_next_one():
+    assert season_window('winter', date(2027, 1, 15)) == ('2026-10-01', '2027-05-01')
+    assert season_window('summer', date(2027, 1, 15)) == ('2027-05-01', '2027-10-01')
+
+
+def test_unknown_season():
+    with pytest.raises(ValueError):
+        season_window('spring', date(2027, 1, 15))
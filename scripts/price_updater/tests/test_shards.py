@@ -0,0 +1,101 @@
+import argparse
+import json
+
+import pytest
+
+from shards import (
+    ShardResults, load_results, merge_results, parse_shard, shard_venues, venue_digest,
+)
+
+VENUES = [{'id': venue_id, 'name': venue_id.title(), 'courtGroups': []}
+          for venue_id in ('delta', 'alpha', 'echo', 'charlie', 'bravo')]
+
+
+def pricing(price):
+    return {'periods': [{'season': 'winter', 'from': '2026-10-01', 'to': '2027-05-01', 'courts': [
+        {'type': 'indoor', 'surface': 'hard', 'schedule': {'*:7-23': str(price)}}]}]}
+
+
+def run_shard(tmp_path, index, count, venues=VENUES, price=150):
+    """Results file of one shard that extracted every one of its venues"""
+    mine = shard_venues(venues, index, count)
+    results = ShardResults(tmp_path / f"shard-{index}-of-{count}.json", index, count)
+    results.start(mine, provider='stub')
+    for venue in mine:
+        results.add(venue, pricing(price))
+    results.save()
+    return load_results(results.path)
+
+
+def test_parse_shard():
+    assert parse_shard('2/4') == (2, 4)
+    for bad in ('0/4', '5/4', '2', 'a/b'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(bad)
+
+
+def test_shards_partition_the_venues_by_sorted_id():
+    shards = [[v['id'] for v in shard_venues(VENUES, i, 2)] for i in (1, 2)]
+
+    assert sorted(shards[0]) == ['alpha', 'charlie', 'echo']
+    assert sorted(shards[1]) == ['bravo', 'delta']
+    # Same picks whatever order courts.yaml lists the venues in
+    assert shard_venues(list(reversed(VENUES)), 1, 2) == list(reversed(shard_venues(VENUES, 1, 2)))
+
+
+def test_merge_combines_all_shards(tmp_path):
+    merged, conflicts, warnings = merge_results([run_shard(tmp_path, i, 3) for i in (1, 2, 3)], VENUES)
+
+    assert conflicts == [] and warnings == []
+    assert sorted(merged) == sorted(v['id'] for v in VENUES)
+    assert merged['alpha']['pricing_data'] == pricing(150)
+
+
+def test_missing_shard_is_a_warning(tmp_path):
+    merged, conflicts, warnings = merge_results([run_shard(tmp_path, 1, 2)], VENUES)
+
+    assert conflicts == []
+    assert sorted(merged) == ['alpha', 'charlie', 'echo']
+    assert warnings == ['no results for shard(s) 2/2; their venues keep their current prices']
+
+
+def test_same_shard_twice_conflicts(tmp_path):
+    first = run_shard(tmp_path, 1, 2)
+    again = dict(first, path='elsewhere.json')
+
+    _, conflicts, _ = merge_results([first, again, run_shard(tmp_path, 2, 2)], VENUES)
+
+    assert conflicts == [f"shard 1/2 appears twice: {first['path']} and elsewhere.json"]
+
+
+def test_different_shard_counts_conflict(tmp_path):
+    _, conflicts, _ = merge_results([run_shard(tmp_path, 1, 2), run_shard(tmp_path, 1, 3)], VENUES)
+
+    assert "different shard counts: [2, 3]" in conflicts[0]
+
+
+def test_venue_edited_since_its_shard_ran_conflicts(tmp_path):
+    results = [run_shard(tmp_path, i, 2) for i in (1, 2)]
+    edited = [dict(v, address='new address') if v['id'] == 'bravo' else v for v in VENUES]
+
+    merged, conflicts, _ = merge_results(results, edited)
+
+    assert conflicts == ["bravo: courts.yaml entry changed since shard 2 read it"]
+    assert venue_digest(edited[4]) != venue_digest(VENUES[4])
+
+
+@pytest.mark.parametrize('content', ['[1]', '{"format": 1', '{"format": 99, "shard": 1, "count": 1, "venues": {}}'])
+def test_bad_results_files_raise_value_error(tmp_path, content):
+    path = tmp_path / 'results.json'
+    path.write_text(content)
+
+    with pytest.raises(ValueError):
+        load_results(path)
+
+
+def test_results_file_round_trip(tmp_path):
+    results = run_shard(tmp_path, 2, 2)
+
+    assert json.loads((tmp_path / 'shard-2-of-2.json').read_text())['provider'] == 'stub'
+    assert results['venue_ids'] == ['delta', 'bravo']
+    assert results['venues']['bravo']['base'] == venue_digest(VENUES[4])
@@ -0,0 +1,107 @@
+from datetime import date
+
+from schedule_grid import DAY_NAMES, expand_schedule
+from table_parser import parse_days, parse_pricing_table, rows_to_schedule
+
+INDOOR = {'courtGroups': [{'type': 'indoor', 'surface': 'hard'}]}
+WINTER_DAY = date(2026, 11, 3)
+
+
+def only_period(result):
+    [period] = result.pricing_data['periods']
+    return period
+
+
+def test_plain_table():
+    text = """Cennik kortów
+pon–pt 7:00–15:00    145 zł
+pon–pt 15:00–23:00   175 zł
+sob–ndz 7–23         145 zł
+"""
+    result = parse_pricing_table(text, INDOOR, today=WINTER_DAY)
+
+    assert result.confident
+    period = only_period(result)
+    assert (period['season'], period['from'], period['to']) == ('winter', '2026-10-01', '2027-05-01')
+    assert period['courts'] == [{'type': 'indoor', 'surface': 'hard', 'schedule': {
+        **{f'{day}:7-15': '145' for day in ('mo', 'tu', 'we', 'th', 'fr')},
+        **{f'{day}:15-23': '175' for day in ('mo', 'tu', 'we', 'th', 'fr')},
+        'st:7-23': '145', 'su:7-23': '145', 'hl:7-23': '145'}}]
+
+
+def test_sections_split_cells_and_closed_outdoor_courts():
+    text = """Sezon zimowy
+=== Hala ===
+Dni robocze
+7-15
+130 zł
+15-23
+160 zł
+Weekend i święta 8-22 140 zł
+=== Korty odkryte ===
+"""
+    venue = {'courtGroups': [{'type': 'indoor', 'surface': 'hard'}, {'type': 'outdoor', 'surface': 'clay'}]}
+
+    # The page names its season, so it wins over the season running today
+    result = parse_pricing_table(text, venue, today=date(2026, 6, 3))
+
+    assert result.confident
+    period = only_period(result)
+    assert period['from'] == '2026-10-01'
+    assert period['courts'] == [
+        {'type': 'indoor', 'surface': 'hard',
+         'schedule': {**{f'{day}:7-15': '130' for day in ('mo', 'tu', 'we', 'th', 'fr')},
+                      **{f'{day}:15-23': '160' for day in ('mo', 'tu', 'we', 'th', 'fr')},
+                      'st:8-22': '140', 'su:8-22': '140', 'hl:8-22': '140'}},
+        {'type': 'outdoor', 'surface': 'clay', 'schedule': {}},
+    ]
+
+
+def test_half_hour_prices_are_doubled():
+    text = "codziennie 7-23 40 zł / 30 min"
+
+    period = only_period(parse_pricing_table(text, INDOOR, today=WINTER_DAY))
+
+    assert period['courts'][0]['schedule'] == {'*:7-23': '80'}
+
+
+def test_incomplete_week_is_left_to_the_llm():
+    text = "pon-pt 7-15 100 zł\nsobota 150 zł\nkarnet 10 wejść 900 zł"
+
+    result = parse_pricing_table(text, INDOOR, today=WINTER_DAY)
+
+    assert not result.confident
+    assert result.pricing_data is None
+    assert "whole week" in result.reason
+
+
+def test_several_seasons_are_left_to_the_llm():
+    result = parse_pricing_table("Cennik zima i lato\npon-ndz 7-23 100 zł", INDOOR, today=WINTER_DAY)
+
+    assert result.pricing_data is None
+    assert result.reason == "page lists several seasons"
+
+
+def test_day_expressions():
+    assert parse_days("Pon.-Pt.") == ('mo', 'tu', 'we', 'th', 'fr')
+    assert parse_days("sobota, niedziela") == ('st', 'su')
+    assert parse_days("niedziele i święta") == ('su', 'hl')
+    assert parse_days("weekend oraz święta") == ('st', 'su', 'hl')
+    assert parse_days("7-15") is None
+
+
+def test_rows_to_schedule_puts_whole_week_rules_first():
+    rows = [(('st',), 8, 20, 120), (('mo', 'tu', 'we', 'th', 'fr', 'st', 'su'), 7, 23, 100)]
+
+    assert list(rows_to_schedule(rows)) == ['*:7-23', 'st:8-20']
+
+
+def test_weekday_rows_do_not_price_the_weekend():
+    weekdays = ('mo', 'tu', 'we', 'th', 'fr')
+    rows = [(weekdays, 7, 23, 100), (('st', 'su'), 8, 20, 120)]
+
+    grid = dict(zip(DAY_NAMES, expand_schedule(rows_to_schedule(rows))))
+
+    assert grid['mo'][7:23] == (100,) * 16
+    for day in ('st', 'su', 'hl'):
+        assert grid[day][7] is None and grid[day][8:20] == (120,) * 12 and grid[day][20:23] == (None,) * 3
@@ -0,0 +1,17 @@
+import json
+
+from tracing import Tracer
+
+
+def test_reset_drops_the_kept_spans_but_not_the_span_log(tmp_path):
+    log = tmp_path / 'spans.jsonl'
+    tracer = Tracer(log)
+    for cycle in range(3):
+        with tracer.venue('Alpha'), tracer.span('crawl', cycle=cycle):
+            pass
+        assert len(tracer.spans) == 1
+        tracer.reset()
+    tracer.close()
+
+    assert tracer.spans == []
+    assert [json.loads(line)['attrs']['cycle'] for line in log.read_text().splitlines()] == [0, 1, 2]
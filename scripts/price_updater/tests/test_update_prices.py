@@ -0,0 +1,18 @@
+import pytest
+
+from update_prices import openai_response_format
+
+
+@pytest.mark.parametrize('model', [
+    'gpt-4o', 'gpt-4o-mini', 'gpt-4o-2024-08-06', 'gpt-4.1', 'gpt-4.1-nano',
+    'gpt-5', 'gpt-5-mini', 'o1', 'o3', 'o3-mini', 'o4-mini',
+])
+def test_structured_output_models_get_the_pricing_schema(model):
+    assert openai_response_format(model)['type'] == 'json_schema'
+
+
+@pytest.mark.parametrize('model', [
+    'gpt-4', 'gpt-4-0613', 'gpt-4-turbo', 'gpt-4-1106-preview', 'gpt-3.5-turbo', 'gpt-4o1', 'omni-moderation-latest',
+])
+def test_other_models_get_json_mode(model):
+    assert openai_response_format(model) == {'type': 'json_object'}
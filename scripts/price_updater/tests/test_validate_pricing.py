@@ -0,0 +1,47 @@
+import yaml
+
+from validate_pricing import COURTS_YAML, ERROR, new_errors, validate_venues
+
+
+def venue(*schedules):
+    return {'id': 'alpha', 'courtGroups': [{'type': 'indoor', 'surface': 'hard', 'prices': [
+        {'from': f'{2020 + i}-10-01', 'to': f'{2021 + i}-05-01', 'schedule': schedule}
+        for i, schedule in enumerate(schedules)
+    ]}]}
+
+
+def errors(*schedules):
+    return [(issue.check, issue.message) for issue in validate_venues([venue(*schedules)]) if issue.severity == ERROR]
+
+
+def test_checked_in_courts_yaml_has_no_gaps():
+    venues = yaml.safe_load(COURTS_YAML.read_text(encoding='utf-8'))
+
+    assert [str(issue) for issue in validate_venues(venues) if issue.check == 'gap'] == []
+
+
+def test_overnight_rate_is_not_a_gap():
+    assert errors({'*:7-23': '100', '!:23-6': '50'}) == []
+
+
+def test_hole_in_the_opening_hours_is_a_gap():
+    assert errors({'*:7-12': '100', '*:14-22': '120'}) == [
+        ('gap', 'mo,tu,we,th,fr,st,su,hl 12-14: no price inside opening hours')]
+
+
+def test_same_selector_overlap_is_a_conflict():
+    assert [check for check, _ in errors({'*:7-15': '100', '*:12-22': '120'})] == ['conflict']
+
+
+def test_known_error_in_an_unchanged_period_is_not_new():
+    broken = {'*:7-12': '100', '*:14-22': '120'}
+
+    assert new_errors([venue(broken)], [venue(broken)]) == []
+    assert len(new_errors([venue({'*:7-22': '100'})], [venue({'*:7-22': '100'}, broken)])) == 1
+
+
+def test_new_period_next_to_one_with_the_same_error_is_new():
+    broken = {'*:7-12': '100', '*:14-22': '120'}
+
+    (issue,) = new_errors([venue(broken)], [venue(broken, broken)])
+    assert (issue.check, issue.period) == ('gap', '2021-10-01 → 2022-05-01')
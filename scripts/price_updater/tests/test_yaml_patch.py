@@ -0,0 +1,110 @@
+import copy
+
+import yaml
+
+from yaml_patch import patch_venues
+
+COURTS = """\
+# Courts of Wrocław
+- id: alpha
+  name: Alpha Club
+  courtGroups:
+  - surface: clay
+    type: outdoor
+    courts:
+    - '1'
+    prices:
+    - from: '2025-05-01'
+      to: '2025-10-01'
+      schedule:
+        '*:7-22': '60'
+    - from: '2025-10-01'
+      to: '2026-05-01'
+      closed: true
+- id: beta
+  name: Beta Club
+  courtGroups:
+  - surface: hard
+    type: indoor
+    courts:
+    - '1'
+    prices:
+    - from: '2025-10-01'
+      to: '2026-05-01'
+      schedule:
+        '*:7-23': '140'  # weekday and weekend alike
+"""
+
+
+def load(text):
+    return {venue['id']: venue for venue in yaml.safe_load(text)}
+
+
+def changed(venue, edit):
+    """(base, venue with edit applied) like the updater hands them to save_yaml"""
+    new = copy.deepcopy(venue)
+    edit(new['courtGroups'][0]['prices'])
+    return venue, new
+
+
+def test_schedule_edit_only_touches_that_schedule():
+    base, new = changed(load(COURTS)['alpha'], lambda prices: prices[0].update(schedule={'*:7-22': '65'}))
+
+    patched = patch_venues(COURTS, [(base, new)])
+
+    assert load(patched)['alpha'] == new
+    assert patched == COURTS.replace("'*:7-22': '60'", "'*:7-22': '65'")
+
+
+def test_appended_period_goes_after_the_existing_ones():
+    period = {'from': '2026-05-01', 'to': '2026-10-01', 'schedule': {'*:7-22': '70'}}
+    base, new = changed(load(COURTS)['alpha'], lambda prices: prices.append(period))
+
+    patched = patch_venues(COURTS, [(base, new)])
+
+    assert load(patched)['alpha']['courtGroups'][0]['prices'][-1] == period
+    assert patched.startswith(COURTS[:COURTS.index("- id: beta")].rstrip('\n'))
+    assert patched.endswith(COURTS[COURTS.index("- id: beta"):])
+
+
+def test_shared_anchor_falls_back_to_full_dump():
+    text = COURTS.replace("    prices:\n    - from: '2025-05-01'", "    prices: &alpha\n    - from: '2025-05-01'", 1) \
+        + """\
+- id: gamma
+  name: Gamma Club
+  courtGroups:
+  - surface: clay
+    type: outdoor
+    courts:
+    - '1'
+    prices: *alpha
+"""
+    base, new = changed(load(text)['alpha'], lambda prices: prices[0].update(schedule={'*:7-22': '65'}))
+
+    patched = patch_venues(text, [(base, new)])
+
+    venues = load(patched)
+    assert venues['alpha'] == new
+    # gamma still has the prices it had: the in-place edit would have changed them through the alias
+    assert venues['gamma']['courtGroups'][0]['prices'][0]['schedule'] == {'*:7-22': '60'}
+    assert '# Courts of Wrocław' not in patched
+
+
+def test_edits_made_on_disk_during_the_run_are_kept():
+    base, new = changed(load(COURTS)['alpha'], lambda prices: prices[0].update(schedule={'*:7-22': '65'}))
+    # While the run was going, someone reopened alpha's winter period and raised beta's prices
+    on_disk = COURTS.replace("      closed: true\n", "      schedule:\n        '*:7-22': '120'\n") \
+        .replace("'*:7-23': '140'", "'*:7-23': '150'")
+
+    venues = load(patch_venues(on_disk, [(base, new)]))
+
+    assert venues['alpha']['courtGroups'][0]['prices'][0]['schedule'] == {'*:7-22': '65'}
+    assert venues['alpha']['courtGroups'][0]['prices'][1]['schedule'] == {'*:7-22': '120'}
+    assert venues['beta'] == load(on_disk)['beta']
+
+
+def test_period_edited_on_disk_and_by_the_run_is_not_saved():
+    base, new = changed(load(COURTS)['alpha'], lambda prices: prices[0].update(schedule={'*:7-22': '65'}))
+    on_disk = COURTS.replace("'*:7-22': '60'", "'*:7-22': '62'")
+
+    assert patch_venues(on_disk, [(base, new)]) == on_disk
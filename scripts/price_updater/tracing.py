@@ -0,0 +1,195 @@
+"""
+Per-venue tracing for the price updater.
+
+Every phase of a venue's update (browser launch, page load, cennik click,
+switch clicks and waits, text extraction, LLM request, JSON parse, apply) is
+recorded as a span with its venue, thread, duration and attributes such as
+prompt size or token counts. Spans nest per thread, so a wait inside a switch
+click knows its parent.
+
+Finished spans can be streamed as JSON lines (--trace), written as a Chrome
+trace (--chrome-trace, open in chrome://tracing or ui.perfetto.dev for a
+flamegraph-style timeline), and are summarized at the end of a run with
+p50/p95 per phase and per LLM provider. A daemon summarizes and resets them
+after every cycle, so memory doesn't grow with its uptime.
+"""
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list, q in 0..1"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+class Tracer:
+    """Thread-safe span recorder; spans are kept in memory for the summary and optionally streamed"""
+
+    def __init__(self, jsonl_path=None):
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._jsonl = open(jsonl_path, 'a', encoding='utf-8') if jsonl_path else None
+        # Wall-clock origin, so span timestamps are comparable across threads and runs
+        self._epoch = time.time() - time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @property
+    def current_venue(self):
+        return getattr(self._local, 'venue', None)
+
+    @contextmanager
+    def venue(self, name):
+        """Attribute spans opened on this thread inside the block to a venue"""
+        previous = self.current_venue
+        self._local.venue = name
+        try:
+            yield
+        finally:
+            self._local.venue = previous
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Record a phase; yields its attribute dict, which the block may fill in"""
+        stack = self._stack()
+        record = {
+            'name': name,
+            'venue': self.current_venue,
+            'thread': threading.current_thread().name,
+            'parent': stack[-1]['name'] if stack else None,
+            'attrs': attrs,
+        }
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            record['ts'] = round(self._epoch + start, 6)
+            record['duration_ms'] = round((end - start) * 1000, 3)
+            self._finish(record)
+
+    def annotate(self, **attrs):
+        """Add attributes to the innermost open span of this thread (no-op outside a span)"""
+        stack = self._stack()
+        if stack:
+            stack[-1]['attrs'].update(attrs)
+
+    def _finish(self, record):
+        with self._lock:
+            self.spans.append(record)
+            if self._jsonl is not None:
+                self._jsonl.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                self._jsonl.flush()
+
+    def reset(self):
+        """Drop the spans kept for the summary (the JSON lines already written stay)"""
+        with self._lock:
+            self.spans = []
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+    def write_chrome_trace(self, path):
+        """Write all spans in the Chrome trace event format (complete events, one row per thread)"""
+        with self._lock:
+            spans = list(self.spans)
+        threads = {}
+        events = []
+        for span in spans:
+            tid = threads.setdefault(span['thread'], len(threads) + 1)
+            events.append({
+                'name': span['name'],
+                'cat': span['venue'] or 'run',
+                'ph': 'X',
+                'ts': round(span['ts'] * 1e6),
+                'dur': round(span['duration_ms'] * 1000),
+                'pid': 1,
+                'tid': tid,
+                'args': {'venue': span['venue'], **span['attrs']},
+            })
+        events.extend(
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+            for name, tid in threads.items()
+        )
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False, default=str)
+
+    def print_summary(self):
+        """End-of-run latency table per phase, and latency/token usage per LLM provider"""
+        with self._lock:
+            spans = list(self.spans)
+        if not spans:
+            return
+
+        phases = {}
+        for span in spans:
+            phases.setdefault(span['name'], []).append(span)
+
+        table = Table(title="🔬 Phase latency", title_justify="left")
+        for column in ("Phase", "Count", "Errors", "p50 (ms)", "p95 (ms)", "Max (ms)", "Total (s)"):
+            table.add_column(column, justify="left" if column == "Phase" else "right")
+        for name, items in sorted(phases.items(), key=lambda item: -sum(s['duration_ms'] for s in item[1])):
+            durations = [s['duration_ms'] for s in items]
+            table.add_row(
+                name,
+                str(len(items)),
+                str(sum(1 for s in items if 'error' in s['attrs'])),
+                f"{percentile(durations, 0.5):.0f}",
+                f"{percentile(durations, 0.95):.0f}",
+                f"{max(durations):.0f}",
+                f"{sum(durations) / 1000:.1f}",
+            )
+        console.print(table)
+
+        providers = {}
+        for span in phases.get('llm', []):
+            providers.setdefault(span['attrs'].get('provider', '?'), []).append(span)
+        if not providers:
+            return
+
+        table = Table(title="🤖 LLM requests", title_justify="left")
+        for column in ("Provider", "Requests", "Errors", "p50 (s)", "p95 (s)",
+                       "Prompt chars", "Input tokens", "Output tokens"):
+            table.add_column(column, justify="left" if column == "Provider" else "right")
+        for provider, items in sorted(providers.items()):
+            durations = [s['duration_ms'] / 1000 for s in items]
+            table.add_row(
+                provider,
+                str(len(items)),
+                str(sum(1 for s in items if 'error' in s['attrs'])),
+                f"{percentile(durations, 0.5):.1f}",
+                f"{percentile(durations, 0.95):.1f}",
+                str(sum(s['attrs'].get('prompt_chars', 0) for s in items)),
+                str(sum(s['attrs'].get('input_tokens', 0) for s in items)),
+                str(sum(s['attrs'].get('output_tokens', 0) for s in items)),
+            )
+        console.print(table)
+
+
+def maybe_span(tracer, name, **attrs):
+    """tracer.span(...) when there is a tracer, otherwise a context that yields a throwaway dict"""
+    if tracer is None:
+        return nullcontext(attrs)
+    return tracer.span(name, **attrs)
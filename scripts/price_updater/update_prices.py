@@ -6,37 +6,214 @@ This script crawls tennis club pricing pages and uses AI (Claude or GPT) to extr
 and update pricing information in courts.yaml.
 
 Usage:
-    python update_prices.py [--dry-run] [--venue "Venue Name"] [--provider anthropic|openai]
+    python update_prices.py [--dry-run] [--venue "Venue Name"] [--provider anthropic|openai] [--concurrency N]
+    python update_prices.py --shard 1/4          # on each of 4 runners, then:
+    python update_prices.py merge .cache/shard-*-of-4.json
 
 Options:
     --dry-run       Show changes without applying them
     --venue         Update only a specific venue (by name)
     --provider      LLM provider: 'anthropic' (Claude) or 'openai' (GPT) - auto-detected if not specified
+    --recycle-after Relaunch the shared browser after this many pages (0 = never)
+    --concurrency   Number of venues to crawl in parallel
+    --llm-concurrency  Number of concurrent LLM extractions
+    --queue-size    Crawled pages that may wait for extraction
+    --no-cache      Always call the LLM, even when a pricing page has not changed
+    --max-age       Days a cached extraction stays valid
+    --browser-only  Skip the plain HTTP fast path and always crawl with a headless browser
+    --wait-ceiling-ms  Longest wait for page content to settle after a load or click
+    --no-block      Let the browser download images, fonts, media and trackers
+    --no-parser     Skip the rule-based table parser and always ask the LLM
+    --batch-size    Extract up to N venues with a single LLM request
+    --batch-wait    Seconds to wait for more crawled venues to fill a batch
+    --batch-api     Submit all extractions through the provider's asynchronous batch API
+    --min-host-interval  Seconds between two visits to the same host
+    --change-report Write a Markdown report of the price changes to this file
+    --daemon        Keep running and poll each venue on its own adaptive schedule
+    --daemon-tick   Seconds between schedule checks in --daemon mode
+    --max-per-cycle Due venues processed per schedule check in --daemon mode
+    --schedule      Where the --daemon polling schedule is kept
+    --time-budget   Stop starting new work after this many seconds
+    --retry-failed  Only process venues that failed in the previous run
+    --retry-manifest  Where failed venues are recorded
+    --trace         Append a JSON line per traced phase to this file
+    --chrome-trace  Write all spans as a Chrome trace file
+    --record        Save every venue's crawl to a replayable archive
+    --replay        Extract from recorded crawls instead of the network (implies --dry-run and --no-cache)
+    --shard         Process only shard i of N and write its results file instead of courts.yaml
+    --shard-output  Where the --shard results file is written
+
+    merge RESULTS...  Apply the results files of all shards to courts.yaml in one pass
 """
 
 import argparse
+import copy
 import json
 import os
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
 import yaml
-from playwright.sync_api import sync_playwright
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 from rich.syntax import Syntax
 
+from browser_session import BrowserSession, DEFAULT_RECYCLE_AFTER
+from content_reduce import reduce_snapshots
+from crawl_archive import CrawlArchive, DEFAULT_ARCHIVE_DIR, STATIC, BROWSER
+from llm_extraction import (
+    MAX_TOKENS_PER_VENUE, PRICING_SCHEMA, BATCH_PRICING_SCHEMA, PricingStreamValidator, PricingValidationError,
+    extraction_instructions, single_venue_prompt, batch_prompt, repair_prompt,
+    is_valid_pricing, pricing_periods,
+)
+from http_fetch import StaticFetcher, requires_js
+from page_cache import PageCache, page_digest, DEFAULT_MAX_AGE_DAYS
+from pipeline import VenuePipeline, UNCHANGED, DEFAULT_BATCH_WAIT
+from readiness import wait_until_ready, readiness_options, format_waits, DEFAULT_CEILING_MS
+from resilience import (
+    RunBudget, CircuitBreaker, RetryManifest, BudgetExceeded, DEFAULT_MANIFEST_PATH,
+    retry_call, seconds_until, timeout_ms,
+)
+from resource_filter import ResourceFilter, BlockStats
+from scheduler import (
+    VenueScheduler, pricing_fingerprint, NO_CHANGE, FAILED,
+    DEFAULT_SCHEDULE_PATH,
+)
+from schedule_grid import expand_schedule, diff_grids, format_change_report
+from shards import ShardResults, parse_shard, shard_venues, load_results, merge_results, default_results_path
+from table_parser import parse_pricing_table
+from tracing import Tracer
+from validate_pricing import new_errors, print_issues
+from yaml_patch import patch_venues, file_lock, atomic_write
+from venue_pool import venue_key, venue_host, DEFAULT_MIN_HOST_INTERVAL
+
 console = Console()
 
+# Bump whenever the extraction prompt changes so cached extractions are not reused
+PROMPT_VERSION = 5
+
+ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+
+# Anthropic answers through this tool, whose input schema is the pricing schema
+PRICING_TOOL = "record_pricing"
+
+# OpenAI model families with JSON schema response formats (structured outputs);
+# any other model gets plain JSON mode
+OPENAI_STRUCTURED_OUTPUT_MODELS = ('gpt-4o', 'gpt-4.1', 'gpt-5', 'o1', 'o3', 'o4')
+
+# Provider batch APIs finish within 24h; usually much sooner
+BATCH_API_POLL_SECONDS = 30
+BATCH_API_MAX_WAIT = 24 * 3600
+
+# Per-venue stage deadlines (retries included), cut short by --time-budget
+CRAWL_DEADLINE = 120
+EXTRACT_DEADLINE = 300
+NAVIGATION_TIMEOUT_MS = 30000
+
+# --daemon: how often the schedule is checked, and how many due venues one check processes
+DEFAULT_DAEMON_TICK = 300
+DEFAULT_DAEMON_MAX_PER_CYCLE = 5
+
+# Court-type switches clicked per page at most
+MAX_SWITCH_CLICKS = 8
+
+MAIN_TEXT_JS = """() => {
+    // Try to find main content areas
+    const selectors = ['main', 'article', '.content', '#content', 'body'];
+    for (const sel of selectors) {
+        const elem = document.querySelector(sel);
+        if (elem) return elem.innerText;
+    }
+    return document.body.innerText;
+}"""
+
+
+def openai_response_format(model, schema=PRICING_SCHEMA):
+    """Response format for an OpenAI model: the pricing schema if the model supports structured outputs"""
+    if any(model == name or model.startswith(f"{name}-") for name in OPENAI_STRUCTURED_OUTPUT_MODELS):
+        # Schedules are free-form rule -> price maps, which strict schemas can't express
+        return {"type": "json_schema", "json_schema": {"name": "pricing", "schema": schema, "strict": False}}
+    return {"type": "json_object"}
+
+
+def _anthropic_text(content):
+    """Answer of an Anthropic message: the pricing tool's input as JSON, or the text of a plain reply"""
+    for block in content:
+        if block.type == "tool_use":
+            return json.dumps(block.input, ensure_ascii=False)
+    return "".join(block.text for block in content if block.type == "text").strip()
+
+
+def _timeout_kwargs(timeout):
+    """Per-request timeout for the provider SDKs; None keeps the SDK default (None there means 'never')"""
+    return {} if timeout is None else {'timeout': timeout}
+
 
 class PriceUpdater:
-    def __init__(self, dry_run=False, provider=None):
+    def __init__(self, dry_run=False, provider=None, recycle_after=DEFAULT_RECYCLE_AFTER,
+                 concurrency=1, llm_concurrency=None, queue_size=None,
+                 min_host_interval=DEFAULT_MIN_HOST_INTERVAL, page_cache=None, static_fetch=True,
+                 wait_ceiling_ms=DEFAULT_CEILING_MS, block_resources=True, use_parser=True,
+                 batch_size=1, batch_wait=DEFAULT_BATCH_WAIT, batch_api=False,
+                 time_budget=None, retry_manifest=None, change_report_path=None,
+                 tracer=None, chrome_trace_path=None, record_archive=None, replay_archive=None,
+                 shard_results=None, use_llm=True):
         self.dry_run = dry_run
+        self.recycle_after = recycle_after
+        self.concurrency = max(1, concurrency)
+        self.llm_concurrency = max(1, llm_concurrency or self.concurrency)
+        self.queue_size = max(1, queue_size or 2 * self.llm_concurrency)
+        self.min_host_interval = min_host_interval
+        self.page_cache = page_cache if page_cache is not None else PageCache()
+        self.wait_ceiling_ms = wait_ceiling_ms
+        self.block_resources = block_resources
+        self.block_stats = BlockStats()
+        self.use_parser = use_parser
+        self.parser_attempts = 0
+        self.parser_resolved = 0
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.batch_api = batch_api
+        self.batch_requests = 0
+        self.batched_venues = 0
+        self.batch_fallbacks = 0
+        self.llm_repairs = 0
+        self.shard_results = shard_results
+        self.record_archive = record_archive
+        self.replay_archive = replay_archive
+        # A recording needs the page itself, not a 304
+        use_validators = self.page_cache.enabled and record_archive is None
+        self.static_fetcher = StaticFetcher(use_validators=use_validators) if static_fetch else None
+        self.budget = RunBudget(time_budget)
+        self.breaker = CircuitBreaker()
+        self.retry_manifest = retry_manifest if retry_manifest is not None else RetryManifest()
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.chrome_trace_path = chrome_trace_path
+
+        # Each worker thread keeps its own browser session
+        self._local = threading.local()
+        self._sessions = []
+        self._stats_lock = threading.Lock()
+        # Venues whose prices were changed since the last save, and what changed (writer thread only)
+        self._dirty_venues = {}
+        # Each venue as it was read from (or last written to) courts.yaml: saves only write what differs
+        self._base_venues = {}
+        self.change_report = []
+        self.change_report_path = change_report_path
         # Script is in scripts/price_updater/, so go up to project root
         self.yaml_path = Path(__file__).parent.parent.parent / "src" / "assets" / "courts.yaml"
 
+        # Merging shard results applies extractions made elsewhere and needs no LLM
+        if not use_llm:
+            self.provider = provider
+            self.llm_client = None
+            return
+
         # Auto-detect provider if not specified
         if provider is None:
             provider = self._detect_provider()
@@ -71,7 +248,8 @@ class PriceUpdater:
                     console.print("❌ ANTHROPIC_API_KEY not set!", style="red")
                     sys.exit(1)
                 console.print("🤖 Using Anthropic (Claude Sonnet 4)", style="cyan")
-                return Anthropic(api_key=api_key)
+                # Retries are done by retry_call, which respects the run's time budget
+                return Anthropic(api_key=api_key, max_retries=0)
             except ImportError:
                 console.print("❌ Anthropic package not installed! Run: pip install anthropic", style="red")
                 sys.exit(1)
@@ -84,7 +262,7 @@ class PriceUpdater:
                     sys.exit(1)
                 model_name = os.environ.get("OPENAI_MODEL", "gpt-5")
                 console.print(f"🤖 Using OpenAI ({model_name})", style="cyan")
-                return OpenAI(api_key=api_key)
+                return OpenAI(api_key=api_key, max_retries=0)
             except ImportError:
                 console.print("❌ OpenAI package not installed! Run: pip install openai", style="red")
                 sys.exit(1)
@@ -95,29 +273,87 @@ class PriceUpdater:
     def load_yaml(self):
         """Load the courts.yaml file"""
         with open(self.yaml_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            data = yaml.safe_load(f)
+        for venue in data if isinstance(data, list) else [data]:
+            key = venue_key(venue)
+            if key not in self._dirty_venues:
+                self._base_venues[key] = copy.deepcopy(venue)
+        return data
 
     def save_yaml(self, data):
-        """Save data back to courts.yaml"""
-        with open(self.yaml_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
-
-    def crawl_page(self, url):
-        """Crawl a pricing page and return HTML content"""
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page()
-
-                console.print(f"  🌐 Loading [cyan]{url}[/cyan]")
-                page.goto(url, wait_until="networkidle", timeout=30000)
+        """
+        Write changed prices back to courts.yaml; returns False when there was nothing to write.
+
+        Only the periods changed since the venues were read are patched into the
+        file as it is on disk now, under a lock, via an atomic rename, so edits
+        made to courts.yaml during the run are kept.
+        """
+        if not self._dirty_venues:
+            return False
 
-                # Wait a bit for any dynamic content
-                page.wait_for_timeout(2000)
+        with file_lock(self.yaml_path):
+            with open(self.yaml_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            patched = patch_venues(text, [(self._base_venues.get(key), venue)
+                                          for key, venue in self._dirty_venues.items()])
+            if patched != text:
+                atomic_write(self.yaml_path, patched)
+        for key, venue in self._dirty_venues.items():
+            self._base_venues[key] = copy.deepcopy(venue)
+        self._dirty_venues.clear()
+        return patched != text
+
+    @contextmanager
+    def _browser_page(self):
+        """Get a page from the run's shared browser, or a one-off browser outside of run()"""
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            with session.new_page() as page:
+                yield page
+            return
+
+        with BrowserSession(recycle_after=self.recycle_after, tracer=self.tracer) as session:
+            with session.new_page() as page:
+                yield page
+
+    def crawl_page(self, url, crawler_options=None, deadline=None, capture=None):
+        """
+        Crawl a pricing page and return its text; retries transient failures and raises the last one.
+
+        capture, if given, is filled with the raw texts the content was built from
+        ('base' and the per-switch 'snapshots') for the crawl archive.
+        """
+        if deadline is None:
+            deadline = self.budget.deadline(CRAWL_DEADLINE)
+        return retry_call(
+            lambda: self._crawl_page_once(url, crawler_options, deadline, capture),
+            label=f"Loading {url}",
+            deadline=deadline,
+        )
 
-                # Try to click on "cennik" (pricing) menu if it exists
-                # This handles SPAs where pricing is hidden behind navigation
-                try:
+    def _crawl_page_once(self, url, crawler_options, deadline, capture=None):
+        """One browser attempt at a pricing page"""
+        wait_options = readiness_options(crawler_options, ceiling_ms=self.wait_ceiling_ms)
+        wait_options['ceiling_ms'] = timeout_ms(deadline, wait_options['ceiling_ms'])
+        waits = []
+        with self._browser_page() as page:
+            # Only text matters: skip images, fonts, media and trackers
+            resource_filter = None
+            if self.block_resources:
+                resource_filter = ResourceFilter(self.block_stats, crawler_options)
+                resource_filter.install(page)
+
+            console.print(f"  🌐 Loading [cyan]{url}[/cyan]")
+            with self.tracer.span('goto', url=url):
+                page.goto(url, wait_until="networkidle", timeout=timeout_ms(deadline, NAVIGATION_TIMEOUT_MS))
+
+            # Wait for any dynamic content to render
+            waits.append(self._wait_until_ready(page, "load", **wait_options))
+
+            # Try to click on "cennik" (pricing) menu if it exists
+            # This handles SPAs where pricing is hidden behind navigation
+            try:
+                with self.tracer.span('cennik_click') as span:
                     cennik_clicked = page.evaluate("""() => {
                         // Look for elements containing "cennik" (case insensitive)
                         const elements = Array.from(document.querySelectorAll('a, button, [role="button"], .menu-item, .nav-item'));
@@ -134,83 +370,101 @@ class PriceUpdater:
                         return false;
                     }""")
 
+                    span['clicked'] = cennik_clicked
                     if cennik_clicked:
                         console.print("  📋 Found 'cennik' menu, clicking...", style="cyan")
                         # Wait for pricing content to load
-                        page.wait_for_timeout(2000)
-                        # Wait for any network activity to settle
-                        try:
-                            page.wait_for_load_state("networkidle", timeout=5000)
-                        except:
-                            pass  # Continue even if timeout
-                except Exception as e:
-                    console.print(f"  ⚠️  Could not click cennik: {str(e)}", style="yellow")
-
-                # Now try to detect and click through court-type switches (indoor/dome/tent/outdoor)
-                # This handles sites like Matchpoint that have separate pricing for each court type
-                all_content = []
-                try:
-                    # Try to find court type switches/tabs - use comprehensive selector
-                    court_types = page.evaluate("""() => {
-                        // Look for all potentially clickable elements
-                        const selectors = [
-                            'button', '[role="button"]', 'input[type="radio"]', 'input[type="checkbox"]',
-                            '.tab', '.switch', '.btn', '.toggle', 'label', 'a', 'div[onclick]', 'span[onclick]'
-                        ];
-
-                        const elements = [];
-                        selectors.forEach(sel => {
-                            elements.push(...Array.from(document.querySelectorAll(sel)));
-                        });
-
-                        // Filter for court-type related elements
-                        const courtTypeElements = elements.filter(el => {
-                            const text = (el.textContent || '').toLowerCase().trim();
-                            const label = (el.getAttribute('aria-label') || '').toLowerCase();
-                            const name = (el.getAttribute('name') || '').toLowerCase();
-                            const id = (el.getAttribute('id') || '').toLowerCase();
-                            const classNames = (el.className || '').toLowerCase();
-
-                            // Look for court type keywords
-                            const keywords = ['indoor', 'hala', 'dome', 'balon', 'namiot',
-                                            'tent', 'outdoor', 'odkryte', 'court', 'kort'];
-
-                            return keywords.some(keyword =>
-                                text.includes(keyword) || label.includes(keyword) ||
-                                name.includes(keyword) || id.includes(keyword) ||
-                                classNames.includes(keyword)
-                            );
-                        });
-
-                        // Return unique elements with useful info
-                        const seen = new Set();
-                        return courtTypeElements
-                            .filter(el => {
-                                const key = el.textContent.trim() + el.tagName;
-                                if (seen.has(key)) return false;
-                                seen.add(key);
-                                return el.textContent.trim().length > 0;
-                            })
-                            .map(el => ({
-                                text: el.textContent.trim(),
-                                tag: el.tagName,
-                                type: el.type || null,
-                                id: el.id || null,
-                                className: el.className || null
-                            }));
-                    }""")
+                        waits.append(self._wait_until_ready(page, "cennik", expect_change=True, **wait_options))
+            except Exception as e:
+                console.print(f"  ⚠️  Could not click cennik: {str(e)}", style="yellow")
 
-                    # Debug: show what was found
-                    if court_types and len(court_types) > 0:
-                        console.print(f"  🔍 Found {len(court_types)} potential court type switches:", style="cyan")
-                        for ct in court_types:
-                            console.print(f"      - {ct['text']} ({ct['tag']})", style="dim")
+            # Page as shown before any switch is clicked; snapshots are diffed against it
+            with self.tracer.span('text_extract'):
+                base_content = page.evaluate(MAIN_TEXT_JS)
 
-                        console.print(f"  🔄 Collecting pricing for each court type...", style="cyan")
+            # Now try to detect and click through court-type switches (indoor/dome/tent/outdoor)
+            # This handles sites like Matchpoint that have separate pricing for each court type
+            snapshots = []
+            try:
+                # Try to find court type switches/tabs - use comprehensive selector
+                court_types = page.evaluate("""() => {
+                    // Look for all potentially clickable elements
+                    const selectors = [
+                        'button', '[role="button"]', 'input[type="radio"]', 'input[type="checkbox"]',
+                        '.tab', '.switch', '.btn', '.toggle', 'label', 'a', 'div[onclick]', 'span[onclick]'
+                    ];
+
+                    const elements = [];
+                    selectors.forEach(sel => {
+                        elements.push(...Array.from(document.querySelectorAll(sel)));
+                    });
+
+                    // Filter for court-type related elements
+                    const courtTypeElements = elements.filter(el => {
+                        const text = (el.textContent || '').toLowerCase().trim();
+                        const label = (el.getAttribute('aria-label') || '').toLowerCase();
+                        const name = (el.getAttribute('name') || '').toLowerCase();
+                        const id = (el.getAttribute('id') || '').toLowerCase();
+                        const classNames = (el.className || '').toLowerCase();
+
+                        // Look for court type keywords
+                        const keywords = ['indoor', 'hala', 'dome', 'balon', 'namiot',
+                                        'tent', 'outdoor', 'odkryte', 'court', 'kort'];
+
+                        // Switches are short labels; long texts are whole sections or menus
+                        if (text.length > 40) return false;
+
+                        // Links that navigate to another page are not switches
+                        if (el.tagName === 'A') {
+                            const href = (el.getAttribute('href') || '').trim();
+                            if (href && !href.startsWith('#') && !href.startsWith('javascript')) return false;
+                        }
 
-                        # Click through each court type and collect content
-                        for i, court_type in enumerate(court_types):
-                            try:
+                        return keywords.some(keyword =>
+                            text.includes(keyword) || label.includes(keyword) ||
+                            name.includes(keyword) || id.includes(keyword) ||
+                            classNames.includes(keyword)
+                        );
+                    });
+
+                    // Return unique elements with useful info (clicks match by text, so dedupe by text)
+                    const seen = new Set();
+                    return courtTypeElements
+                        .filter(el => {
+                            const key = el.textContent.trim();
+                            if (seen.has(key)) return false;
+                            seen.add(key);
+                            return key.length > 0;
+                        })
+                        .map(el => ({
+                            text: el.textContent.trim(),
+                            tag: el.tagName,
+                            type: el.type || null,
+                            id: el.id || null,
+                            className: el.className || null
+                        }));
+                }""")
+
+                # Debug: show what was found
+                if court_types and len(court_types) > MAX_SWITCH_CLICKS:
+                    console.print(f"  ✂️  Limiting to the first {MAX_SWITCH_CLICKS} of {len(court_types)} switches", style="dim")
+                    court_types = court_types[:MAX_SWITCH_CLICKS]
+
+                if court_types and len(court_types) > 0:
+                    console.print(f"  🔍 Found {len(court_types)} potential court type switches:", style="cyan")
+                    for ct in court_types:
+                        console.print(f"      - {ct['text']} ({ct['tag']})", style="dim")
+
+                    console.print(f"  🔄 Collecting pricing for each court type...", style="cyan")
+
+                    # Click through each court type and collect content
+                    for i, court_type in enumerate(court_types):
+                        if time.monotonic() >= deadline:
+                            console.print(f"    ⏰ Crawl deadline reached, skipping {len(court_types) - i} switches",
+                                          style="yellow")
+                            break
+                        try:
+                            with self.tracer.span('switch', text=court_type['text']) as span:
                                 console.print(f"    Attempting to click: {court_type['text']}", style="dim")
 
                                 # Click the switch using exact text match
@@ -237,162 +491,304 @@ class PriceUpdater:
                                     return false;
                                 }}""", court_type["text"])
 
+                                span['clicked'] = clicked
                                 if not clicked:
                                     console.print(f"    ⚠️  Could not click: {court_type['text']}", style="yellow")
                                     continue
 
                                 # Wait for content to update
-                                page.wait_for_timeout(2000)
-
-                                # Wait for any network activity
-                                try:
-                                    page.wait_for_load_state("networkidle", timeout=3000)
-                                except:
-                                    pass
+                                waits.append(self._wait_until_ready(
+                                    page, court_type['text'][:20], expect_change=True, **wait_options
+                                ))
 
                                 # Get content for this court type
-                                type_content = page.evaluate("""() => {
-                                    const selectors = ['main', 'article', '.content', '#content', 'body'];
-                                    for (const sel of selectors) {
-                                        const elem = document.querySelector(sel);
-                                        if (elem) return elem.innerText;
-                                    }
-                                    return document.body.innerText;
-                                }""")
-
-                                all_content.append(f"\n=== {court_type['text']} ===\n{type_content}")
+                                with self.tracer.span('text_extract'):
+                                    type_content = page.evaluate(MAIN_TEXT_JS)
+
+                                snapshots.append((court_type['text'], type_content))
                                 console.print(f"    ✓ Collected pricing for: {court_type['text']}", style="green")
 
-                            except Exception as e:
-                                console.print(f"    ⚠️  Error for {court_type['text']}: {str(e)}", style="yellow")
-                    else:
-                        console.print("  ℹ️  No court type switches detected", style="dim")
+                        except Exception as e:
+                            console.print(f"    ⚠️  Error for {court_type['text']}: {str(e)}", style="yellow")
+                else:
+                    console.print("  ℹ️  No court type switches detected", style="dim")
+
+            except Exception as e:
+                console.print(f"  ⚠️  Could not process court type switches: {str(e)}", style="yellow")
+
+            # Base page plus only what each switch changed
+            with self.tracer.span('text_extract', snapshots=len(snapshots)) as span:
+                if not snapshots:
+                    base_content = page.evaluate(MAIN_TEXT_JS)
+                content, useful_switches = reduce_snapshots(base_content, snapshots)
+                span['chars'] = len(content)
+            if capture is not None:
+                capture.update(base=base_content, snapshots=snapshots)
+            if snapshots:
+                console.print(
+                    f"  ✂️  {len(useful_switches)}/{len(snapshots)} switch clicks changed the page; "
+                    f"sending {len(content)} chars instead of "
+                    f"{sum(len(text) for _, text in snapshots)}",
+                    style="dim",
+                )
+
+            self._report_waits(waits, wait_options)
+            if resource_filter is not None and resource_filter.blocked:
+                console.print(f"  🚫 Blocked {resource_filter.blocked} unneeded requests", style="dim")
+            return content
+
+    def _wait_until_ready(self, page, label, **options):
+        """wait_until_ready, recorded as a 'wait' span"""
+        with self.tracer.span('wait', label=label) as span:
+            wait = wait_until_ready(page, label, **options)
+            span['hit_ceiling'] = wait.hit_ceiling
+        return wait
+
+    def _report_waits(self, waits, wait_options):
+        """Show how long the readiness waits of a crawl actually took"""
+        if not waits:
+            return
+        console.print(f"  ⏱️  Waits: {format_waits(waits)}", style="dim")
+        if any(w.hit_ceiling for w in waits):
+            console.print(
+                f"  ⚠️  Some waits hit the {wait_options['ceiling_ms']} ms ceiling - "
+                "consider raising prices_crawler.wait_ceiling_ms for this venue",
+                style="yellow",
+            )
+
+    def _model_name(self):
+        if self.provider == "anthropic":
+            return ANTHROPIC_MODEL
+        return os.environ.get("OPENAI_MODEL", "gpt-5")
 
-                except Exception as e:
-                    console.print(f"  ⚠️  Could not process court type switches: {str(e)}", style="yellow")
+    def _provider_name(self):
+        if self.provider == "anthropic":
+            return "Claude"
+        return os.environ.get("OPENAI_MODEL", "gpt-5").upper()
+
+    def _ask_llm(self, prompt, max_tokens=MAX_TOKENS_PER_VENUE, batch=False):
+        """
+        Send a user prompt (with the shared extraction instructions) to the configured provider.
+
+        Returns the parsed pricing (venue id -> pricing for a batch). The streamed
+        response is validated as it arrives; an invalid answer is aborted and asked
+        for once more with the validation error and the rejected answer, without
+        crawling again or resending the page.
+        """
+        if self.provider == "anthropic":
+            call = self._call_anthropic
+        elif self.provider == "openai":
+            call = self._call_openai
+        else:
+            raise ValueError(f"Unknown provider: {self.provider}")
+        schema = BATCH_PRICING_SCHEMA if batch else PRICING_SCHEMA
 
-                # Get the main content (or combined content if we clicked through switches)
-                if all_content:
-                    content = "\n\n".join(all_content)
-                else:
-                    content = page.evaluate("""() => {
-                        // Try to find main content areas
-                        const selectors = ['main', 'article', '.content', '#content', 'body'];
-                        for (const sel of selectors) {
-                            const elem = document.querySelector(sel);
-                            if (elem) return elem.innerText;
-                        }
-                        return document.body.innerText;
-                    }""")
+        def attempt(request):
+            validator = PricingStreamValidator(batch=batch)
+            try:
+                with self.tracer.span('llm', provider=self.provider, model=self._model_name(),
+                                      prompt_chars=len(request), repair=request is not prompt) as span:
+                    try:
+                        text = call(request, max_tokens=max_tokens, timeout=seconds_until(deadline),
+                                    schema=schema, on_text=validator.feed)
+                        # Providers that didn't stream still get validated
+                        if not validator.text:
+                            validator.feed(text)
+                    except PricingValidationError:
+                        span['aborted_at_chars'] = len(validator.text)
+                        raise
+                    span['response_chars'] = len(validator.text)
+                with self.tracer.span('json_parse', chars=len(validator.text)):
+                    return validator.finish()
+            except PricingValidationError as e:
+                # The repair request quotes the rejected answer instead of sending the page again
+                e.answer = validator.text
+                raise
+
+        # Rate limits and 5xx are retried with backoff until the stage deadline
+        deadline = self.budget.deadline(EXTRACT_DEADLINE)
+        label = f"{self._provider_name()} request"
+        try:
+            return retry_call(lambda: attempt(prompt), label=label, deadline=deadline)
+        except PricingValidationError as e:
+            console.print(f"  🩹 {self._provider_name()} answer rejected ({e}), asking for a corrected one",
+                          style="yellow")
+            with self._stats_lock:
+                self.llm_repairs += 1
+            repair = repair_prompt(e.answer, e, batch=batch)
+            return retry_call(lambda: attempt(repair), label=label, deadline=deadline)
+
+    def extract_pricing_with_llm(self, venue_name, venue_data, page_content):
+        """Use LLM (Claude or GPT) to extract pricing information from page content"""
+        prompt = single_venue_prompt(venue_name, venue_data, page_content)
+
+        try:
+            console.print(f"  🤖 Asking {self._provider_name()} to extract pricing...", style="yellow")
+            return self._ask_llm(prompt)
 
-                browser.close()
-                return content
         except Exception as e:
-            console.print(f"  ❌ Error crawling {url}: {str(e)}", style="red")
+            console.print(f"  ❌ Error extracting pricing: {str(e)}", style="red")
+            self.retry_manifest.record(venue_data, 'extract', e)
             return None
 
-    def extract_pricing_with_llm(self, venue_name, venue_data, page_content):
-        """Use LLM (Claude or GPT) to extract pricing information from page content"""
+    def extract_pricing_batch_with_llm(self, items):
+        """
+        Extract pricing for several venues with one request.
+
+        items are (venue_id, venue_name, venue_data, page_content). Returns a dict of
+        venue_id -> pricing_data containing only the venues that came back well-formed.
+        """
+        console.print(f"  🤖 Asking {self._provider_name()} to extract pricing for {len(items)} venues at once...",
+                      style="yellow")
+        results = self._ask_llm(batch_prompt(items), max_tokens=MAX_TOKENS_PER_VENUE * len(items), batch=True)
+
+        return {
+            venue_id: results[venue_id]
+            for venue_id, _, _, _ in items
+            if is_valid_pricing(results.get(venue_id))
+        }
 
-        # Build court structure info for context
-        courts_info = []
-        court_groups = venue_data.get('courtGroups', venue_data.get('courts', []))
-        for court in court_groups:
-            court_type = court.get('type', 'unknown')
-            surface = court.get('surface', 'unknown')
-            count = len(court.get('courts', []))
-            courts_info.append(f"- {count}x {court_type} courts, surface: {surface}")
-
-        courts_description = "\n".join(courts_info)
-
-        prompt = f"""You are extracting tennis court pricing information for: {venue_name}
-
-VENUE STRUCTURE:
-{courts_description}
-
-PRICING PAGE CONTENT:
-{page_content[:6000]}
-
-CONTENT FORMAT NOTES:
-- The content may have sections marked with "===" headers for different court types (e.g., "=== Indoor ===" or "=== Dome ===")
-- Each section contains pricing for that specific court type
-- Parse pricing from the appropriate section matching each court type
-
-YOUR TASK:
-Extract the current WINTER season pricing (typically Oct/Nov 2025 - Apr/May 2026).
-
-IMPORTANT RULES:
-1. **OUTDOOR courts are CLOSED in winter** - return empty schedule for outdoor courts
-2. Only extract prices for INDOOR/TENT/BALLOON courts during winter
-3. Prices are typically in PLN per hour
-4. Common time slots: 6-15 (daytime), 15-23 (evening)
-5. Common days: weekdays (mo-fr), weekends (sa, su), holidays (hl)
-6. **If content has section headers (===), match pricing from the correct section to the court type**
-7. Map court type names: "hala" = indoor, "namiot" = tent, "balon" = balloon, "odkryte" = outdoor
-
-Return ONLY a JSON object with this structure:
-{{
-  "season": "winter",
-  "from": "2025-10-01",
-  "to": "2026-05-01",
-  "courts": [
-    {{
-      "type": "indoor/tent/balloon/outdoor",
-      "surface": "clay/hard/carpet/grass",
-      "schedule": {{
-        "*:6-15": "120",
-        "*:15-23": "150",
-        "su:6-23": "130"
-      }}
-    }}
-  ]
-}}
-
-If outdoor courts exist, include them with empty schedule: {{"schedule": {{}}}}
-
-RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
+    def extract_pricing_with_batch_api(self, items):
+        """
+        Extract pricing through the provider's asynchronous batch endpoint (one request per venue).
 
-        try:
-            if self.provider == "anthropic":
-                provider_name = "Claude"
-            else:
-                model_name = os.environ.get("OPENAI_MODEL", "gpt-5")
-                provider_name = model_name.upper()
-            console.print(f"  🤖 Asking {provider_name} to extract pricing...", style="yellow")
+        Same input/output as extract_pricing_batch_with_llm. Blocks while polling for results.
+        """
+        # custom_id must be short and [A-Za-z0-9_-]; venue ids and names don't always qualify
+        prompts = {
+            f"venue-{i}": (venue_id, single_venue_prompt(venue_name, venue_data, page_content))
+            for i, (venue_id, venue_name, venue_data, page_content) in enumerate(items)
+        }
+        console.print(f"  📦 Submitting {len(items)} venues to the {self._provider_name()} batch API...", style="yellow")
 
-            # Call appropriate LLM API
+        with self.tracer.span('batch_api', provider=self.provider, venues=len(items),
+                              prompt_chars=sum(len(prompt) for _, prompt in prompts.values())):
             if self.provider == "anthropic":
-                response_text = self._call_anthropic(prompt)
+                texts = self._run_anthropic_batch({cid: prompt for cid, (_, prompt) in prompts.items()})
             elif self.provider == "openai":
-                response_text = self._call_openai(prompt)
+                texts = self._run_openai_batch({cid: prompt for cid, (_, prompt) in prompts.items()})
             else:
                 raise ValueError(f"Unknown provider: {self.provider}")
 
-            # Try to extract JSON if wrapped in markdown
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
-
-            pricing_data = json.loads(response_text)
-            return pricing_data
-
-        except Exception as e:
-            console.print(f"  ❌ Error extracting pricing: {str(e)}", style="red")
-            return None
+        # Same checks as a streamed answer; an invalid venue is extracted again on its own
+        results = {}
+        for custom_id, text in texts.items():
+            validator = PricingStreamValidator()
+            try:
+                validator.feed(text)
+                results[prompts[custom_id][0]] = validator.finish()
+            except PricingValidationError:
+                continue
+        return results
+
+    def _wait_for_batch(self, retrieve, is_done, describe):
+        """Poll a provider batch until it is done"""
+        started = time.monotonic()
+        batch = retry_call(retrieve, label="Batch status check")
+        while not is_done(batch):
+            if time.monotonic() - started > BATCH_API_MAX_WAIT:
+                raise TimeoutError("batch did not finish in time")
+            if self.budget.expired:
+                raise BudgetExceeded("time budget used up while waiting for the batch")
+            console.print(f"  ⏳ Batch {describe(batch)}, checking again in {BATCH_API_POLL_SECONDS}s", style="dim")
+            time.sleep(BATCH_API_POLL_SECONDS)
+            batch = retry_call(retrieve, label="Batch status check")
+        return batch
+
+    def _run_anthropic_batch(self, prompts):
+        """Message Batches API: returns custom_id -> response text for succeeded requests"""
+        batches = self.llm_client.messages.batches
+        batch = batches.create(requests=[
+            {"custom_id": custom_id, "params": self._anthropic_params(prompt, MAX_TOKENS_PER_VENUE)}
+            for custom_id, prompt in prompts.items()
+        ])
+        self._wait_for_batch(
+            lambda: batches.retrieve(batch.id),
+            lambda b: b.processing_status == "ended",
+            lambda b: f"{b.processing_status} ({b.request_counts.succeeded} done)",
+        )
 
-    def _call_anthropic(self, prompt):
-        """Call Anthropic API"""
-        message = self.llm_client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
-            messages=[{"role": "user", "content": prompt}]
+        texts = {}
+        for entry in batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                texts[entry.custom_id] = _anthropic_text(entry.result.message.content)
+        return texts
+
+    def _run_openai_batch(self, prompts):
+        """OpenAI Batch API: returns custom_id -> response text for succeeded requests"""
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._openai_params(prompt, MAX_TOKENS_PER_VENUE),
+            })
+            for custom_id, prompt in prompts.items()
+        ]
+        input_file = self.llm_client.files.create(
+            file=("pricing_batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = self.llm_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
         )
-        return message.content[0].text.strip()
+        batch = self._wait_for_batch(
+            lambda: self.llm_client.batches.retrieve(batch.id),
+            lambda b: b.status in ("completed", "failed", "expired", "cancelled"),
+            lambda b: b.status,
+        )
+        if not batch.output_file_id:
+            raise RuntimeError(f"batch {batch.status} without output")
+
+        texts = {}
+        for line in self.llm_client.files.content(batch.output_file_id).text.splitlines():
+            entry = json.loads(line)
+            response = entry.get("response") or {}
+            if response.get("status_code") == 200:
+                texts[entry["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+        return texts
+
+    def _anthropic_params(self, prompt, max_tokens, schema=PRICING_SCHEMA):
+        return {
+            "model": ANTHROPIC_MODEL,
+            "max_tokens": max_tokens,
+            # Shared instructions go first and are marked for prompt caching
+            "system": [{
+                "type": "text",
+                "text": extraction_instructions(),
+                "cache_control": {"type": "ephemeral"},
+            }],
+            # The answer has to be a call of the pricing tool, so it always follows the schema
+            "tools": [{
+                "name": PRICING_TOOL,
+                "description": "Record the pricing extracted from the page",
+                "input_schema": schema,
+            }],
+            "tool_choice": {"type": "tool", "name": PRICING_TOOL},
+            "messages": [{"role": "user", "content": prompt}],
+        }
 
-    def _call_openai(self, prompt):
-        """Call OpenAI API"""
+    def _call_anthropic(self, prompt, max_tokens=MAX_TOKENS_PER_VENUE, timeout=None, schema=PRICING_SCHEMA,
+                        on_text=None):
+        """Call Anthropic API, streaming the tool input to on_text as it arrives"""
+        with self.llm_client.messages.stream(**self._anthropic_params(prompt, max_tokens, schema),
+                                             **_timeout_kwargs(timeout)) as stream:
+            for event in stream:
+                if event.type != "content_block_delta":
+                    continue
+                chunk = getattr(event.delta, 'partial_json', None) or getattr(event.delta, 'text', None)
+                if chunk and on_text is not None:
+                    on_text(chunk)
+            message = stream.get_final_message()
+        usage = getattr(message, 'usage', None)
+        if usage is not None:
+            self.tracer.annotate(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                                 cached_tokens=getattr(usage, 'cache_read_input_tokens', None) or 0)
+        return _anthropic_text(message.content)
+
+    def _openai_params(self, prompt, max_tokens, schema=PRICING_SCHEMA):
         # Try GPT-5 first, fall back to GPT-4o if not available
         model = os.environ.get("OPENAI_MODEL", "gpt-5")
 
@@ -403,30 +799,69 @@ RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
         params = {
             "model": model,
             "messages": [
-                {"role": "system", "content": "You are a helpful assistant that extracts structured data from text."},
+                # Identical for every request, so OpenAI's automatic prefix caching can reuse it
+                {"role": "system", "content": extraction_instructions()},
                 {"role": "user", "content": prompt}
             ],
-            token_param: 2000
+            token_param: max_tokens
         }
 
+        params["response_format"] = openai_response_format(model, schema)
+
         # GPT-5/o1 doesn't support temperature parameter (always uses 1)
         if not is_reasoning_model:
             params["temperature"] = 0
 
-        response = self.llm_client.chat.completions.create(**params)
-        return response.choices[0].message.content.strip()
+        return params
+
+    def _call_openai(self, prompt, max_tokens=MAX_TOKENS_PER_VENUE, timeout=None, schema=PRICING_SCHEMA,
+                     on_text=None):
+        """Call OpenAI API, streaming the answer to on_text as it arrives"""
+        stream = self.llm_client.chat.completions.create(**self._openai_params(prompt, max_tokens, schema),
+                                                         stream=True, stream_options={"include_usage": True},
+                                                         **_timeout_kwargs(timeout))
+        parts = []
+        with stream:
+            for chunk in stream:
+                if chunk.usage is not None:
+                    self.tracer.annotate(input_tokens=chunk.usage.prompt_tokens,
+                                         output_tokens=chunk.usage.completion_tokens)
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    parts.append(text)
+                    if on_text is not None:
+                        on_text(text)
+        return ''.join(parts).strip()
 
     def apply_pricing_update(self, venue_data, pricing_data):
-        """Apply extracted pricing to venue data"""
-        if not pricing_data or 'courts' not in pricing_data:
+        """Apply every extracted price period to venue data"""
+        periods = pricing_periods(pricing_data)
+        if not periods:
             return False
 
-        season_from = pricing_data.get('from', '2025-10-01')
-        season_to = pricing_data.get('to', '2026-05-01')
+        changes_made = False
+        today = datetime.now().date().isoformat()
+
+        for period in periods:
+            season_from, season_to = period['from'], period['to']
+            # Periods that are over are history; a page still showing them doesn't rewrite it
+            if season_to <= today:
+                console.print(f"  ⏭️  Skipping {season_from} → {season_to}: already over", style="dim")
+                continue
+            if self._apply_period(venue_data, season_from, season_to, period['courts'] or []):
+                changes_made = True
+
+        if changes_made:
+            self._dirty_venues[venue_key(venue_data)] = venue_data
+        return changes_made
 
+    def _apply_period(self, venue_data, season_from, season_to, courts):
+        """Write one period's schedules into the matching court groups; returns whether anything changed"""
         changes_made = False
 
-        for extracted_court in pricing_data['courts']:
+        for extracted_court in courts:
             court_type = extracted_court.get('type')
             surface = extracted_court.get('surface')
             schedule = extracted_court.get('schedule', {})
@@ -441,14 +876,20 @@ RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
                     if 'prices' not in court:
                         court['prices'] = []
 
-                    # Find existing winter schedule or create new
+                    # Find the existing schedule of this period or create a new one
                     existing_schedule = None
                     for price_entry in court['prices']:
-                        if (price_entry.get('from') == season_from and
-                            price_entry.get('to') == season_to):
+                        if (str(price_entry.get('from')) == season_from and
+                            str(price_entry.get('to')) == season_to):
                             existing_schedule = price_entry
                             break
 
+                    # Compare prices hour by hour, not the way the rules happen to be written
+                    old_grid = expand_schedule(existing_schedule.get('schedule') if existing_schedule else None)
+                    new_grid = expand_schedule(schedule)
+                    if existing_schedule is not None and old_grid == new_grid:
+                        break
+
                     if existing_schedule:
                         existing_schedule['schedule'] = schedule
                     else:
@@ -457,50 +898,286 @@ RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
                             'to': season_to,
                             'schedule': schedule
                         })
-
                     changes_made = True
+                    self.change_report.append({
+                        'venue': venue_data.get('name', 'Unknown'),
+                        'group': f"{court_type}/{surface}",
+                        'period': f"{season_from} → {season_to}",
+                        'new_period': existing_schedule is None,
+                        'changes': diff_grids(old_grid, new_grid),
+                    })
                     break
 
         return changes_made
 
-    def update_venue(self, venue_data):
-        """Update pricing for a single venue"""
+    def crawl_venue(self, venue_data):
+        """Crawl stage: return the pricing page text for a venue (runs on crawl worker threads)"""
         venue_name = venue_data.get('name', 'Unknown')
         prices_source = venue_data.get('prices_source')
 
         if not prices_source:
             console.print(f"⚠️  {venue_name}: No prices_source URL, skipping", style="yellow")
-            return False
+            return None
 
         console.print(f"\n📍 Processing: [bold]{venue_name}[/bold]")
 
-        # Crawl the pricing page
-        page_content = self.crawl_page(prices_source)
-        if not page_content:
-            return False
+        if self.budget.expired:
+            console.print(f"  ⏰ {venue_name}: time budget used up, leaving it for the retry manifest", style="yellow")
+            self.retry_manifest.record(venue_data, 'crawl', 'time budget used up')
+            return None
+
+        # Replays read the recorded crawl and never touch the network
+        if self.replay_archive is not None:
+            with self.tracer.span('replay') as span:
+                content = self.replay_archive.replay(venue_key(venue_data))
+                span['found'] = content is not None
+            if content is None:
+                console.print(f"  ⚠️  {venue_name}: not in the crawl archive, skipping", style="yellow")
+                self.retry_manifest.record(venue_data, 'crawl', 'not in the crawl archive')
+                return None
+            console.print(f"  📼 Replaying recorded crawl of [cyan]{prices_source}[/cyan]", style="dim")
+            return content
+
+        # A host that keeps failing is skipped instead of tying up a worker on every venue it serves
+        host = venue_host(venue_data)
+        if not self.breaker.allow(host):
+            console.print(f"  ⛔ {venue_name}: {host} keeps failing, skipping", style="yellow")
+            self.retry_manifest.record(venue_data, 'crawl', f'circuit open for {host}')
+            return None
 
-        # Extract pricing with LLM
+        # Static pages don't need a browser; a 304 means nothing changed since the last run.
+        # It stands in for the cached extraction, so it is only asked for while that is fresh.
+        if self.static_fetcher is not None and not requires_js(venue_data):
+            venue_id = venue_key(venue_data)
+            with self.tracer.span('http_fetch', url=prices_source) as span:
+                result = self.static_fetcher.fetch(venue_id, prices_source,
+                                                   conditional=self.page_cache.has_fresh(venue_id))
+                span['not_modified'] = result.not_modified
+            if result.not_modified:
+                self.breaker.record_success(host)
+                return UNCHANGED
+            if result.text:
+                console.print(f"  ⚡ Fetched [cyan]{prices_source}[/cyan] without a browser", style="dim")
+                self.breaker.record_success(host)
+                if self.record_archive is not None:
+                    self.record_archive.record(venue_key(venue_data), prices_source, STATIC,
+                                               html=result.html)
+                return result.text
+            console.print(f"  🌐 Static fetch not usable ({result.reason}), using browser", style="dim")
+
+        capture = {} if self.record_archive is not None else None
+        try:
+            content = self.crawl_page(prices_source, venue_data.get('prices_crawler'), capture=capture)
+        except Exception as e:
+            console.print(f"  ❌ Error crawling {prices_source}: {str(e)}", style="red")
+            # Running out of time says nothing about the host
+            if not isinstance(e, BudgetExceeded):
+                self.breaker.record_failure(host)
+            self.retry_manifest.record(venue_data, 'crawl', e)
+            return None
+
+        self.breaker.record_success(host)
+        if capture:
+            self.record_archive.record(venue_key(venue_data), prices_source, BROWSER, **capture)
+        return content
+
+    def _extraction_context(self, venue_data):
+        """Everything besides the page text that shapes an extraction, for cache keys"""
+        court_groups = venue_data.get('courtGroups', venue_data.get('courts', []))
+        groups = [(court.get('type'), court.get('surface')) for court in court_groups]
+        return json.dumps({'prompt': PROMPT_VERSION, 'groups': groups})
+
+    def _extract_without_llm(self, venue_data, page_content):
+        """Cache lookup and rule-based parse; returns (pricing_data or None, cache digest)"""
+        venue_name = venue_data.get('name', 'Unknown')
+        venue_id = venue_key(venue_data)
+
+        # Unchanged page -> reuse the last extraction instead of asking the LLM again
+        digest = page_digest(page_content, self._extraction_context(venue_data))
+        cached = self.page_cache.get(venue_id, digest)
+        if cached is not None:
+            console.print(f"  🗄️  {venue_name}: page unchanged, reusing cached extraction", style="cyan")
+            return cached, digest
+
+        # Simple tables are parsed by rules; the LLM is only asked when that isn't enough
+        if self.use_parser:
+            with self.tracer.span('table_parse') as span:
+                parsed = parse_pricing_table(page_content, venue_data)
+                span['confidence'] = parsed.confidence
+            with self._stats_lock:
+                self.parser_attempts += 1
+                if parsed.confident:
+                    self.parser_resolved += 1
+            if parsed.confident:
+                console.print(f"  🧮 {venue_name}: parsed pricing table without LLM "
+                              f"(confidence {parsed.confidence:.0%})", style="cyan")
+                self.page_cache.put(venue_id, digest, parsed.pricing_data)
+                return parsed.pricing_data, digest
+            console.print(f"  🧮 {venue_name}: rule-based parse not usable ({parsed.reason or 'low confidence'}), "
+                          "asking LLM", style="dim")
+
+        return None, digest
+
+    def extract_venue(self, venue_data, page_content):
+        """Extract stage: turn crawled page text into pricing data (runs on extraction worker threads)"""
+        pricing_data, digest = self._extract_without_llm(venue_data, page_content)
+        if pricing_data is not None:
+            return pricing_data
+
+        venue_name = venue_data.get('name', 'Unknown')
         pricing_data = self.extract_pricing_with_llm(venue_name, venue_data, page_content)
+        if pricing_data:
+            self.page_cache.put(venue_key(venue_data), digest, pricing_data)
+        return pricing_data
+
+    def extract_venues(self, items):
+        """
+        Batched extract stage: items are (venue_data, page_content); returns pricing data per item.
+
+        Venues the cache or parser can't answer share one LLM request (or one provider
+        batch). A venue missing or malformed in the batch response is retried on its
+        own, so one bad result never fails the others.
+        """
+        results = [None] * len(items)
+        pending = []
+        for i, (venue_data, page_content) in enumerate(items):
+            with self.tracer.venue(venue_data.get('name', 'Unknown')):
+                pricing_data, digest = self._extract_without_llm(venue_data, page_content)
+            if pricing_data is not None:
+                results[i] = pricing_data
+            else:
+                pending.append((i, venue_data, page_content, digest))
+
+        batched = {}
+        use_batch = len(pending) > 1 or (pending and self.batch_api)
+        if use_batch:
+            batch_items = [
+                (venue_key(venue_data), venue_data.get('name', 'Unknown'),
+                 venue_data, page_content)
+                for _, venue_data, page_content, _ in pending
+            ]
+            try:
+                if self.batch_api:
+                    batched = self.extract_pricing_with_batch_api(batch_items)
+                else:
+                    batched = self.extract_pricing_batch_with_llm(batch_items)
+            except Exception as e:
+                console.print(f"  ❌ Batched extraction failed, retrying venues one by one: {str(e)}", style="red")
+            with self._stats_lock:
+                self.batch_requests += 1
+                self.batched_venues += len(batch_items)
+
+        for i, venue_data, page_content, digest in pending:
+            venue_name = venue_data.get('name', 'Unknown')
+            venue_id = venue_key(venue_data)
+            pricing_data = batched.get(venue_id)
+            if pricing_data is None:
+                if use_batch:
+                    console.print(f"  ⚠️  {venue_name}: no usable result in batch, extracting alone", style="yellow")
+                    with self._stats_lock:
+                        self.batch_fallbacks += 1
+                with self.tracer.venue(venue_name):
+                    pricing_data = self.extract_pricing_with_llm(venue_name, venue_data, page_content)
+            if pricing_data:
+                self.page_cache.put(venue_id, digest, pricing_data)
+            results[i] = pricing_data
+
+        return results
+
+    def apply_venue_pricing(self, venue_data, pricing_data):
+        """Show and apply extracted pricing for a venue (must run on the thread that owns the YAML data)"""
+        if pricing_data is UNCHANGED:
+            console.print(f"  💤 {venue_data.get('name', 'Unknown')}: pricing page not modified since last run", style="dim")
+            return True
+
         if not pricing_data:
             return False
 
         # Show extracted data
-        console.print("  ✅ Extracted pricing:", style="green")
+        console.print(f"  ✅ Extracted pricing for [bold]{venue_data.get('name', 'Unknown')}[/bold]:", style="green")
         console.print(Panel(str(pricing_data), expand=False))
 
-        # Apply updates
+        # Apply updates to a copy first: it is checked before it replaces the venue
+        # (a dry run stops there, so it still reports what would change)
+        reported = len(self.change_report)
+        venue_id = venue_key(venue_data)
+        pending = venue_id in self._dirty_venues
+        target = copy.deepcopy(venue_data)
+        changes_made = self.apply_pricing_update(target, pricing_data)
+        # apply_pricing_update marked the copy as changed; only venue_data itself is ever saved
+        if pending:
+            self._dirty_venues[venue_id] = venue_data
+        else:
+            self._dirty_venues.pop(venue_id, None)
+
+        errors = new_errors([venue_data], [target]) if changes_made else []
+        if errors:
+            console.print(f"  ❌ Extracted pricing for {venue_data.get('name', 'Unknown')} fails validation, "
+                          "not applied:", style="red")
+            print_issues(errors)
+            del self.change_report[reported:]
+            self.retry_manifest.record(venue_data, 'validate', f"{len(errors)} validation errors")
+            return False
+
+        if changes_made and not self.dry_run:
+            venue_data.update(target)
+            self._dirty_venues[venue_id] = venue_data
+
+        for entry in self.change_report[reported:]:
+            console.print(f"  📝 {entry['group']} {entry['period']}{' (new period)' if entry['new_period'] else ''}:",
+                          style="cyan")
+            for line in entry['changes']:
+                console.print(f"      {line}", style="cyan")
+
         if self.dry_run:
             console.print("  ℹ️  Dry run - changes not applied", style="blue")
+        elif changes_made:
+            console.print("  ✅ Pricing updated", style="green")
         else:
-            changes_made = self.apply_pricing_update(venue_data, pricing_data)
-            if changes_made:
-                console.print("  ✅ Pricing updated", style="green")
-            else:
-                console.print("  ⚠️  No changes applied", style="yellow")
+            console.print("  💤 Same prices as in courts.yaml, nothing to update", style="dim")
 
         return True
 
-    def run(self, specific_venue=None):
+    def update_venue(self, venue_data):
+        """Update pricing for a single venue, running all stages in series"""
+        return self._finish_venue(venue_data, self._crawl_and_extract(venue_data))
+
+    def _crawl_and_extract(self, venue_data):
+        """Crawl and extract stages in series; returns pricing data, UNCHANGED or None"""
+        page_content = self._traced_stage('crawl', self.crawl_venue)(venue_data)
+        if not page_content or page_content is UNCHANGED:
+            return page_content or None
+        return self._traced_stage('extract', self.extract_venue)(venue_data, page_content)
+
+    def _traced_stage(self, stage, fn):
+        """Wrap a per-venue stage function (venue_data first) in a span attributed to the venue"""
+        def run(venue_data, *args):
+            with self.tracer.venue(venue_data.get('name', 'Unknown')), self.tracer.span(stage) as span:
+                result = fn(venue_data, *args)
+                span['ok'] = bool(result)
+                return result
+        return run
+
+    def _finish_venue(self, venue_data, pricing_data):
+        """Apply a venue's result and, on a live run, remember its HTTP validators"""
+        ok = self._traced_stage('apply', self.apply_venue_pricing)(venue_data, pricing_data)
+        if ok and not self.dry_run and self.static_fetcher is not None:
+            self.static_fetcher.commit(venue_key(venue_data))
+        return ok
+
+    @contextmanager
+    def _worker_browser(self):
+        """Give the current worker thread its own shared browser (Playwright's sync API is thread-bound)"""
+        with BrowserSession(recycle_after=self.recycle_after, tracer=self.tracer) as session:
+            self._local.session = session
+            with self._stats_lock:
+                self._sessions.append(session)
+            try:
+                yield session
+            finally:
+                self._local.session = None
+
+    def run(self, specific_venue=None, retry_failed=False):
         """Run the price update process"""
         console.print(Panel.fit(
             "🎾 [bold]Tennis Court Price Updater[/bold] 🎾\n"
@@ -520,6 +1197,21 @@ RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
                 console.print(f"❌ Venue '{specific_venue}' not found!", style="red")
                 return
 
+        # A shard takes its share of all venues (before --retry-failed, so shares don't shift)
+        if self.shard_results is not None:
+            venues = shard_venues(venues, self.shard_results.index, self.shard_results.count)
+            console.print(f"🧩 Shard {self.shard_results.index}/{self.shard_results.count}: {len(venues)} venues",
+                          style="cyan")
+
+        # Only the venues that failed last time
+        if retry_failed:
+            retry_ids = set(self.retry_manifest.load_ids())
+            venues = [v for v in venues if venue_key(v) in retry_ids]
+            if not venues:
+                console.print(f"✅ Nothing to retry in {self.retry_manifest.path}", style="green")
+                return
+            console.print(f"🔁 Retrying {len(venues)} venues from {self.retry_manifest.path}", style="cyan")
+
         # Process each venue
         success_count = 0
         total_venues = len([v for v in venues if 'prices_source' in v])
@@ -531,41 +1223,398 @@ RETURN ONLY VALID JSON, NO MARKDOWN, NO EXPLANATIONS."""
         ) as progress:
             task = progress.add_task(f"Processing {total_venues} venues...", total=total_venues)
 
-            for venue in venues:
-                if 'prices_source' in venue:
-                    if self.update_venue(venue):
-                        success_count += 1
-                    progress.advance(task)
-
-        # Save results
-        if not self.dry_run and success_count > 0:
-            console.print("\n💾 Saving updated courts.yaml...")
-            self.save_yaml(data)
-            console.print("✅ File saved successfully!", style="green")
+            # Crawl workers (one browser each) feed extraction workers through a bounded
+            # queue; this thread is the single writer, so YAML mutation and progress
+            # stay single-threaded
+            self._sessions = []
+            priced_venues = [v for v in venues if 'prices_source' in v]
+            if self.batch_api:
+                # Provider batches are asynchronous: collect every crawled venue into one submission
+                batch_options = dict(extract_batch=self.extract_venues, batch_size=len(priced_venues),
+                                     batch_wait=None, extract_workers=1)
+            elif self.batch_size > 1:
+                batch_options = dict(extract_batch=self.extract_venues, batch_size=self.batch_size,
+                                     batch_wait=self.batch_wait, extract_workers=self.llm_concurrency)
+            else:
+                batch_options = dict(extract_workers=self.llm_concurrency)
+
+            if self.shard_results is not None:
+                self.shard_results.start(priced_venues, provider=self.provider, model=self._model_name(),
+                                         prompt_version=PROMPT_VERSION)
+
+            pipeline = VenuePipeline(
+                crawl=self._traced_stage('crawl', self.crawl_venue),
+                extract=self._traced_stage('extract', self.extract_venue),
+                crawl_workers=self.concurrency,
+                queue_size=self.queue_size,
+                # Replays don't visit any host
+                min_host_interval=0 if self.replay_archive is not None else self.min_host_interval,
+                crawl_context=self._worker_browser,
+                **batch_options,
+            )
+            for venue, pricing_data in pipeline.run(priced_venues):
+                with pipeline.stats['write'].measure() as outcome:
+                    outcome['ok'] = self._finish_venue(venue, pricing_data)
+                if outcome['ok']:
+                    success_count += 1
+                    if self.shard_results is not None and pricing_data is not UNCHANGED:
+                        self.shard_results.add(venue, pricing_data, prices_source=venue.get('prices_source'),
+                                               extracted_at=datetime.now().isoformat(timespec='seconds'))
+                elif not self.retry_manifest.has(venue):
+                    self.retry_manifest.record(venue, 'extract', 'no pricing extracted')
+                progress.advance(task)
+
+        launches = sum(s.launch_count for s in self._sessions)
+        if launches:
+            pages = sum(s.pages_served for s in self._sessions)
+            console.print(f"🌐 Browser launched {launches}x for {pages} pages", style="dim")
+            if self.block_resources:
+                console.print(f"🚫 Blocked: {self.block_stats.summary()}", style="dim")
+
+        # Save results (a shard leaves courts.yaml to the merge step)
+        if self.shard_results is not None:
+            self.shard_results.save(self.retry_manifest.failures)
+            console.print(f"\n🧩 Results of {len(self.shard_results.venues)} venues written to {self.shard_results.path}; "
+                          "apply all shards with: update_prices.py merge <results files>")
+        elif not self.dry_run:
+            if self._dirty_venues:
+                console.print(f"\n💾 Saving prices of {len(self._dirty_venues)} venues to courts.yaml...")
+                if self.save_yaml(data):
+                    console.print("✅ File saved successfully!", style="green")
+            else:
+                console.print("\n💤 No pricing changes, courts.yaml left untouched", style="dim")
 
         # Summary
+        console.print()
+        pipeline.print_summary()
+        self.tracer.print_summary()
         console.print(f"\n📊 Summary: {success_count}/{total_venues} venues processed successfully")
+        console.print(f"🗄️  Extraction cache: {self.page_cache.summary()}")
+        if self.batch_requests:
+            console.print(f"📦 Batched {self.batched_venues} venues into {self.batch_requests} requests "
+                          f"({self.batch_fallbacks} retried alone)")
+        if self.llm_repairs:
+            console.print(f"🩹 {self.llm_repairs} LLM answers failed validation and were asked again")
+        if self.use_parser and self.parser_attempts:
+            console.print(f"🧮 Resolved without LLM: {self.parser_resolved}/{self.parser_attempts} extractions")
+        if self.static_fetcher is not None and self.replay_archive is None:
+            console.print(f"⚡ Static fetch: {self.static_fetcher.summary()}")
+        for archive in (self.record_archive, self.replay_archive):
+            if archive is not None:
+                console.print(f"📼 Crawl archive ({archive.dir}): {archive.summary()}")
+        self._report_changes()
+        if self.breaker.open_hosts():
+            console.print(f"⛔ Circuit opened for: {', '.join(self.breaker.open_hosts())}", style="yellow")
+
+        # Failed venues can be picked up with --retry-failed; dry runs leave the manifest alone
+        failures = self.retry_manifest.failures
+        if failures:
+            console.print(f"🔁 {len(failures)} venues failed:", style="yellow")
+            for entry in failures.values():
+                console.print(f"    - {entry['name']} ({entry['stage']}): {entry['error']}", style="dim")
+        if not self.dry_run:
+            self.retry_manifest.save(venue_key(v) for v in priced_venues)
+            if failures:
+                console.print(f"   Written to {self.retry_manifest.path} - rerun with --retry-failed", style="yellow")
+
+        self._finish_tracing()
+        if self.dry_run:
+            console.print("\nℹ️  This was a dry run. Run without --dry-run to apply changes.", style="blue")
+
+    def _finish_tracing(self):
+        """Flush the span log and write the Chrome trace, if requested"""
+        self.tracer.close()
+        if self.chrome_trace_path:
+            self.tracer.write_chrome_trace(self.chrome_trace_path)
+            console.print(f"🔬 Chrome trace written to {self.chrome_trace_path} "
+                          "(open in chrome://tracing or ui.perfetto.dev)", style="dim")
+
+    def _finish_cycle_tracing(self):
+        """Daemon: summarize this cycle's spans and write its Chrome trace, then drop them"""
+        if not self.tracer.spans:
+            return
+        self.tracer.print_summary()
+        if self.chrome_trace_path:
+            self.tracer.write_chrome_trace(self.chrome_trace_path)
+        self.tracer.reset()
+
+    def _report_changes(self):
+        """Summarize real price changes; optionally as a Markdown file and a GitHub Actions output"""
+        changed = bool(self.change_report)
+        if changed:
+            venues = {entry['venue'] for entry in self.change_report}
+            console.print(f"📝 Price changes: {len(self.change_report)} court group periods in {len(venues)} venues")
+        else:
+            console.print("📝 No price changes")
+
+        if self.change_report_path and changed:
+            Path(self.change_report_path).write_text(format_change_report(self.change_report), encoding='utf-8')
+            console.print(f"   Change report written to {self.change_report_path}", style="dim")
+
+        # Lets a workflow commit and deploy only when prices really changed
+        github_output = os.environ.get('GITHUB_OUTPUT')
+        if github_output and not self.dry_run and self.shard_results is None:
+            with open(github_output, 'a', encoding='utf-8') as f:
+                f.write(f"prices_changed={'true' if changed else 'false'}\n")
+
+    def merge_shards(self, paths):
+        """
+        Apply the results files of a sharded run to courts.yaml in one locked, atomic write.
+
+        Nothing is written when the files conflict with each other or with edits made
+        to courts.yaml since the shards ran; returns False in that case.
+        """
+        console.print(Panel.fit(
+            "🎾 [bold]Tennis Court Price Updater[/bold] 🎾\n"
+            f"Mode: MERGE {len(paths)} shard results{' (DRY RUN)' if self.dry_run else ''}",
+            border_style="green"
+        ))
+
+        results_files = []
+        unreadable = 0
+        for path in paths:
+            try:
+                results_files.append(load_results(path))
+            except (OSError, ValueError) as e:
+                console.print(f"❌ Can't read results file {path}: {e}", style="red")
+                unreadable += 1
+        if unreadable:
+            console.print(f"❌ {unreadable} results files unreadable, courts.yaml left untouched", style="red")
+            return False
+
+        data = self.load_yaml()
+        venues = data if isinstance(data, list) else [data]
+        merged, conflicts, warnings = merge_results(results_files, venues)
+
+        for warning in warnings:
+            console.print(f"  ⚠️  {warning}", style="yellow")
+        if conflicts:
+            console.print(f"❌ {len(conflicts)} conflicts, courts.yaml left untouched:", style="red")
+            for conflict in conflicts:
+                console.print(f"    - {conflict}", style="red")
+            return False
 
+        by_id = {venue_key(v): v for v in venues}
+        applied = 0
+        for venue_id, entry in sorted(merged.items()):
+            console.print(f"\n📍 Merging: [bold]{entry['name']}[/bold] "
+                          f"(extracted {entry.get('extracted_at', '?')})")
+            if self.apply_venue_pricing(by_id[venue_id], entry['pricing_data']):
+                applied += 1
+
+        if not self.dry_run:
+            if self._dirty_venues:
+                console.print(f"\n💾 Saving prices of {len(self._dirty_venues)} venues to courts.yaml...")
+                if self.save_yaml(data):
+                    console.print("✅ File saved successfully!", style="green")
+            else:
+                console.print("\n💤 No pricing changes, courts.yaml left untouched", style="dim")
+
+        console.print(f"\n📊 Summary: {applied}/{len(merged)} venue results merged")
+        self._report_changes()
         if self.dry_run:
             console.print("\nℹ️  This was a dry run. Run without --dry-run to apply changes.", style="blue")
+        return True
+
+    def run_daemon(self, specific_venue=None, schedule=None, tick=DEFAULT_DAEMON_TICK,
+                   max_per_cycle=DEFAULT_DAEMON_MAX_PER_CYCLE):
+        """
+        Keep running and poll venues when their adaptive schedule says they are due.
+
+        One warm browser serves every cycle. courts.yaml is re-read each cycle, so
+        edits made while the daemon runs are picked up, and saved after every
+        venue whose pricing was applied. Stops on Ctrl+C or when --time-budget is used up.
+        """
+        schedule = schedule if schedule is not None else VenueScheduler()
+        console.print(Panel.fit(
+            "🎾 [bold]Tennis Court Price Updater[/bold] 🎾\n"
+            f"Mode: DAEMON{' (DRY RUN)' if self.dry_run else ''} - checking the schedule every {tick:.0f}s",
+            border_style="green"
+        ))
+
+        checked = 0
+        try:
+            with self._worker_browser():
+                while not self.budget.expired:
+                    data = self.load_yaml()
+                    venues = data if isinstance(data, list) else [data]
+                    venues = [v for v in venues if 'prices_source' in v
+                              and (not specific_venue or v.get('name') == specific_venue)]
+                    by_key = {venue_key(v): v for v in venues}
+
+                    schedule.sync(venues)
+                    schedule.reprioritize(venues)
+                    due = schedule.due(limit=max_per_cycle)
+                    if due:
+                        console.print(f"\n🗓️  {len(due)} venues due ({datetime.now():%Y-%m-%d %H:%M})", style="cyan")
+
+                    for key in due:
+                        if self.budget.expired:
+                            break
+                        venue = by_key[key]
+                        pricing_data = self._crawl_and_extract(venue)
+                        ok = self._finish_venue(venue, pricing_data)
+                        checked += 1
+
+                        if not ok:
+                            delay = schedule.record(venue, FAILED)
+                        elif pricing_data is UNCHANGED:
+                            delay = schedule.record(venue, NO_CHANGE)
+                        else:
+                            delay = schedule.record(venue, NO_CHANGE, pricing_fingerprint(pricing_data))
+                            if not self.dry_run and self.save_yaml(data):
+                                console.print("  💾 courts.yaml saved", style="dim")
+                        entry = schedule.entries[key]
+                        console.print(f"  🗓️  {venue.get('name', 'Unknown')}: {entry['last_outcome']}, "
+                                      f"next check in {delay / 3600:.1f}h", style="dim")
+
+                    if not self.dry_run:
+                        schedule.save()
+                    self._finish_cycle_tracing()
+
+                    # Sleep until the next venue is due, but re-read courts.yaml at least every tick
+                    next_due = schedule.next_due()
+                    wait = tick if next_due is None else min(tick, max(1.0, next_due - time.time()))
+                    if self.budget.seconds is not None:
+                        wait = min(wait, self.budget.remaining())
+                    time.sleep(wait)
+        except KeyboardInterrupt:
+            console.print("\n👋 Stopping daemon", style="yellow")
+        finally:
+            if not self.dry_run:
+                schedule.save()
+
+        console.print(f"📊 Daemon checked {checked} venues; schedule kept in {schedule.path}")
+        self._finish_cycle_tracing()
+        self.tracer.close()
 
 
 def main():
-    print("DEBUG: main() started")
     parser = argparse.ArgumentParser(description="Update tennis court prices automatically")
     parser.add_argument('--dry-run', action='store_true', help='Show changes without applying them')
     parser.add_argument('--venue', type=str, help='Update only a specific venue')
     parser.add_argument('--provider', type=str, choices=['anthropic', 'openai'],
                         help="LLM provider: 'anthropic' (Claude) or 'openai' (GPT). Auto-detected if not specified.")
+    parser.add_argument('--recycle-after', type=int, default=DEFAULT_RECYCLE_AFTER,
+                        help=f'Relaunch the shared browser after this many pages (default: {DEFAULT_RECYCLE_AFTER}, 0 = never)')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='Number of venues to crawl in parallel (default: 1)')
+    parser.add_argument('--llm-concurrency', type=int,
+                        help='Number of concurrent LLM extractions (default: same as --concurrency)')
+    parser.add_argument('--queue-size', type=int,
+                        help='Crawled pages that may wait for extraction (default: 2x --llm-concurrency)')
+    parser.add_argument('--min-host-interval', type=float, default=DEFAULT_MIN_HOST_INTERVAL,
+                        help=f'Seconds to wait between two visits to the same host (default: {DEFAULT_MIN_HOST_INTERVAL})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always call the LLM, even when a pricing page has not changed')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE_DAYS,
+                        help=f'Days a cached extraction stays valid (default: {DEFAULT_MAX_AGE_DAYS})')
+    parser.add_argument('--browser-only', action='store_true',
+                        help='Skip the plain HTTP fast path and always crawl with a headless browser')
+    parser.add_argument('--wait-ceiling-ms', type=int, default=DEFAULT_CEILING_MS,
+                        help=f'Longest wait for page content to settle after a load or click (default: {DEFAULT_CEILING_MS})')
+    parser.add_argument('--no-block', action='store_true',
+                        help='Let the browser download images, fonts, media and trackers')
+    parser.add_argument('--no-parser', action='store_true',
+                        help='Skip the rule-based table parser and always ask the LLM')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Extract up to N venues with a single LLM request (default: 1)')
+    parser.add_argument('--batch-wait', type=float, default=DEFAULT_BATCH_WAIT,
+                        help=f'Seconds to wait for more crawled venues to fill a batch (default: {DEFAULT_BATCH_WAIT})')
+    parser.add_argument('--batch-api', action='store_true',
+                        help="Submit all extractions through the provider's asynchronous batch API")
+    parser.add_argument('--change-report', type=Path,
+                        help='Write a Markdown report of the price changes to this file')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running and poll each venue on its own adaptive schedule')
+    parser.add_argument('--daemon-tick', type=float, default=DEFAULT_DAEMON_TICK,
+                        help=f'Seconds between schedule checks in --daemon mode (default: {DEFAULT_DAEMON_TICK})')
+    parser.add_argument('--max-per-cycle', type=int, default=DEFAULT_DAEMON_MAX_PER_CYCLE,
+                        help=f'Due venues processed per schedule check in --daemon mode (default: {DEFAULT_DAEMON_MAX_PER_CYCLE})')
+    parser.add_argument('--schedule', type=Path, default=DEFAULT_SCHEDULE_PATH,
+                        help=f'Where the --daemon polling schedule is kept (default: {DEFAULT_SCHEDULE_PATH})')
+    parser.add_argument('--time-budget', type=float,
+                        help='Stop starting new work after this many seconds; unfinished venues go to the retry manifest')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Only process the venues listed in the retry manifest of a previous run')
+    parser.add_argument('--retry-manifest', type=Path, default=DEFAULT_MANIFEST_PATH,
+                        help=f'Where failed venues are recorded (default: {DEFAULT_MANIFEST_PATH})')
+    parser.add_argument('--trace', type=Path,
+                        help='Append a JSON line per traced phase (span) to this file')
+    parser.add_argument('--chrome-trace', type=Path,
+                        help='Write all spans as a Chrome trace (chrome://tracing, ui.perfetto.dev) to this file')
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', type=Path, nargs='?', const=DEFAULT_ARCHIVE_DIR, metavar='DIR',
+                         help=f"Save every venue's crawl to a replayable archive (default: {DEFAULT_ARCHIVE_DIR})")
+    archive.add_argument('--replay', type=Path, nargs='?', const=DEFAULT_ARCHIVE_DIR, metavar='DIR',
+                         help='Extract from the recorded crawls instead of the network; implies --dry-run and --no-cache')
+
+    parser.add_argument('--shard', type=parse_shard, metavar='i/N',
+                        help="Process only shard i of N (venues split by id) and write a results file instead of courts.yaml")
+    parser.add_argument('--shard-output', type=Path,
+                        help='Where the --shard results file is written (default: .cache/shard-i-of-N.json)')
+
+    # Options given after the subcommand must not reset the ones given before it
+    subcommands = parser.add_subparsers(dest='command')
+    merge = subcommands.add_parser('merge', help='Apply the results files of all shards to courts.yaml in one pass')
+    merge.add_argument('results', type=Path, nargs='+', help='Results files written by --shard runs')
+    merge.add_argument('--dry-run', action='store_true', default=argparse.SUPPRESS,
+                       help='Show changes without applying them')
+    merge.add_argument('--change-report', type=Path, default=argparse.SUPPRESS,
+                       help='Write a Markdown report of the price changes to this file')
 
     args = parser.parse_args()
-    print(f"DEBUG: args parsed - venue={args.venue}, dry_run={args.dry_run}")
+    if args.command == 'merge':
+        updater = PriceUpdater(dry_run=args.dry_run, change_report_path=args.change_report, use_llm=False)
+        if not updater.merge_shards(args.results):
+            sys.exit(1)
+        return
+
+    if args.shard and args.daemon:
+        parser.error('--shard splits one full run, it cannot be combined with --daemon')
+    if args.replay and args.daemon:
+        parser.error('--replay runs once over the archive, it cannot be combined with --daemon')
+    # Recorded pages may be stale, so a replay never writes courts.yaml
+    if args.replay and not args.dry_run:
+        console.print("ℹ️  --replay implies --dry-run", style="blue")
+        args.dry_run = True
+    # A replay is for trying out extraction changes: always extract, and keep the
+    # results out of the cache that live runs rely on
+    if args.replay:
+        args.no_cache = True
 
     # Run updater (API key check happens in __init__)
-    updater = PriceUpdater(dry_run=args.dry_run, provider=args.provider)
-    print("DEBUG: updater created, calling run()")
-    updater.run(specific_venue=args.venue)
-    print("DEBUG: run() completed")
+    updater = PriceUpdater(
+        dry_run=args.dry_run,
+        provider=args.provider,
+        recycle_after=args.recycle_after,
+        concurrency=args.concurrency,
+        llm_concurrency=args.llm_concurrency,
+        queue_size=args.queue_size,
+        min_host_interval=args.min_host_interval,
+        page_cache=PageCache(max_age_days=args.max_age, enabled=not args.no_cache),
+        static_fetch=not args.browser_only,
+        wait_ceiling_ms=args.wait_ceiling_ms,
+        block_resources=not args.no_block,
+        use_parser=not args.no_parser,
+        batch_size=args.batch_size,
+        batch_wait=args.batch_wait,
+        batch_api=args.batch_api,
+        time_budget=args.time_budget,
+        retry_manifest=RetryManifest(args.retry_manifest),
+        change_report_path=args.change_report,
+        tracer=Tracer(args.trace),
+        chrome_trace_path=args.chrome_trace,
+        record_archive=CrawlArchive(args.record) if args.record else None,
+        replay_archive=CrawlArchive(args.replay) if args.replay else None,
+        shard_results=ShardResults(args.shard_output or default_results_path(*args.shard), *args.shard)
+        if args.shard else None,
+    )
+    if args.daemon:
+        updater.run_daemon(specific_venue=args.venue, schedule=VenueScheduler(args.schedule),
+                           tick=args.daemon_tick, max_per_cycle=args.max_per_cycle)
+    else:
+        updater.run(specific_venue=args.venue, retry_failed=args.retry_failed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Sanity checks for courts.yaml schedules, run over all venues and periods at once.
+
+Every schedule is expanded (with the rule semantics of CourtPricingSystem.js,
+see schedule_grid) into one NumPy matrix of shape
+periods x 8 day classes x 24 hours (NaN = no price), plus a rule-coverage
+matrix for conflicting rules. The checks are array operations over that whole
+matrix, so validating all 22 venues and every historical period takes
+milliseconds and can gate every updater run and every commit.
+
+Errors (the schedule is wrong, a candidate with new errors is not applied):
+- price: a price that is not a number, or outside MIN_PRICE..MAX_PRICE
+- conflict: two rules give the same hour different prices (the later rule wins
+  in the frontend, which is how `*:7-23` + `st:7-23` overrides are written, so
+  only rules of the same day selector count)
+- gap: hours without a price inside a day's opening hours; the longest run of
+  unpriced hours, counted around midnight, is the day's closing time, so
+  overnight rules such as `'!:23-6'` don't open a gap
+- empty: an open period where some day class has no prices while others do
+
+Warnings (worth a look, may be legitimate):
+- jump: an hour's price changed by more than JUMP_RATIO against the group's
+  previous period of the same season (same starting month)
+- winter: an outdoor court group with an open period in WINTER_MONTHS
+
+Usage:
+    python validate_pricing.py [--yaml PATH] [--strict]
+
+    --strict   Exit with an error on warnings too
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import yaml
+from rich.console import Console
+
+from schedule_grid import DAY_NAMES, HOURS, REPORT_DAYS, parse_price, rule_hours
+from venue_pool import venue_key
+
+console = Console()
+
+COURTS_YAML = Path(__file__).parent.parent.parent / "src" / "assets" / "courts.yaml"
+
+DAYS = len(DAY_NAMES)
+
+MIN_PRICE = 10
+MAX_PRICE = 1000
+
+# Price jump against the previous period that gets flagged (new/old or old/new)
+JUMP_RATIO = 2.0
+
+# Outdoor courts are normally closed (or covered by a balloon) in these months
+WINTER_MONTHS = (12, 1, 2)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+
+@dataclass
+class Issue:
+    severity: str
+    check: str
+    venue: str
+    group: str
+    period: str
+    message: str
+
+    def __str__(self):
+        return f"{self.venue} {self.group} {self.period}: [{self.check}] {self.message}"
+
+    @property
+    def key(self):
+        """Identity of the issue: a new period with the same fault as an old one is a new issue"""
+        return self.severity, self.check, self.venue, self.group, self.period, self.message
+
+
+@dataclass
+class PriceMatrix:
+    """All open periods as arrays; labels[i] describes row i"""
+    prices: np.ndarray     # (periods, days, hours) float, NaN = no price
+    conflicts: np.ndarray  # (periods, days, hours) bool
+    invalid: np.ndarray    # (periods,) bool: some rule had an unparseable price
+    labels: list           # (venue id, group label, period label, type, from, to)
+    previous: np.ndarray   # (periods,) int: row of the group's previous same-season period, -1 if none
+
+
+def _rule_days(selector):
+    if selector in ('*', '!'):
+        return list(range(DAYS))
+    if selector in DAY_NAMES:
+        return [DAY_NAMES.index(selector)]
+    return []
+
+
+def _expand(schedule, prices, conflicts):
+    """Fill one period's slices; returns True when a rule's price isn't a number"""
+    invalid = False
+    # Prices written per day selector, to find rules of the same selector that disagree
+    written = {}
+    for rule, price in (schedule or {}).items():
+        selector, _, time_range = str(rule).partition(':')
+        days = _rule_days(selector)
+        hours = rule_hours(time_range)
+        value = parse_price(price)
+        if value is None:
+            invalid = True
+        value = np.nan if value is None else value
+        if not days or not hours:
+            continue
+        seen = written.setdefault(selector, np.full(HOURS, np.nan))
+        conflicts[np.ix_(days, hours)] |= ~np.isnan(seen[hours]) & (seen[hours] != value)
+        seen[hours] = value
+        prices[np.ix_(days, hours)] = value
+    return invalid
+
+
+def build_matrix(venues):
+    """Expand every open period of every venue into one PriceMatrix"""
+    rows = []
+    labels = []
+    previous = []
+    for venue in venues:
+        venue_id = venue_key(venue)
+        for group in venue.get('courtGroups', venue.get('courts', [])) or []:
+            group_label = f"{group.get('type')}/{group.get('surface')}"
+            # Last open period per starting month: a season is compared with the same season before
+            last = {}
+            periods = sorted(group.get('prices') or [], key=lambda p: str(p.get('from', '')))
+            for period in periods:
+                if period.get('closed') is True or period.get('schedule') is None:
+                    continue
+                rows.append(period.get('schedule'))
+                labels.append((venue_id, group_label, f"{period.get('from')} → {period.get('to')}",
+                               group.get('type'), str(period.get('from', '')), str(period.get('to', ''))))
+                month = str(period.get('from', ''))[5:7]
+                previous.append(last.get(month, -1))
+                last[month] = len(rows) - 1
+
+    prices = np.full((len(rows), DAYS, HOURS), np.nan)
+    conflicts = np.zeros((len(rows), DAYS, HOURS), dtype=bool)
+    invalid = np.array([_expand(schedule, prices[i], conflicts[i]) for i, schedule in enumerate(rows)], dtype=bool)
+    return PriceMatrix(prices, conflicts, invalid, labels, np.array(previous, dtype=int))
+
+
+def _hours_label(mask):
+    """Boolean (hours,) mask -> '7-9,22-24'"""
+    hours = np.flatnonzero(mask)
+    parts = []
+    start = prev = hours[0]
+    for hour in hours[1:]:
+        if hour != prev + 1:
+            parts.append(f"{start}-{prev + 1}")
+            start = hour
+        prev = hour
+    parts.append(f"{start}-{prev + 1}")
+    return ','.join(parts)
+
+
+def _days_label(days):
+    return ','.join(d for d in REPORT_DAYS if DAY_NAMES.index(d) in days)
+
+
+def _in_winter(start, end):
+    """Whether [start, end) contains a day of a winter month"""
+    try:
+        start, end = date.fromisoformat(start), date.fromisoformat(end)
+    except ValueError:
+        return False
+    if (end - start).days >= 365:
+        return True
+    month, year = start.month, start.year
+    while date(year, month, 1) < end:
+        if month in WINTER_MONTHS:
+            return True
+        month, year = (1, year + 1) if month == 12 else (month + 1, year)
+    return False
+
+
+def check_matrix(matrix):
+    """Run all checks over a PriceMatrix; returns a list of Issues"""
+    p = matrix.prices
+    priced = ~np.isnan(p)
+    issues = []
+
+    def add(severity, check, row, message):
+        venue, group, period = matrix.labels[row][:3]
+        issues.append(Issue(severity, check, venue, group, period, message))
+
+    def per_day(severity, check, mask, describe):
+        """One issue per period for a (periods, days, hours) mask, grouped by identical hour sets"""
+        for row in np.flatnonzero(mask.any(axis=(1, 2))):
+            by_hours = {}
+            for day in np.flatnonzero(mask[row].any(axis=1)):
+                by_hours.setdefault(_hours_label(mask[row, day]), []).append(day)
+            for hours, days in by_hours.items():
+                add(severity, check, row, describe(row, _days_label(days), hours))
+
+    # Prices out of range
+    with np.errstate(invalid='ignore'):
+        out_of_range = priced & ((p < MIN_PRICE) | (p > MAX_PRICE))
+    per_day(ERROR, 'price', out_of_range,
+            lambda row, days, hours: f"{days} {hours}: price outside {MIN_PRICE}-{MAX_PRICE}")
+    for row in np.flatnonzero(matrix.invalid):
+        add(ERROR, 'price', row, "a rule's price is not a number")
+
+    per_day(ERROR, 'conflict', matrix.conflicts,
+            lambda row, days, hours: f"{days} {hours}: overlapping rules with different prices")
+
+    # Holes in the opening hours: every unpriced hour outside the day's longest
+    # unpriced run (walked twice around the clock, so runs can cross midnight)
+    unpriced = ~priced
+    run = np.zeros(unpriced.shape[:2], dtype=int)
+    longest = np.zeros_like(run)
+    longest_end = np.zeros_like(run)
+    for step in range(2 * HOURS):
+        run = np.where(unpriced[:, :, step % HOURS], run + 1, 0)
+        longer = run > longest
+        longest = np.where(longer, run, longest)
+        longest_end = np.where(longer, step, longest_end)
+    closed = (longest_end[..., None] - np.arange(HOURS)) % HOURS < np.minimum(longest, HOURS)[..., None]
+    gaps = unpriced & ~closed
+    per_day(ERROR, 'gap', gaps, lambda row, days, hours: f"{days} {hours}: no price inside opening hours")
+
+    day_priced = priced.any(axis=2)
+    partial = day_priced.any(axis=1) & ~day_priced.all(axis=1)
+    for row in np.flatnonzero(partial):
+        missing = _days_label(np.flatnonzero(~day_priced[row]))
+        add(ERROR, 'empty', row, f"no prices on {missing}")
+
+    # Price jumps against the group's previous same-season period, hour by hour
+    has_previous = matrix.previous >= 0
+    if has_previous.any():
+        rows = np.flatnonzero(has_previous)
+        new = p[rows]
+        old = p[matrix.previous[rows]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.fmax(new / old, old / new)
+        jumps = ratio > JUMP_RATIO
+        for i in np.flatnonzero(jumps.any(axis=(1, 2))):
+            worst = np.nanargmax(np.where(jumps[i], ratio[i], np.nan))
+            day, hour = divmod(int(worst), HOURS)
+            add(WARNING, 'jump', rows[i],
+                f"{DAY_NAMES[day]} {hour}:00 {old[i, day, hour]:.0f} → {new[i, day, hour]:.0f} "
+                f"against {matrix.labels[matrix.previous[rows[i]]][2]}")
+
+    for row, label in enumerate(matrix.labels):
+        if label[3] == 'outdoor' and priced[row].any() and _in_winter(label[4], label[5]):
+            add(WARNING, 'winter', row, "outdoor courts priced in winter")
+
+    return issues
+
+
+def validate_venues(venues):
+    """All issues in the given venues (parsed courts.yaml entries)"""
+    return check_matrix(build_matrix(venues))
+
+
+def new_errors(old_venues, new_venues):
+    """Errors in new_venues that old_venues doesn't have already (to gate an update)"""
+    known = {issue.key for issue in validate_venues(old_venues) if issue.severity == ERROR}
+    return [issue for issue in validate_venues(new_venues)
+            if issue.severity == ERROR and issue.key not in known]
+
+
+def print_issues(issues):
+    for issue in issues:
+        icon, style = ('❌', 'red') if issue.severity == ERROR else ('⚠️ ', 'yellow')
+        console.print(f"  {icon} {issue}", style=style)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the pricing schedules in courts.yaml")
+    parser.add_argument('--yaml', type=Path, default=COURTS_YAML, help=f'YAML file to check (default: {COURTS_YAML})')
+    parser.add_argument('--strict', action='store_true', help='Treat warnings as errors')
+    args = parser.parse_args()
+
+    with open(args.yaml, 'r', encoding='utf-8') as f:
+        venues = yaml.safe_load(f)
+
+    matrix = build_matrix(venues)
+    issues = check_matrix(matrix)
+    print_issues(issues)
+
+    errors = sum(issue.severity == ERROR for issue in issues)
+    warnings = len(issues) - errors
+    console.print(f"\n{len(venues)} venues, {len(matrix.labels)} open periods: "
+                  f"{errors} errors, {warnings} warnings",
+                  style="red" if errors else "yellow" if warnings else "green")
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
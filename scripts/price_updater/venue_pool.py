@@ -0,0 +1,70 @@
+"""
+Host-aware work queue for crawling venues concurrently.
+
+A venue is only given out when no other worker is currently talking to the same
+host (several clubs share booking platforms such as twojtenis.pl or
+tenis4u.pl), and a minimum pause is kept between two visits to one host.
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_MIN_HOST_INTERVAL = 2.0
+
+
+def venue_key(venue):
+    """Identity of a venue in courts.yaml, caches and manifests: its id, or its name without one"""
+    return venue.get('id', venue.get('name', 'Unknown'))
+
+
+def venue_host(venue):
+    """Host name used for politeness limits, e.g. 'twojtenis.pl'"""
+    host = urlparse(venue.get('prices_source') or '').hostname or ''
+    return host[4:] if host.startswith('www.') else host
+
+
+class PoliteVenueQueue:
+    """Queue that never hands out two venues on the same host at the same time"""
+
+    def __init__(self, venues, min_host_interval=DEFAULT_MIN_HOST_INTERVAL):
+        self.min_host_interval = min_host_interval
+        self._pending = list(venues)
+        self._busy_hosts = set()
+        self._last_visit = {}
+        self._cond = threading.Condition()
+
+    def _pick(self, now):
+        """Return (index, wait) for the best pending venue; wait > 0 means nothing is ready yet"""
+        best_index, best_wait = None, None
+        for i, venue in enumerate(self._pending):
+            host = venue_host(venue)
+            if host in self._busy_hosts:
+                continue
+            wait = self._last_visit.get(host, float('-inf')) + self.min_host_interval - now
+            if wait <= 0:
+                return i, 0
+            if best_wait is None or wait < best_wait:
+                best_index, best_wait = i, wait
+        return best_index, best_wait
+
+    def get(self):
+        """Block until a venue can be processed; returns None once the queue is drained"""
+        with self._cond:
+            while self._pending:
+                index, wait = self._pick(time.monotonic())
+                if index is not None and wait == 0:
+                    venue = self._pending.pop(index)
+                    self._busy_hosts.add(venue_host(venue))
+                    return venue
+                # Either every host is busy (wait for done()) or a host is cooling down
+                self._cond.wait(timeout=wait)
+            return None
+
+    def done(self, venue):
+        """Release the venue's host for other workers"""
+        with self._cond:
+            host = venue_host(venue)
+            self._busy_hosts.discard(host)
+            self._last_visit[host] = time.monotonic()
+            self._cond.notify_all()
@@ -0,0 +1,306 @@
+"""
+Surgical updates of courts.yaml.
+
+Re-dumping the whole file with yaml.dump renames anchors, may reflow values
+and rewrites 1,800+ lines to change one schedule. Instead, patch_venues edits
+the file text in place: it finds the `prices` nodes of the changed venues by
+their source positions and replaces only the schedules that differ (or appends
+new periods), keeping everything else byte for byte.
+
+Only what the updater changed is written: each venue comes with the copy it
+was read from, and just the periods that differ from that copy are applied to
+the file as it is on disk now. Edits made to other periods or venues while
+the updater ran are kept; a period edited on disk and by the updater is a
+conflict, and that venue is not saved.
+
+The result is re-parsed and checked against the expected data; if a patch
+can't be expressed safely (e.g. it would change a value shared through a YAML
+alias), the file is re-dumped as a whole instead.
+
+Writes go through a temp file + fsync + rename under an exclusive lock, so a
+crash never leaves a half-written file and two updaters can't clobber each other.
+"""
+
+import copy
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+from yaml.events import AliasEvent
+from rich.console import Console
+
+from venue_pool import venue_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+console = Console()
+
+
+class _Alias:
+    """An alias (*name) in the source, with its own position instead of the anchor's"""
+
+    def __init__(self, target, start_mark, end_mark):
+        self.target = target
+        self.start_mark = start_mark
+        self.end_mark = end_mark
+        self.anchor = None
+
+
+class _PositionLoader(yaml.SafeLoader):
+    """Composer that keeps anchor names and alias positions on the nodes"""
+
+    def compose_node(self, parent, index):
+        if self.check_event(AliasEvent):
+            event = self.peek_event()
+            target = super().compose_node(parent, index)
+            return _Alias(target, event.start_mark, event.end_mark)
+        anchor = self.peek_event().anchor
+        node = super().compose_node(parent, index)
+        node.anchor = anchor
+        return node
+
+
+def _get(mapping_node, key):
+    """(key node, value node) for a key of a composed mapping, or (None, None)"""
+    if not isinstance(mapping_node, yaml.MappingNode):
+        return None, None
+    for key_node, value_node in mapping_node.value:
+        if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+            return key_node, value_node
+    return None, None
+
+
+def _dump(value):
+    return yaml.dump(value, allow_unicode=True, sort_keys=False, default_flow_style=False)
+
+
+def _indent(block, indent):
+    return ''.join(' ' * indent + line if line.strip() else line for line in block.splitlines(True))
+
+
+def _node_end(text, node):
+    """
+    End of a node's text. Block nodes end where the next token starts; that is
+    moved back to the start of the line, and over trailing blank and comment
+    lines (they belong to what follows).
+    """
+    index = node.end_mark.index
+    line_start = text.rfind('\n', 0, index) + 1
+    if not text[line_start:index].strip():
+        index = line_start
+    while index > 0 and text[index - 1] == '\n':
+        line_start = text.rfind('\n', 0, index - 1) + 1
+        line = text[line_start:index].strip()
+        if line and not line.startswith('#'):
+            break
+        index = line_start
+    return index
+
+
+def _replace_value(text, key_node, value_node, value, indent):
+    """Edit replacing a mapping value (block, flow or alias), keeping an anchor on it"""
+    end = _node_end(text, value_node)
+
+    anchor = f" &{value_node.anchor}" if value_node.anchor else ''
+    if value in ([], {}):
+        rendered = f":{anchor} {_dump(value)}"
+    else:
+        rendered = f":{anchor}\n{_indent(_dump(value), indent)}"
+    if text[end - 1:end] != '\n':
+        rendered = rendered.rstrip('\n')
+    return (key_node.end_mark.index, end, rendered)
+
+
+def _price_edits(text, group_node, old_prices, new_prices):
+    """Smallest edits turning a court group's prices from old_prices into new_prices"""
+    key_node, prices_node = _get(group_node, 'prices')
+    group_indent = group_node.start_mark.column
+
+    if key_node is None:
+        # Group had no prices yet: add the key at the end of the group
+        end = _node_end(text, group_node)
+        prefix = '' if text[end - 1:end] == '\n' else '\n'
+        return [(end, end, f"{prefix}{' ' * group_indent}prices:\n{_indent(_dump(new_prices), group_indent)}")]
+
+    whole = [_replace_value(text, key_node, prices_node, new_prices, group_indent)]
+    simple = (
+        isinstance(prices_node, yaml.SequenceNode)
+        and not prices_node.flow_style
+        and prices_node.value
+        and len(new_prices) >= len(old_prices)
+        and all(isinstance(item, yaml.MappingNode) for item in prices_node.value)
+    )
+    if not simple:
+        return whole
+
+    edits = []
+    for item_node, old, new in zip(prices_node.value, old_prices, new_prices):
+        if old == new:
+            continue
+        schedule_key, schedule_node = _get(item_node, 'schedule')
+        only_schedule = {k: v for k, v in old.items() if k != 'schedule'} == \
+                        {k: v for k, v in new.items() if k != 'schedule'}
+        if schedule_key is None or not only_schedule or isinstance(schedule_node, _Alias):
+            return whole
+        edits.append(_replace_value(text, schedule_key, schedule_node, new.get('schedule', {}),
+                                    schedule_key.start_mark.column + 2))
+
+    appended = new_prices[len(old_prices):]
+    if appended:
+        end = _node_end(text, prices_node)
+        prefix = '' if text[end - 1:end] == '\n' else '\n'
+        # Column of the '-' markers (the node's own start may be an anchor on the key line)
+        item_indent = prices_node.value[0].start_mark.column - 2
+        edits.append((end, end, prefix + _indent(_dump(appended), item_indent)))
+    return edits
+
+
+def _period_key(period):
+    return str(period.get('from')), str(period.get('to'))
+
+
+def _rebase_prices(base_prices, new_prices, disk_prices):
+    """
+    disk_prices with the periods that new_prices changed against base_prices
+    (matched by from/to) replaced, and the periods it added appended.
+    None when one of those periods was also changed on disk.
+    """
+    rebased = copy.deepcopy(disk_prices)
+    positions = {_period_key(period): i for i, period in enumerate(rebased)}
+    base_keys = {_period_key(period) for period in base_prices}
+
+    for base, new in zip(base_prices, new_prices):
+        if base == new:
+            continue
+        position = positions.get(_period_key(base))
+        if position is None or rebased[position] != base:
+            return None
+        rebased[position] = copy.deepcopy(new)
+
+    for new in new_prices[len(base_prices):]:
+        key = _period_key(new)
+        if key in base_keys:
+            continue
+        if key in positions:
+            if rebased[positions[key]] != new:
+                return None
+            continue
+        rebased.append(copy.deepcopy(new))
+    return rebased
+
+
+def patch_venues(text, changes):
+    """
+    Return text with the price changes of venues written in.
+
+    changes is a list of (base, venue) pairs of parsed venues: base as it was
+    read (None: as it is in text), venue with the updater's changes. Only `prices` of court groups are
+    touched; venues are matched by id, court groups by position and periods by
+    from/to. Falls back to a full re-dump when the patched text doesn't parse
+    back to the expected data.
+    """
+    root = yaml.compose(text, Loader=_PositionLoader)
+    current = yaml.safe_load(text)
+    expected = copy.deepcopy(current)
+    file_venues = {venue_key(v): i for i, v in enumerate(expected)}
+
+    edits = []
+    # New prices per composed node, so an alias of an already patched anchor can stay an alias
+    written = {}
+    for base, venue in sorted(changes, key=lambda change: file_venues.get(venue_key(change[1]), -1)):
+        index = file_venues.get(venue_key(venue))
+        if index is None:
+            console.print(f"  ⚠️  {venue.get('name', 'Unknown')} is no longer in courts.yaml, not saved", style="yellow")
+            continue
+        base_groups = (base or current[index]).get('courtGroups', [])
+        new_groups = venue.get('courtGroups', [])
+        old_groups = current[index].get('courtGroups', [])
+        if not len(base_groups) == len(new_groups) == len(old_groups):
+            console.print(f"  ⚠️  Court groups of {venue.get('name', 'Unknown')} changed on disk, not saved",
+                          style="yellow")
+            continue
+
+        rebased = [
+            _rebase_prices(base_group.get('prices') or [], new_group.get('prices') or [], old_group.get('prices') or [])
+            for base_group, new_group, old_group in zip(base_groups, new_groups, old_groups)
+        ]
+        if any(prices is None for prices in rebased):
+            console.print(f"  ⚠️  Prices of {venue.get('name', 'Unknown')} were edited on disk too, not saved",
+                          style="yellow")
+            continue
+
+        _, groups_node = _get(root.value[index], 'courtGroups')
+        for group_index, (old_group, new_prices) in enumerate(zip(old_groups, rebased)):
+            old_prices = old_group.get('prices') or []
+            if old_prices == new_prices:
+                continue
+            group_node = groups_node.value[group_index]
+            _, prices_node = _get(group_node, 'prices')
+            if isinstance(prices_node, _Alias) and written.get(id(prices_node.target)) == new_prices:
+                pass
+            else:
+                edits.extend(_price_edits(text, group_node, old_prices, new_prices))
+                if prices_node is not None:
+                    written[id(prices_node)] = new_prices
+            expected[index]['courtGroups'][group_index]['prices'] = copy.deepcopy(new_prices)
+
+    patched = text
+    for start, end, replacement in sorted(edits, key=lambda e: e[0], reverse=True):
+        patched = patched[:start] + replacement + patched[end:]
+
+    try:
+        ok = yaml.safe_load(patched) == expected
+    except yaml.YAMLError:
+        ok = False
+    if not ok:
+        console.print("  ⚠️  courts.yaml could not be patched in place (shared anchors?), rewriting it whole",
+                      style="yellow")
+        return _dump(expected)
+    return patched
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive advisory lock on path (via a .lock file next to it), held for the with block"""
+    lock_path = Path(f"{path}.lock")
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write(path, text):
+    """Replace path with text: temp file in the same directory, fsync, rename"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp_path, path.stat().st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Make the rename itself durable
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(path.parent, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
@@ -1,7 +1,7 @@
 import { useState, useMemo, useEffect } from 'react';
 import ClubViewer from './components/ClubViewer';
 import { CourtPricingSystem } from './CourtPricingSystem';
-import courtsData from './assets/courts.yaml';
+import pricingTable from 'virtual:compiled-pricing';
 import { ThemeProvider, Container, Typography, createTheme, IconButton, Box, useTheme, useMediaQuery, Menu, MenuItem } from '@mui/material';
 import Brightness4Icon from '@mui/icons-material/Brightness4';
 import Brightness7Icon from '@mui/icons-material/Brightness7';
@@ -127,7 +127,7 @@ function App() {
     },
   }), [mode, isMobile]);
 
-  const system = new CourtPricingSystem(courtsData);
+  const system = CourtPricingSystem.fromTable(pricingTable);
 
   useEffect(() => {
     const handleLocationChange = () => {
@@ -1,4 +1,5 @@
 import Holidays from 'date-holidays';
+import CompiledPricing from './compiledPricing.js';
 
 const HL = new Holidays("PL");
 // PL holidays for past/future pricing periods and tests with fixed years (see getHolidays).
@@ -22,9 +23,13 @@ function getHolidays () {
   return m;
 }
 
-const holidaysMap = getHolidays ();
+// Built on first use: with a compiled pricing table the holidays come from its bitmap
+let holidaysMap = null;
 
 function isHoliday(date) {
+  if (holidaysMap === null) {
+    holidaysMap = getHolidays();
+  }
   return holidaysMap.has(formatDate(date));
 }
 
@@ -50,7 +55,8 @@ class Court {
 
 class PricePeriod {  
  
-  constructor(prices){    
+  // pricing and compiled: a CompiledPricing reader and this period's entry in its table
+  constructor(prices, pricing = null, compiled = null){    
     // this should correspond to indexes returned by Date.getDay()    
     this.from = new Date(prices.from);
     this.from.setHours(0,0,0,0);
@@ -59,7 +65,9 @@ class PricePeriod {
 
     this.closed = prices.closed === true;
     this.schedule = prices.schedule;
-    this.dayMap = this.createPricingMap(this.schedule);
+    this.pricing = pricing;
+    this.compiled = compiled && compiled.rows ? compiled : null;
+    this.dayMap = this.compiled ? null : this.createPricingMap(this.schedule);
   }
 
   mergeTimeMaps(existingMap, newMap) {
@@ -127,6 +135,7 @@ class PricePeriod {
 
   isClosed() {
     if (this.closed) return true;
+    if (this.compiled) return false;
     if (this.schedule === undefined || this.schedule === null || (this.schedule && this.schedule.length === 0)) {
       return true;
     }
@@ -134,6 +143,11 @@ class PricePeriod {
   }
 
   getHalfHourRate(date) {    
+    if (this.compiled) {
+      const hourly = this.pricing.getHourlyPrice(this.compiled, date);
+      return hourly === null ? null : hourly / 2;
+    }
+
     let day = DAY_NAMES[date.getDay()];    
     if (isHoliday(date)) {
       day = 'hl';
@@ -149,10 +163,12 @@ class PricePeriod {
   }
 
   getMinMaxPriceForWeekday() {
+   if (this.compiled) return { ...this.compiled.weekday };
    return this.getMinMaxForRange(['mo', 'tu', 'we', 'th', 'fr']);
   }
 
   getMinMaxPriceForWeekend() {
+    if (this.compiled) return { ...this.compiled.weekend };
     return this.getMinMaxForRange(['su', 'st', 'hl']);
   }
 
@@ -190,13 +206,13 @@ class PricePeriod {
 }
 
 class CourtGroup {
-  constructor(groupData, club) {
+  constructor(groupData, club, pricing = null, compiled = null) {
     const { surface, type, courts, prices, ...rest } = groupData;
     this.club = club;
     this.surface = surface;
     this.type = type;    
     this.courts = courts.map(id => new Court(id, surface, type, this));
-    this.prices = prices.map(price => new PricePeriod(price));
+    this.prices = prices.map((price, i) => new PricePeriod(price, pricing, compiled && compiled.periods[i]));
     
     // Copy all remaining properties
     Object.assign(this, rest);    
@@ -282,15 +298,15 @@ class CourtGroup {
 }
 
 class Club {
-  constructor (clubData){
+  constructor (clubData, pricing = null, compiled = null){
     const { courtGroups = [], ...rest } = clubData;
 
     if (!courtGroups) {
         throw new Error(`No courts defined for club ${clubData.name}`);
     }
 
-    this.courtGroups = courtGroups.map(group =>
-      new CourtGroup(group, this)
+    this.courtGroups = courtGroups.map((group, i) =>
+      new CourtGroup(group, this, pricing, compiled && compiled.groups[i])
     );
 
     // Copy all remaining properties
@@ -326,14 +342,16 @@ class Club {
 }
 
 class CourtPricingSystem {
-  constructor(data) {
+  // table: optional lookup table compiled from the same data (see compilePricing.js)
+  constructor(data, table = null) {
     try {
       const clubsData = Array.isArray(data) ? data : [data];
+      const pricing = table ? new CompiledPricing(table) : null;
 
-      this.clubs = clubsData.map(club =>{
+      this.clubs = clubsData.map((club, i) =>{
         try{
           return new Club(
-            club
+            club, pricing, table && table.venues[i]
           )
         } catch (error) {
           throw new Error(`Error parsing club data for club ${club.name}: ${error.message}`);
@@ -346,6 +364,21 @@ class CourtPricingSystem {
     }
   }
 
+  // Builds the clubs from a compiled table alone, without the courts.yaml it was made from
+  static fromTable(table) {
+    const data = table.venues.map(({ club, groups }) => ({
+      ...club,
+      courtGroups: groups.map(({ surface, type, courts, info, periods }) => ({
+        ...info,
+        surface,
+        type,
+        courts,
+        prices: periods.map(({ from, to, closed }) => ({ from, to, closed })),
+      })),
+    }));
+    return new CourtPricingSystem(data, table);
+  }
+
   list() {
     const result = [];
     for (const club of this.clubs) {
@@ -0,0 +1,104 @@
+// Build-time compiler for the pricing lookup table read by compiledPricing.js. The vite
+// build (see compiledPricing() in vite.config.js) turns courts.yaml into this table, so
+// the browser gets every schedule already expanded to hourly rows and the holidays as a
+// bitmap instead of building Maps and holiday lists at startup.
+//
+// The venue and court group fields other than the schedules are copied as they are, so
+// CourtPricingSystem.fromTable() can build the clubs without courts.yaml.
+//
+// Schedules are expanded by PricePeriod itself and holidays come from date-holidays,
+// the same sources CourtPricingSystem.js uses without a table.
+import Holidays from 'date-holidays';
+import { PricePeriod } from './CourtPricingSystem.js';
+
+export const FORMAT_VERSION = 2;
+
+const DAY_CLASSES = ['su', 'mo', 'tu', 'we', 'th', 'fr', 'st', 'hl'];
+const HOURS = 24;
+
+// Years covered by the price periods: no other day can have a price, and the table
+// depends on courts.yaml only, not on the day it is built
+function periodYears(venues) {
+  const years = [];
+  for (const venue of venues) {
+    for (const group of venue.courtGroups || []) {
+      for (const period of group.prices || []) {
+        years.push(Number(String(period.from).slice(0, 4)), Number(String(period.to).slice(0, 4)));
+      }
+    }
+  }
+  return [Math.min(...years), Math.max(...years)];
+}
+
+function isoDayNumber(iso) {
+  const [y, m, d] = iso.split('-').map(Number);
+  return Date.UTC(y, m - 1, d) / (24 * 60 * 60 * 1000);
+}
+
+function holidayBitmap(firstYear, lastYear) {
+  const hl = new Holidays('PL');
+  const from = `${firstYear}-01-01`;
+  const base = isoDayNumber(from);
+  const days = isoDayNumber(`${lastYear}-12-31`) - base + 1;
+  const bits = new Uint8Array(Math.ceil(days / 8));
+  for (let year = firstYear; year <= lastYear; year++) {
+    for (const holiday of hl.getHolidays(year)) {
+      // 'YYYY-MM-DD hh:mm:ss' in Polish time, whatever the timezone of the build
+      const n = isoDayNumber(holiday.date.slice(0, 10)) - base;
+      bits[n >> 3] |= 1 << (n & 7);
+    }
+  }
+  return { from, days, bitmap: btoa(String.fromCharCode(...bits)) };
+}
+
+export function compilePricing(venues) {
+  const rows = [];
+  const rowIds = new Map();
+
+  function rowId(dayMap) {
+    // dayMap holds half-hour prices keyed by hhmm; a row holds the hourly price (0 = none)
+    const row = Array.from({ length: HOURS }, (_, hour) => (dayMap.get(hour * 100) || 0) * 2);
+    const key = row.join(',');
+    if (!rowIds.has(key)) {
+      rowIds.set(key, rowIds.size);
+      rows.push(...row);
+    }
+    return rowIds.get(key);
+  }
+
+  const compiledVenues = venues.map(({ courtGroups, ...club }) => ({
+    id: club.id,
+    // name, address and the rest, so the app needs nothing but the table
+    club,
+    groups: (courtGroups || []).map(({ surface, type, courts, prices: periods, ...info }) => ({
+      surface,
+      type,
+      courts: courts || [],
+      info,
+      periods: (periods || []).map(prices => {
+        const period = new PricePeriod(prices);
+        const entry = { from: String(prices.from), to: String(prices.to) };
+        if (period.isClosed()) {
+          return { ...entry, closed: true };
+        }
+        return {
+          ...entry,
+          rows: DAY_CLASSES.map(day => rowId(period.dayMap[day])),
+          weekday: period.getMinMaxPriceForWeekday(),
+          weekend: period.getMinMaxPriceForWeekend(),
+        };
+      }),
+    })),
+  }));
+
+  return {
+    version: FORMAT_VERSION,
+    dayClasses: DAY_CLASSES,
+    hoursPerDay: HOURS,
+    holidays: holidayBitmap(...periodYears(venues)),
+    rows,
+    venues: compiledVenues,
+  };
+}
+
+export default compilePricing;
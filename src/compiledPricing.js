@@ -0,0 +1,129 @@
+// Reader for the pricing lookup table that compilePricing.js builds from courts.yaml
+// during the vite build. Schedules are already expanded to hourly rows per day class
+// and holidays are a bitmap, so a lookup is a few array reads instead of building
+// Maps and holiday lists at startup. CourtPricingSystem uses it when given a table.
+
+const MS_PER_DAY = 24 * 60 * 60 * 1000;
+
+// Days since 1970-01-01 of the local calendar date (DST-safe)
+function localDayNumber(date) {
+  return Date.UTC(date.getFullYear(), date.getMonth(), date.getDate()) / MS_PER_DAY;
+}
+
+function isoDayNumber(iso) {
+  const [y, m, d] = iso.split('-').map(Number);
+  return Date.UTC(y, m - 1, d) / MS_PER_DAY;
+}
+
+function decodeBase64(text) {
+  const binary = atob(text);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+}
+
+class CompiledPricing {
+  constructor(table) {
+    this.rows = Int32Array.from(table.rows);
+    this.hours = table.hoursPerDay;
+    this.hlClass = table.dayClasses.indexOf('hl');
+    this.holidayBase = isoDayNumber(table.holidays.from);
+    this.holidayDays = table.holidays.days;
+    this.holidayBits = decodeBase64(table.holidays.bitmap);
+
+    // club|surface|type|court -> court group: a club can have several groups with the same
+    // surface and type, and a court can be in several groups (e.g. covered in winter)
+    this.courts = new Map();
+    for (const venue of table.venues) {
+      for (const group of venue.groups) {
+        const periods = group.periods.map(p => ({
+          ...p,
+          fromDay: isoDayNumber(p.from),
+          toDay: isoDayNumber(p.to),
+        }));
+        const compiled = { ...group, periods };
+        for (const courtId of group.courts) {
+          this.courts.set(this.courtKey(venue.id, group.surface, group.type, courtId), compiled);
+        }
+      }
+    }
+  }
+
+  courtKey(clubId, surface, type, courtId) {
+    return [clubId, surface, type, String(courtId)].join('|');
+  }
+
+  getGroup(clubId, surface, type, courtId) {
+    return this.courts.get(this.courtKey(clubId, surface, type, courtId)) || null;
+  }
+
+  isHoliday(date) {
+    const n = localDayNumber(date) - this.holidayBase;
+    return n >= 0 && n < this.holidayDays && (this.holidayBits[n >> 3] & (1 << (n & 7))) !== 0;
+  }
+
+  // Index into dayClasses, the same as DAY_NAMES in CourtPricingSystem.js
+  getDayClass(date) {
+    return this.isHoliday(date) ? this.hlClass : date.getDay();
+  }
+
+  // Same as CourtGroup.getPricePeriod: from <= date <= to, both at local midnight
+  getPricePeriod(group, date) {
+    const day = localDayNumber(date);
+    const atMidnight = date.getHours() === 0 && date.getMinutes() === 0 &&
+      date.getSeconds() === 0 && date.getMilliseconds() === 0;
+    return group.periods.find(p =>
+      day >= p.fromDay && (day < p.toDay || (day === p.toDay && atMidnight))) || null;
+  }
+
+  // Price of the hour containing date, or null when there is none
+  getHourlyPrice(period, date) {
+    const row = period.rows[this.getDayClass(date)];
+    return this.rows[row * this.hours + date.getHours()] || null;
+  }
+
+  getPrice(clubId, surface, type, courtId, startTime, endTime) {
+    const group = this.getGroup(clubId, surface, type, courtId);
+    const start = new Date(startTime);
+    const end = new Date(endTime);
+    if (!group) {
+      return null;
+    }
+
+    const period = this.getPricePeriod(group, start);
+    if (!period || period.closed) {
+      return null;
+    }
+
+    let total = 0;
+    for (let t = new Date(start); t < end; t.setMinutes(t.getMinutes() + 30)) {
+      const hourly = this.getHourlyPrice(period, t);
+      if (hourly === null) {
+        return null;
+      }
+      total += hourly / 2;
+    }
+    return total;
+  }
+
+  getMinMaxPriceForWeekday(clubId, surface, type, courtId, date) {
+    return this.getMinMax(clubId, surface, type, courtId, date, 'weekday');
+  }
+
+  getMinMaxPriceForWeekend(clubId, surface, type, courtId, date) {
+    return this.getMinMax(clubId, surface, type, courtId, date, 'weekend');
+  }
+
+  getMinMax(clubId, surface, type, courtId, date, range) {
+    const group = this.getGroup(clubId, surface, type, courtId);
+    const period = group && this.getPricePeriod(group, new Date(date));
+    if (!period || period.closed) {
+      return null;
+    }
+    return period[range];
+  }
+}
+
+export default CompiledPricing;
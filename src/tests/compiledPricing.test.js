@@ -0,0 +1,109 @@
+/* eslint-env mocha */
+import { expect } from 'chai';
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import yaml from 'js-yaml';
+import CompiledPricing from '../compiledPricing.js';
+import CourtPricingSystem from '../CourtPricingSystem.js';
+import { compilePricing } from '../compilePricing.js';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const COURTS_YAML = path.join(__dirname, '../assets/courts.yaml');
+const GOLDEN_JSON = path.join(__dirname, 'fixtures/courtPricingGoldenProduction.json');
+
+describe('Compiled pricing table (compilePricing.js + compiledPricing.js)', () => {
+  let data;
+  let table;
+  let pricing;
+  let golden;
+
+  before(() => {
+    data = yaml.load(fs.readFileSync(COURTS_YAML, 'utf8'));
+    table = compilePricing(data);
+    pricing = new CompiledPricing(table);
+    golden = JSON.parse(fs.readFileSync(GOLDEN_JSON, 'utf8'));
+  });
+
+  it('covers the holidays of the price period years only', () => {
+    const years = data.flatMap(club => club.courtGroups.flatMap(group =>
+      group.prices.flatMap(p => [String(p.from), String(p.to)].map(d => Number(d.slice(0, 4))))));
+    expect(table.holidays.from).to.equal(`${Math.min(...years)}-01-01`);
+    expect(pricing.isHoliday(new Date(Math.max(...years), 11, 25))).to.be.true;
+    expect(pricing.isHoliday(new Date(Math.max(...years) + 1, 0, 1))).to.be.false;
+  });
+
+  it('marks Polish public holidays', () => {
+    expect(pricing.isHoliday(new Date(2024, 4, 3))).to.be.true;
+    expect(pricing.isHoliday(new Date(2024, 4, 30))).to.be.true; // Corpus Christi
+    expect(pricing.isHoliday(new Date(2024, 4, 4))).to.be.false;
+    expect(pricing.getDayClass(new Date(2024, 10, 11))).to.equal(7);
+    expect(pricing.getDayClass(new Date(2024, 10, 12))).to.equal(2);
+  });
+
+  it('matches golden snapshot for every open court × price period', () => {
+    for (const [key, exp] of Object.entries(golden.entries)) {
+      const { clubId, surface, type, courtId } = exp;
+      const group = pricing.getGroup(clubId, surface, type, courtId);
+      expect(group, `Missing group for ${key}`).to.not.equal(null);
+
+      const period = group.periods.find(p => p.from === exp.periodFrom && p.to === exp.periodTo);
+      expect(period, `Missing period for ${key}`).to.not.equal(undefined);
+      expect(period.weekday).to.deep.equal(exp.weekdayMinMax);
+      expect(period.weekend).to.deep.equal(exp.weekendMinMax);
+
+      for (const sample of exp.midDateSamplePrices) {
+        const total = pricing.getPrice(clubId, surface, type, courtId, sample.startIso, sample.endIso);
+        expect(total, `${key} ${sample.tag}`).to.equal(sample.price);
+      }
+    }
+  });
+
+  it('builds the clubs from the table alone', () => {
+    const system = CourtPricingSystem.fromTable(JSON.parse(JSON.stringify(table)));
+
+    expect(system.clubs.map(club => club.name)).to.deep.equal(data.map(club => club.name));
+    system.clubs.forEach((club, i) => {
+      const { courtGroups, ...info } = data[i];
+      for (const [field, value] of Object.entries(info)) {
+        expect(club[field], `${club.id} ${field}`).to.deep.equal(value);
+      }
+      club.courtGroups.forEach((group, j) => {
+        expect(group.courts.map(court => court.id)).to.deep.equal(courtGroups[j].courts);
+        expect(group.prices.map(pp => pp.isClosed())).to.deep.equal(
+          new CourtPricingSystem(data).clubs[i].courtGroups[j].prices.map(pp => pp.isClosed()));
+      });
+    });
+  });
+
+  it('gives CourtPricingSystem the same prices as building it from the schedules', () => {
+    const system = CourtPricingSystem.fromTable(table);
+    let checked = 0;
+
+    for (const club of system.clubs) {
+      for (const group of club.courtGroups) {
+        for (const court of group.courts) {
+          for (const pp of group.prices) {
+            if (pp.isClosed()) continue;
+            expect(pp.dayMap, 'expanded from the table, not the schedule').to.equal(null);
+
+            const exp = Object.values(golden.entries).find(e =>
+              e.clubId === club.id && e.surface === group.surface && e.type === group.type &&
+              e.courtId === String(court.id) && e.periodFrom === String(pp.compiled.from) &&
+              e.periodTo === String(pp.compiled.to));
+            expect(exp, `${club.id} ${group.surface} ${group.type} ${court.id}`).to.not.equal(undefined);
+
+            expect(pp.getMinMaxPriceForWeekday()).to.deep.equal(exp.weekdayMinMax);
+            expect(pp.getMinMaxPriceForWeekend()).to.deep.equal(exp.weekendMinMax);
+            for (const sample of exp.midDateSamplePrices) {
+              expect(group.getPrice(sample.startIso, sample.endIso), sample.tag).to.equal(sample.price);
+              checked += 1;
+            }
+          }
+        }
+      }
+    }
+
+    expect(checked).to.be.at.least(200);
+  });
+});
@@ -2,13 +2,36 @@ import { defineConfig, loadEnv } from "vite";
 import react from "@vitejs/plugin-react";
 import ViteYaml from '@modyfi/vite-plugin-yaml';
 import process from 'process';
+import fs from 'fs';
+import { fileURLToPath } from 'url';
+import yaml from 'js-yaml';
+import { compilePricing } from './src/compilePricing.js';
+
+const COURTS_YAML = fileURLToPath(new URL('./src/assets/courts.yaml', import.meta.url));
+const COMPILED_PRICING = 'virtual:compiled-pricing';
+
+// Serves the pricing lookup table compiled from courts.yaml as 'virtual:compiled-pricing'
+function compiledPricing() {
+  return {
+    name: 'compiled-pricing',
+    resolveId(id) {
+      return id === COMPILED_PRICING ? '\0' + COMPILED_PRICING : null;
+    },
+    load(id) {
+      if (id !== '\0' + COMPILED_PRICING) return null;
+      this.addWatchFile(COURTS_YAML);
+      const table = compilePricing(yaml.load(fs.readFileSync(COURTS_YAML, 'utf8')));
+      return `export default ${JSON.stringify(table)};`;
+    },
+  };
+}
 
 // https://vitejs.dev/config/
 export default defineConfig(({ mode })=>{  
   const env = loadEnv(mode, process.cwd(), '')
   return {
     base: "/", // Set base to the repository name for GitHub Pages
-    plugins: [react(), ViteYaml()],  
+    plugins: [react(), ViteYaml(), compiledPricing()],  
     define: {
       __APP_ENV__: JSON.stringify(env.APP_ENV),    
       GOOGLE_MAPS_API_KEY: JSON.stringify(env.GOOGLE_MAPS_API_KEY),